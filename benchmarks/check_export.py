@@ -0,0 +1,108 @@
+"""
+Check that the dashboard's updated-register CSV is byte for byte the one the baseline app wrote.
+
+    python -m benchmarks.check_export
+    python -m benchmarks.check_export --rows 2000 --seed 3 --baseline-rev <commit>
+
+A generated register is uploaded to two apps run through Streamlit's AppTest: dreview003.py as
+it was at `--baseline-rev` (default: the repository's first commit) and the current one, with the
+export section open. The bytes each passes to the "Download Updated CSV" button are compared.
+Both are run for whole-number and fractional man-hours; the check fails (exit code 1) unless the
+CSV bytes are identical.
+"""
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.generate_eddr import generate_register
+
+ROOT = Path(__file__).resolve().parent.parent
+DOWNLOAD_LABEL = "Download Updated CSV"
+
+
+def app_script(source_path, register_path, root):
+    """AppTest script: run `source_path` with the uploader returning the register and keep the updated CSV."""
+    import io
+    import runpy
+    import sys
+    from pathlib import Path
+
+    import streamlit as st
+
+    sys.path.insert(0, root)
+
+    class Upload(io.BytesIO):
+        name = Path(register_path).name
+
+    file_uploader, download_button = st.sidebar.file_uploader, st.download_button
+
+    def capture(label, data=None, **kwargs):
+        if label == "Download Updated CSV":
+            st.session_state["updated_csv"] = data() if callable(data) else data
+        return download_button(label, data=data, **kwargs)
+
+    st.sidebar.file_uploader = lambda *args, **kwargs: Upload(Path(register_path).read_bytes())
+    st.download_button = capture
+    try:
+        runpy.run_path(source_path, run_name="__main__")
+    finally:
+        st.sidebar.file_uploader, st.download_button = file_uploader, download_button
+
+
+def first_commit():
+    return subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"], cwd=ROOT,
+                          capture_output=True, text=True, check=True).stdout.split()[0]
+
+
+def updated_csv(source_path, register_path):
+    """The updated-register CSV bytes the app at `source_path` offers for `register_path`."""
+    at = AppTest.from_function(app_script, args=(str(source_path), str(register_path), str(ROOT)),
+                               default_timeout=600)
+    at.session_state["section_csv_export"] = True
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{source_path} failed: {at.exception[0].value}")
+    if "updated_csv" not in at.session_state:
+        raise RuntimeError(f"{source_path} offered no {DOWNLOAD_LABEL!r} download")
+    return at.session_state["updated_csv"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the updated-register CSV with the baseline app's.")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline-rev", default=None, help="Commit of the baseline dreview003.py (default: first commit)")
+    args = parser.parse_args(argv)
+
+    baseline_rev = args.baseline_rev or first_commit()
+    register = generate_register(args.rows, seed=args.seed, data_date=pd.Timestamp.today().normalize())
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline_path = Path(tmp) / "baseline_dreview003.py"
+        baseline_path.write_bytes(subprocess.run(["git", "show", f"{baseline_rev}:dreview003.py"], cwd=ROOT,
+                                                 capture_output=True, check=True).stdout)
+        for name, man_hours in [("whole man-hours", register["Man Hours "]),
+                                ("fractional man-hours", register["Man Hours "] + 0.1)]:
+            register_path = Path(tmp) / "eddr.csv"
+            register.assign(**{"Man Hours ": man_hours}).to_csv(register_path, index=False)
+            expected = updated_csv(baseline_path, register_path)
+            actual = updated_csv(ROOT / "dreview003.py", register_path)
+            same = expected == actual
+            failures += not same
+            print(f"{name}: {'identical' if same else 'DIFFERENT'} to {baseline_rev[:7]} ({len(actual):,} bytes)")
+            if not same:
+                expected_lines, actual_lines = expected.splitlines(), actual.splitlines()
+                diff = next((i for i, (a, b) in enumerate(zip(expected_lines, actual_lines)) if a != b),
+                            min(len(expected_lines), len(actual_lines)))
+                print(f"  first difference on line {diff + 1} of {len(expected_lines)} / {len(actual_lines)}:")
+                for sign, lines in (("-", expected_lines), ("+", actual_lines)):
+                    print(f"  {sign} {lines[diff][:200]!r}" if diff < len(lines) else f"  {sign} (no line)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,172 @@
+"""
+Synthetic EDDR registers for load testing.
+
+    python -m benchmarks.generate_eddr 40000 -o eddr_40k.xlsx
+    python -m benchmarks.generate_eddr 1000000 -o eddr_1m.csv --seed 7
+
+The register follows the 37 template columns. Milestone dates are written as text in the mix
+of formats real registers contain: mostly '%d-%b-%y', plus slash/ISO/long forms, lower-case
+months, free-form dates and the '########' / '0-Jan-00' placeholders. An .xlsx output also gets a
+'Review Historical record' sheet with Rev/Reviewed pairs for the Review Timeline tab.
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scurve_engine import REGISTER_COLUMNS, parse_date_column
+
+DISCIPLINES = ["General", "PV", "Civil", "Electrical", "Mechanical", "Instrumentation", "HSE", "Structural"]
+DISCIPLINE_WEIGHTS = [0.08, 0.18, 0.2, 0.22, 0.1, 0.08, 0.06, 0.08]
+DISCIPLINE_CODES = {"General": "GN", "PV": "PV", "Civil": "CV", "Electrical": "EL", "Mechanical": "ME",
+                    "Instrumentation": "IN", "HSE": "HS", "Structural": "ST"}
+AREAS = ["General", "PV Field", "Substation", "BESS", "Control Building", "Grid Connection"]
+DOCUMENT_TYPES = ["MA", "DR", "CA", "SP", "RP", "DS"]
+CATEGORIES = ["DRG", "DOC", "CAL", "LST"]
+STATUSES = ["CO", "FN", "AP", "AN", "RJ", "IFR"]
+STATUS_WEIGHTS = [0.35, 0.2, 0.2, 0.1, 0.05, 0.1]
+
+# (strftime format, share of the written dates); the rest of the mess is added in format_dates
+DATE_STYLES = [("%d-%b-%y", 0.78), ("%d/%m/%Y", 0.08), ("%Y-%m-%d", 0.06), ("%d %b %Y", 0.04), ("%B %d, %Y", 0.04)]
+PLACEHOLDERS = ["", "", "", "########", "0-Jan-00", " "]
+
+
+def format_dates(dates, rng, messy=True):
+    """
+    Render a datetime Series as register text; missing dates are blank.
+    With `messy`, formats are mixed per row, a few values are lower-cased or free-form and some
+    missing dates are placeholders instead of blanks.
+    """
+    dates = pd.Series(pd.to_datetime(dates)).reset_index(drop=True)
+    out = np.full(len(dates), "", dtype=object)
+    present = dates.notna().to_numpy()
+    present_idx = np.flatnonzero(present)
+    if not messy:
+        out[present_idx] = dates.iloc[present_idx].dt.strftime("%d-%b-%y").to_numpy()
+        return out
+    missing_idx = np.flatnonzero(~present)
+    out[missing_idx] = rng.choice(PLACEHOLDERS, size=len(missing_idx))
+    formats, shares = zip(*DATE_STYLES)
+    style = rng.choice(len(formats), size=len(present_idx), p=shares)
+    for k, fmt in enumerate(formats):
+        idx = present_idx[style == k]
+        out[idx] = dates.iloc[idx].dt.strftime(fmt).to_numpy()
+    lower = present_idx[rng.random(len(present_idx)) < 0.03]
+    out[lower] = [s.lower() for s in out[lower]]
+    # Free-form dates only the per-value fallback parser understands
+    free = present_idx[rng.random(len(present_idx)) < 0.002]
+    out[free] = dates.iloc[free].dt.strftime("%A %d %B %Y").to_numpy()
+    return out
+
+
+def generate_register(n_rows, seed=0, initial_date="2024-08-01", data_date="2025-06-30", messy=True):
+    """
+    A synthetic register of `n_rows` documents in template column order with text dates.
+    Documents are scheduled over ~20 months from `initial_date`; milestones happen with a random
+    delay and only up to `data_date`, so the register looks like a live project.
+    """
+    rng = np.random.default_rng(seed)
+    initial_date, data_date = pd.Timestamp(initial_date), pd.Timestamp(data_date)
+    ids = np.arange(1, n_rows + 1)
+    discipline = rng.choice(DISCIPLINES, size=n_rows, p=DISCIPLINE_WEIGHTS)
+    schedule = rng.integers(0, 600, n_rows)
+    planned = initial_date + pd.to_timedelta(schedule, unit="D")
+
+    issued = planned + pd.to_timedelta(np.rint(rng.normal(12, 25, n_rows)), unit="D")
+    reviewed = issued + pd.to_timedelta(rng.integers(5, 30, n_rows), unit="D")
+    replied = reviewed + pd.to_timedelta(rng.integers(3, 20, n_rows), unit="D")
+    issued = issued.where(issued <= data_date)
+    reviewed = reviewed.where((reviewed <= data_date) & issued.notna() & (rng.random(n_rows) < 0.9))
+    replied = replied.where((replied <= data_date) & reviewed.notna() & (rng.random(n_rows) < 0.85))
+    flag = (replied.notna() & (rng.random(n_rows) < 0.75)).astype(int)
+
+    numbers = pd.Series(ids).astype(str).str.zfill(5)
+    disc_codes = pd.Series(discipline).map(DISCIPLINE_CODES)
+    man_hours = np.clip(np.rint(rng.lognormal(3.0, 0.7, n_rows)), 2, 400).astype(int)
+
+    df = pd.DataFrame({
+        "ID": ids,
+        "Discipline": discipline,
+        "Area": rng.choice(AREAS, size=n_rows),
+        "Document Title": disc_codes + " document " + numbers,
+        "Project Indentifer": "KFE",
+        "Originator": "SC",
+        "Document Number": numbers,
+        "Document Type ": rng.choice(DOCUMENT_TYPES, size=n_rows),
+        "Counter ": "00",
+        "Revision": rng.choice(["A", "B", "C", "0"], size=n_rows, p=[0.5, 0.25, 0.1, 0.15]),
+        "Area code": "GEN",
+        "Disc": disc_codes,
+        "Category": rng.choice(CATEGORIES, size=n_rows),
+        "Transmittal Code": "",
+        "Comment Sheet OE": "",
+        "Comment Sheet EPC": "",
+        "Schedule [Days]": schedule,
+        "Issued by EPC": format_dates(issued, rng, messy),
+        "Issuance Expected": "",
+        "Review By OE": format_dates(reviewed, rng, messy),
+        "Expected review": "",
+        "Reply By EPC": format_dates(replied, rng, messy),
+        "Final Issuance Expected": "",
+        **{c: "" for c in ["Review1", "ReSub1", "Review2", "ReSub2", "Review3", "ReSub3",
+                           "Review4", "ReSub4", "Review5", "ReSub5"]},
+        "Man Hours ": man_hours,
+        "Status": rng.choice(STATUSES, size=n_rows, p=STATUS_WEIGHTS),
+        "CS rev": rng.integers(0, 3, n_rows),
+        "Flag": flag,
+    })
+    return df[REGISTER_COLUMNS]
+
+
+def generate_review_history(register, max_revisions=5, seed=0, data_date="2025-06-30"):
+    """
+    'Review Historical record' sheet for a generated register: ID, Discipline, Area, Document Title
+    followed by Rev<k>/Reviewed<k> pairs. Rev0 is the register's issuance; each later revision is
+    resubmitted after the previous review.
+    """
+    rng = np.random.default_rng(seed + 1)
+    data_date = pd.Timestamp(data_date)
+    n_rows = len(register)
+    hist = register[["ID", "Discipline", "Area", "Document Title"]].reset_index(drop=True).copy()
+    submit = parse_date_column(register["Issued by EPC"]).reset_index(drop=True)
+    n_revs = rng.geometric(0.45, n_rows)
+    for k in range(max_revisions):
+        review = submit + pd.to_timedelta(rng.integers(5, 30, n_rows), unit="D")
+        review = review.where(review <= data_date)
+        hist[f"Rev{k}"] = format_dates(submit.where(n_revs > k), rng, messy=False)
+        hist[f"Reviewed{k}"] = format_dates(review.where(n_revs > k), rng, messy=False)
+        submit = (review + pd.to_timedelta(rng.integers(7, 40, n_rows), unit="D")).where(review.notna())
+        submit = submit.where(submit <= data_date)
+    return hist
+
+
+def write_eddr(path, register, history=None):
+    """Write a register to .csv, or to .xlsx with the review history as a second sheet."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        register.to_csv(path, index=False)
+        return path
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        register.to_excel(writer, sheet_name="EDDR", index=False)
+        if history is not None:
+            history.to_excel(writer, sheet_name="Review Historical record", index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic EDDR register.")
+    parser.add_argument("rows", type=int, help="Number of documents (e.g. 1000, 10000, 100000, 1000000)")
+    parser.add_argument("-o", "--output", default=None, help="Output .csv or .xlsx (default: eddr_<rows>.xlsx)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--clean", action="store_true", help="Write every date as %%d-%%b-%%y instead of mixed formats")
+    args = parser.parse_args(argv)
+
+    output = args.output or f"eddr_{args.rows}.xlsx"
+    register = generate_register(args.rows, seed=args.seed, messy=not args.clean)
+    history = generate_review_history(register, seed=args.seed) if not output.endswith(".csv") else None
+    print(f"Wrote {write_eddr(output, register, history)} ({len(register)} rows)")
+
+
+if __name__ == "__main__":
+    main()
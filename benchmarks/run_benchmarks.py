@@ -0,0 +1,231 @@
+"""
+Stage timings of the S-curve pipeline on synthetic registers.
+
+    python -m benchmarks.run_benchmarks                          # 1k, 10k and 100k rows
+    python -m benchmarks.run_benchmarks --sizes 1000000 --repeat 1
+    python -m benchmarks.run_benchmarks --compare                # best seconds per stage and commit
+
+Every run appends one JSON line per register size to benchmarks/results.jsonl with the git
+commit, library versions and the best-of-`--repeat` wall time of each stage, so a change can be
+compared with the commits before it on the same machine.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+from io import BytesIO
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from benchmarks.generate_eddr import generate_register, generate_review_history
+from scurve_engine import (
+    ScurveParams, read_register, prepare_register, parse_date_column,
+    add_expected_dates, milestone_date_bounds, build_timelines, build_progress_cube, weighted_curves,
+    project_recovery, discipline_tables, issuance_delays, compute_scurve
+)
+from figure_cache import render_png
+from scurve_charts import plot_scurve, plot_discipline_progress, plot_discipline_delay
+from review_timeline import (
+    detect_rev_review_pairs, melt_review_history, build_actual_segments, build_expected_segments, select_label_points,
+    plot_review_timeline
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_PATH = Path(__file__).resolve().parent / "results.jsonl"
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DATA_DATE = pd.Timestamp("2025-06-30")  # "today" of the generated registers
+
+STAGES = [
+    "load",                   # read_register on the CSV bytes
+    "parse_dates",            # prepare_register: column names, date parsing, numerics
+    "scurve_cumulatives",     # expected dates, progress cube, weekly timelines, weighted curves, recovery
+    "discipline_aggregates",  # discipline tables at final/today and the delay heatmap, sliced from the cube
+    "delay_table",            # issuance_delays
+    "compute_scurve",         # the whole compute_scurve call, for reference
+    "history_parse",          # Rev/Review pair dates of the review history sheet
+    "timeline_build",         # actual/expected segments and label points for the selected documents
+    "render_scurve",          # each render_* stage draws on a Figure and writes a PNG like st.pyplot
+    "render_discipline",
+    "render_review_timeline",
+]
+
+
+def best_time(fn, repeat):
+    """Best wall time of `repeat` calls and the result of the last call."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def scurve_cumulatives(df, params):
+    df = add_expected_dates(df.copy(deep=False), params.initial_date, params.ifa_delta_days, params.ift_delta_days)
+    start_date, ift_expected_max = milestone_date_bounds(df)
+    cube = build_progress_cube(df, flag_final=params.flag_final)
+    actual_timeline, expected_timeline = build_timelines(start_date, params.today, ift_expected_max,
+                                                         granularity=params.granularity, cube=cube)
+    as_of = {"final": max(params.today, ift_expected_max), "today": params.today}
+    components = {**cube.components(actual_timeline, expected_timeline, as_of), "cube": cube}
+    curves = weighted_curves(components, params.weights, actual_timeline, expected_timeline,
+                             start_date, params.today, ift_expected_max)
+    project_recovery(curves, start_date, params.today, ift_expected_max, params.recovery_factor)
+    return components, actual_timeline
+
+
+def discipline_aggregates(components, actual_timeline, params):
+    tables = discipline_tables(components, params.weights)
+    components["cube"].delay_by_week(actual_timeline, params.weights)
+    return tables
+
+
+def parse_history(history):
+    """Same work as dreview003.load_review_history after the sheet is read."""
+    df_hist = history.copy()
+    pairs = detect_rev_review_pairs(list(df_hist.columns)[4:])
+    for rev_c, revw_c in pairs:
+        df_hist[rev_c] = parse_date_column(df_hist[rev_c])
+        df_hist[revw_c] = parse_date_column(df_hist[revw_c])
+    return df_hist, pairs
+
+
+def build_timeline(df_hist, pairs, register, n_docs):
+    """Segments and label points for the first `n_docs` titles, as picked in the multiselect."""
+    df_sel = df_hist[df_hist[pairs[0][0]].notna()]
+    choices = sorted(df_sel["Document Title"].astype(str).unique().tolist())[:n_docs]
+    df_plot = df_sel[df_sel["Document Title"].astype(str).isin(choices)]
+    history = melt_review_history(df_plot, pairs, "Document Title")
+    actual_segments = build_actual_segments(history)
+    df_expected = register[register["Document Title"].astype(str).isin(choices)].drop_duplicates(subset=["Document Title"])
+    expected_segments = build_expected_segments(df_expected)
+    status_map = register.set_index("Document Title")["Status"].to_dict()
+    titles = sorted(history["title"].unique())
+    title_labels = [f"{t} [{status_map.get(t, 'Unknown')}]" for t in titles]
+    label_points = select_label_points(history)
+    return actual_segments, expected_segments, titles, title_labels, label_points
+
+
+def run_size(n_rows, repeat=3, timeline_docs=50, seed=0):
+    """Seconds per stage (best of `repeat`) for one synthetic register of `n_rows` documents."""
+    register = generate_register(n_rows, seed=seed, data_date=DATA_DATE)
+    history = generate_review_history(register, seed=seed, data_date=DATA_DATE)
+    csv_bytes = register.to_csv(index=False).encode("utf-8")
+    params = ScurveParams(today=DATA_DATE)
+    seconds = {}
+
+    seconds["load"], raw = best_time(lambda: read_register(BytesIO(csv_bytes), "csv"), repeat)
+    seconds["parse_dates"], df = best_time(lambda: prepare_register(raw.copy()), repeat)
+    seconds["scurve_cumulatives"], (components, actual_timeline) = best_time(lambda: scurve_cumulatives(df, params), repeat)
+    seconds["discipline_aggregates"], _ = best_time(lambda: discipline_aggregates(components, actual_timeline, params), repeat)
+    df_expected = add_expected_dates(df.copy(deep=False), params.initial_date, params.ifa_delta_days, params.ift_delta_days)
+    seconds["delay_table"], _ = best_time(lambda: issuance_delays(df_expected, params.today), repeat)
+    seconds["compute_scurve"], result = best_time(lambda: compute_scurve(df, params), repeat)
+
+    seconds["history_parse"], (df_hist, pairs) = best_time(lambda: parse_history(history), repeat)
+    seconds["timeline_build"], timeline = best_time(
+        lambda: build_timeline(df_hist, pairs, result.register, timeline_docs), repeat
+    )
+
+    def render_scurve():
+        fig = Figure(figsize=(10, 6))
+        plot_scurve(fig.subplots(), result)
+        return render_png(fig)
+
+    def render_discipline():
+        fig = Figure(figsize=(8, 5))
+        plot_discipline_progress(fig.subplots(), result.by_disc)
+        render_png(fig)
+        fig = Figure(figsize=(8, 5))
+        plot_discipline_delay(fig.subplots(), result.disc_delay)
+        return render_png(fig)
+
+    def render_review_timeline():
+        actual_segments, expected_segments, titles, title_labels, label_points = timeline
+        fig = Figure(figsize=(12, 1.1 * max(4, len(titles))))
+        plot_review_timeline(fig.subplots(), actual_segments, expected_segments, titles, title_labels, label_points)
+        return render_png(fig)
+
+    seconds["render_scurve"], _ = best_time(render_scurve, repeat)
+    seconds["render_discipline"], _ = best_time(render_discipline, repeat)
+    seconds["render_review_timeline"], _ = best_time(render_review_timeline, repeat)
+    return {stage: round(seconds[stage], 5) for stage in STAGES}
+
+
+def git_revision():
+    """Short HEAD hash and whether tracked files have uncommitted changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+
+def compare(results_path, sizes=None):
+    """Table of the latest timings per commit (columns, oldest first) for each stage and size."""
+    records = [json.loads(line) for line in Path(results_path).read_text().splitlines() if line.strip()]
+    if sizes:
+        records = [r for r in records if r["rows"] in sizes]
+    if not records:
+        return pd.DataFrame()
+    rows = [
+        {"rows": r["rows"], "stage": stage, "commit": r["commit"] + ("+" if r.get("dirty") else ""), "seconds": s}
+        for r in records for stage, s in r["seconds"].items()
+    ]
+    table = pd.DataFrame(rows).drop_duplicates(["rows", "stage", "commit"], keep="last")
+    commits = list(dict.fromkeys(table["commit"]))
+    table = table.pivot(index=["rows", "stage"], columns="commit", values="seconds")
+    order = {stage: i for i, stage in enumerate(STAGES)}
+    return table.reindex(columns=commits).sort_index(key=lambda idx: idx.map(order) if idx.name == "stage" else idx)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the S-curve pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None,
+                        help="Register sizes in rows (default: 1000 10000 100000; all recorded sizes with --compare)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the best time is kept")
+    parser.add_argument("--timeline-docs", type=int, default=50, help="Documents selected for the review timeline")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=str(RESULTS_PATH), help="JSON lines file the results are appended to")
+    parser.add_argument("--no-record", action="store_true", help="Print the timings without appending them")
+    parser.add_argument("--compare", action="store_true", help="Show recorded timings per commit and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with pd.option_context("display.width", 200, "display.max_rows", None):
+            print(compare(args.output, args.sizes))
+        return 0
+
+    commit, dirty = git_revision()
+    for n_rows in args.sizes or DEFAULT_SIZES:
+        seconds = run_size(n_rows, repeat=args.repeat, timeline_docs=args.timeline_docs, seed=args.seed)
+        record = {
+            "timestamp": pd.Timestamp.now().isoformat(timespec="seconds"),
+            "commit": commit,
+            "dirty": dirty,
+            "rows": n_rows,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "machine": platform.machine(),
+            "seconds": seconds,
+        }
+        print(f"{n_rows:>9,} rows  " + "  ".join(f"{stage}={s:.3f}s" for stage, s in seconds.items()), flush=True)
+        if not args.no_record:
+            with open(args.output, "a") as f:
+                f.write(json.dumps(record) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+"""
+Memory soak test of the dashboard: run dreview003 repeatedly in one process and check that
+resident memory stays flat.
+
+    python -m benchmarks.soak_app                      # 500 runs of a 500-row register
+    python -m benchmarks.soak_app --runs 100 --rows 5000 --warm --no-record
+
+Each run goes through Streamlit's AppTest with every lazy section open, the review timeline tab
+selected and `--timeline-docs` documents plotted. Unless `--warm` is given the rendered-figure
+cache is cleared before every run, so all figures are drawn and serialised again. After every
+run the matplotlib Figure objects still alive after a garbage collection are counted (the app
+keeps PNG bytes, never figures) along with the RSS. The test fails (exit code 1) if any figure
+outlives a run, if RSS grows by more than `--max-growth-mib` between the end of the warm-up and
+the last runs, or if the least-squares RSS slope after the warm-up exceeds `--max-slope-mib`
+per 100 runs. Unless `--no-record` is given the result is appended as one JSON line to
+benchmarks/soak_results.jsonl with the git commit, like run_benchmarks.
+"""
+import argparse
+import gc
+import json
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import matplotlib
+import pandas as pd
+import streamlit
+from matplotlib.figure import Figure
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.generate_eddr import generate_register, generate_review_history, write_eddr
+from benchmarks.run_benchmarks import git_revision
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_PATH = Path(__file__).resolve().parent / "soak_results.jsonl"
+SECTION_KEYS = [
+    "section_discipline_progress", "section_progress_charts", "section_nested_pie", "section_milestone_counts",
+    "section_delay_by_discipline", "section_final_milestone", "section_delay_table", "section_csv_export",
+]
+
+
+def app_script(register_path, root):
+    """AppTest script: dreview003 with the file uploader returning the generated register."""
+    import io
+    import sys
+    from pathlib import Path
+
+    import streamlit as st
+
+    sys.path.insert(0, root)
+    import dreview003
+
+    class Upload(io.BytesIO):
+        name = Path(register_path).name
+
+    st.sidebar.file_uploader = lambda *args, **kwargs: Upload(Path(register_path).read_bytes())
+    dreview003.main()
+
+
+def rss_mib():
+    """Current resident set size (Linux /proc), or the peak from getrusage elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        scale = 2**20 if sys.platform == "darwin" else 2**10
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def live_figures():
+    """matplotlib Figures still reachable after a full garbage collection."""
+    gc.collect()
+    return sum(isinstance(obj, Figure) for obj in gc.get_objects())
+
+
+def rss_slope(rss):
+    """Least-squares RSS growth in MiB per 100 runs."""
+    if len(rss) < 2:
+        return 0.0
+    return statistics.linear_regression(range(len(rss)), rss).slope * 100
+
+
+def soak(register_path, runs=500, window=20, timeline_docs=20, warm=False):
+    """
+    Run the app `runs` times; returns the RSS (MiB) and the live Figure count after each run.
+    """
+    import dreview003
+
+    at = AppTest.from_function(app_script, args=(str(register_path), str(ROOT)), default_timeout=600)
+    for key in SECTION_KEYS:
+        at.session_state[key] = True
+    at.session_state["dashboard_tab"] = "Review Timeline"
+    rss, figures = [], []
+    for i in range(runs):
+        if not warm:
+            dreview003.figure_cache.clear()
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"run {i + 1} failed: {at.exception[0].value}")
+        if i == 0 and at.multiselect:
+            at.multiselect[0].set_value(at.multiselect[0].options[:timeline_docs])
+        figures.append(live_figures())
+        rss.append(rss_mib())
+        if (i + 1) % window == 0 or i + 1 == runs:
+            print(f"run {i + 1:>4}  rss={rss[-1]:8.1f} MiB  live figures={figures[-1]}", flush=True)
+    return rss, figures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the dashboard repeatedly and check memory stays flat.")
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=500, help="Documents in the generated register")
+    parser.add_argument("--warmup", type=int, default=50, help="Runs before the baseline is taken")
+    parser.add_argument("--window", type=int, default=20, help="Runs averaged (median) for the baseline and the end")
+    parser.add_argument("--timeline-docs", type=int, default=20, help="Documents plotted in the review timeline")
+    parser.add_argument("--max-growth-mib", type=float, default=25.0, help="Allowed RSS growth after the warm-up")
+    parser.add_argument("--max-slope-mib", type=float, default=2.0,
+                        help="Allowed RSS slope after the warm-up, in MiB per 100 runs")
+    parser.add_argument("--warm", action="store_true", help="Keep the figure cache between runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=str(RESULTS_PATH), help="JSON lines file the result is appended to")
+    parser.add_argument("--no-record", action="store_true", help="Print the result without appending it")
+    args = parser.parse_args(argv)
+    if args.runs < args.warmup + 2 * args.window:
+        parser.error("--runs must cover the warm-up and two measurement windows")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        register = generate_register(args.rows, seed=args.seed)
+        path = write_eddr(Path(tmp) / "soak_eddr.xlsx", register, generate_review_history(register, seed=args.seed))
+        started = time.perf_counter()
+        rss, figures = soak(path, runs=args.runs, window=args.window,
+                            timeline_docs=args.timeline_docs, warm=args.warm)
+    seconds = time.perf_counter() - started
+
+    baseline = statistics.median(rss[args.warmup:args.warmup + args.window])
+    end = statistics.median(rss[-args.window:])
+    growth = end - baseline
+    slope = rss_slope(rss[args.warmup:])
+    print(f"{args.runs} runs in {seconds:.0f}s: RSS {baseline:.1f} MiB after warm-up, {end:.1f} MiB at the end "
+          f"({growth:+.1f} MiB, slope {slope:+.2f} MiB/100 runs), at most {max(figures)} live figures after a run")
+    failures = []
+    if max(figures):
+        failures.append(f"{max(figures)} Figure objects outlived a run")
+    if growth > args.max_growth_mib:
+        failures.append(f"RSS grew by {growth:.1f} MiB (limit {args.max_growth_mib} MiB)")
+    if slope > args.max_slope_mib:
+        failures.append(f"RSS slope {slope:.2f} MiB/100 runs (limit {args.max_slope_mib})")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+
+    if not args.no_record:
+        commit, dirty = git_revision()
+        record = {
+            "timestamp": pd.Timestamp.now().isoformat(timespec="seconds"),
+            "commit": commit,
+            "dirty": dirty,
+            "runs": args.runs,
+            "rows": args.rows,
+            "warmup": args.warmup,
+            "timeline_docs": args.timeline_docs,
+            "warm": args.warm,
+            "python": platform.python_version(),
+            "streamlit": streamlit.__version__,
+            "matplotlib": matplotlib.__version__,
+            "machine": platform.machine(),
+            "seconds": round(seconds, 1),
+            "rss_baseline_mib": round(baseline, 1),
+            "rss_end_mib": round(end, 1),
+            "rss_growth_mib": round(growth, 1),
+            "rss_slope_mib_per_100_runs": round(slope, 3),
+            "max_live_figures": max(figures),
+            "passed": not failures,
+        }
+        with open(args.output, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+DIAGNOSTICS_ENV_VAR = "SCURVE_DIAGNOSTICS"          # "1" turns diagnostics on by default
+DIAGNOSTICS_LOG_ENV_VAR = "SCURVE_DIAGNOSTICS_LOG"  # append JSON lines to this file instead of stderr
+
+logger = logging.getLogger("scurve.diagnostics")
+
+# tracemalloc is process-wide and every Streamlit session runs in the same process: tracing is
+# started by the first session that records diagnostics and stopped when the last one finishes.
+_tracing_lock = threading.Lock()
+_tracing_sessions = 0
+_started_tracing = False
+
+
+def _begin_tracing():
+    global _tracing_sessions, _started_tracing
+    with _tracing_lock:
+        if _tracing_sessions == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_sessions += 1
+
+
+def _end_tracing():
+    global _tracing_sessions, _started_tracing
+    with _tracing_lock:
+        _tracing_sessions -= 1
+        if _tracing_sessions == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+def diagnostics_enabled_by_env():
+    """Whether SCURVE_DIAGNOSTICS asks for diagnostics (1/true/yes/on)."""
+    return os.environ.get(DIAGNOSTICS_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def json_logger():
+    """The diagnostics logger, writing bare JSON lines to SCURVE_DIAGNOSTICS_LOG or stderr."""
+    if not logger.handlers:
+        log_path = os.environ.get(DIAGNOSTICS_LOG_ENV_VAR)
+        handler = logging.FileHandler(log_path) if log_path else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+class Diagnostics:
+    """
+    Wall time, peak traced memory, row count and figure count per dashboard section.
+    `section(name)` closes the previous top-level section and opens the next one, matching the
+    numbered blocks of the dashboard; `stage(name)` times a nested step inside the current section.
+    Peaks are measured with tracemalloc (relative to the memory in use when the step started) and
+    include nested steps. The traced peak is shared by the whole process, so it is only reset while
+    this is the one session recording; while several sessions record at once, a step's peak is the
+    process-wide high-water mark if that rose during the step (other sessions' allocations
+    included) and otherwise the larger of the memory in use at its start and end.
+    Disabled instances do nothing, so the calls can stay in place.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.records = []
+        self.context = {}
+        self._stack = []
+        self._tracing = False
+        self._started = time.perf_counter()
+
+    def _fold_peak(self, peak):
+        """Credit the traced peak to the open records it was reached under (it rose past their mark)."""
+        for record in self._stack:
+            if peak > record["_mark"]:
+                record["_peak"] = max(record["_peak"], peak)
+
+    def _open(self, name, rows=None):
+        if not self._tracing:
+            _begin_tracing()
+            self._tracing = True
+        with _tracing_lock:
+            current, peak = tracemalloc.get_traced_memory()
+            self._fold_peak(peak)
+            if _tracing_sessions == 1:
+                tracemalloc.reset_peak()
+                current, peak = tracemalloc.get_traced_memory()
+                for record in self._stack:
+                    record["_mark"] = peak
+        record = {
+            "stage": name, "level": len(self._stack), "seconds": None, "peak_mb": None,
+            "rows": rows, "figures": 0,
+            "_start": time.perf_counter(), "_base": current, "_mark": peak, "_peak": current,
+        }
+        self.records.append(record)
+        self._stack.append(record)
+        return record
+
+    def _close(self):
+        current, peak = tracemalloc.get_traced_memory()
+        self._fold_peak(peak)
+        record = self._stack.pop()
+        peak = max(record["_peak"], current)
+        record["seconds"] = round(time.perf_counter() - record["_start"], 4)
+        record["peak_mb"] = round((peak - record["_base"]) / 2**20, 2)
+        if self._stack:
+            self._stack[-1]["_peak"] = max(self._stack[-1]["_peak"], peak)
+
+    def section(self, name, rows=None):
+        """End the current section (and any open stages) and start timing `name`."""
+        if not self.enabled:
+            return
+        while self._stack:
+            self._close()
+        self._open(name, rows)
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Time a nested step of the current section."""
+        if not self.enabled:
+            yield
+            return
+        self._open(name, rows)
+        try:
+            yield
+        finally:
+            self._close()
+
+    def set_rows(self, rows):
+        """Row count of the innermost open section/stage, when it is only known at the end."""
+        if self.enabled and self._stack:
+            self._stack[-1]["rows"] = int(rows)
+
+    def figure(self, count=1):
+        """Count figures rendered in the open section and stages."""
+        if self.enabled:
+            for record in self._stack:
+                record["figures"] += count
+
+    def finish(self):
+        """Close everything still open and stop tracemalloc if no other session is still recording."""
+        while self._stack:
+            self._close()
+        if self._tracing:
+            _end_tracing()
+            self._tracing = False
+
+    def stages(self):
+        """Finished records without the internal bookkeeping fields."""
+        return [{k: v for k, v in r.items() if not k.startswith("_")} for r in self.records if r["seconds"] is not None]
+
+    def to_frame(self):
+        """Table for display; nested stages are indented under their section."""
+        table = pd.DataFrame(self.stages(), columns=["stage", "level", "seconds", "peak_mb", "rows", "figures"])
+        table["stage"] = [("  " * level + "↳ " if level else "") + name for name, level in zip(table["stage"], table["level"])]
+        table["rows"] = table["rows"].astype("Int64")
+        return table.drop(columns="level").rename(columns={
+            "stage": "Section", "seconds": "Wall time (s)", "peak_mb": "Peak memory (MiB)",
+            "rows": "Rows", "figures": "Figures",
+        })
+
+    def log_line(self):
+        """Emit one JSON line with the context, total time and every stage."""
+        record = {
+            "event": "dashboard_diagnostics",
+            "timestamp": pd.Timestamp.now().isoformat(timespec="seconds"),
+            **self.context,
+            "total_seconds": round(time.perf_counter() - self._started, 4),
+            "stages": self.stages(),
+        }
+        line = json.dumps(record, default=str)
+        json_logger().info(line)
+        return line
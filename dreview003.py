@@ -1,105 +1,423 @@
-import re
+import hashlib
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import datetime as dt
+import matplotlib
+from matplotlib.figure import Figure
 import numpy as np
 import seaborn as sns
 from cycler import cycler
 import openpyxl
-from openpyxl.styles import PatternFill
 from io import BytesIO
+from scurve_engine import (
+    parse_date_column, read_register, prepare_register, compact_register, restore_prepared_dtypes,
+    milestone_components, discipline_tables, GRANULARITIES, ScurveParams, compute_scurve, stream_histograms, compute_scurve_from_histograms,
+    MILESTONE_STATES, DOC_STATUSES, EXPECTED_COLUMNS, final_milestones, document_statuses, DELAY_THRESHOLD_DAYS,
+    most_overdue
+)
+from scurve_charts import SCURVE_FIELDS, plot_scurve, plot_discipline_progress, plot_discipline_delay, plot_delay_heatmap
+from figure_cache import FigureCache, fingerprint
+from excel_export import delays_workbook, analytics_workbook
+from diagnostics import Diagnostics, diagnostics_enabled_by_env, DIAGNOSTICS_ENV_VAR
+from review_timeline import (
+    detect_rev_review_pairs, melt_review_history, build_actual_segments, build_expected_segments, select_label_points,
+    timeline_page, plot_review_timeline, review_table, TIMELINE_PAGE_SIZES
+)
+
+matplotlib.rcParams.update({'font.size': 8})
+
+STREAM_CHUNK_ROWS = 100_000  # rows per chunk when streaming a CSV register
+FIGURE_CACHE_MB = 64  # size cap of the rendered-figure cache shared by all sessions
+TABLE_PAGE_SIZES = [25, 50, 100, 250]  # rows per page of the paged tables
+DISPLAY_DATE_FORMAT = "%d-%b-%y"  # dates formatted as text in the tables
+
+def add_status_columns(df):
+    """
+    Per-document status columns used by the charts and written to the updated CSV: Doc_Status,
+    Issued/Review/Reply 0/1 flags and FinalMilestone. Added on first use, so sections that stay
+    collapsed don't compute them.
+    """
+    if "FinalMilestone" in df.columns:
+        return df
+    df["Doc_Status"] = document_statuses(df)
+    df["Issued_bool"] = df["Issued by EPC"].notna().astype(int)
+    df["Review_bool"] = df["Review By OE"].notna().astype(int)
+    df["Reply_bool"] = df["Reply By EPC"].notna().astype(int)
+    df["FinalMilestone"] = final_milestones(df)
+    return df
+
+def milestone_status_counts(df):
+    """Documents per final milestone (rows, in MILESTONE_STATES order) and Status (columns)."""
+    add_status_columns(df)
+    return pd.crosstab(df["FinalMilestone"], df["Status"]).reindex(MILESTONE_STATES).dropna(how="all")
+
+def export_register(df):
+    """
+    The register as written to the updated CSV: status columns added, man-hours and Flag in their
+    uploaded dtypes (compact_register shrinks them) and expected dates as text. Columns keep the
+    order the dashboard always wrote: the progress at final, the Doc_Status and 0/1 flags, the
+    progress today, then FinalMilestone.
+    """
+    df_for_export = restore_prepared_dtypes(add_status_columns(df).copy())
+    status_columns = ["Doc_Status", "Issued_bool", "Review_bool", "Reply_bool"]
+    columns = [col for col in df_for_export.columns if col not in status_columns]
+    today_at = columns.index("Actual_Progress_Today")
+    df_for_export = df_for_export[columns[:today_at] + status_columns + columns[today_at:]]
+    for col in EXPECTED_COLUMNS:
+        df_for_export[col] = df[col].dt.strftime(DISPLAY_DATE_FORMAT).fillna("")
+    return df_for_export
+
+def st_notify(level, message):
+    """`notify` callback for scurve_engine: show the message as st.info / st.warning / st.error."""
+    getattr(st, level)(message)
+
+@st.cache_resource
+def figure_cache():
+    """Rendered charts shared by every session of this server, least recently used evicted past FIGURE_CACHE_MB."""
+    return FigureCache(max_bytes=FIGURE_CACHE_MB * 2**20)
+
+def chart_rc(chart_style):
+    """
+    rcParams of the sidebar styling: seaborn style and context, and the colour scheme's colour
+    cycle. Charts are drawn under these with matplotlib.rc_context rather than by changing the
+    process-wide rcParams, which every session shares.
+    """
+    rc = {**sns.axes_style(chart_style["style"]),
+          **sns.plotting_context(chart_style["context"], font_scale=chart_style["font_scale"])}
+    if chart_style["color_scheme"] == "Standard":
+        rc["axes.prop_cycle"] = matplotlib.rcParamsDefault['axes.prop_cycle']
+    elif chart_style["color_scheme"] == "Shades of Blue":
+        rc["axes.prop_cycle"] = cycler(color=["#cce5ff", "#99ccff", "#66b2ff", "#3399ff", "#007fff"])
+    elif chart_style["color_scheme"] == "Shades of Green":
+        rc["axes.prop_cycle"] = cycler(color=["#ccffcc", "#99ff99", "#66ff66", "#33cc33", "#009900"])
+    else:
+        rc["axes.prop_cycle"] = cycler(color=sns.color_palette(chart_style["palette"], n_colors=10))
+    return rc
 
-plt.rcParams.update({'font.size': 8})
+def show_figure(name, inputs, chart_style, draw, diagnostics):
+    """
+    Show the chart `draw()` builds (a Figure), served as cached PNG bytes while `inputs` (the data
+    it plots) and `chart_style` (the sidebar styling) are unchanged. The figure is drawn under
+    chart_rc(chart_style). Only figures actually drawn are counted for the diagnostics panel.
+    """
+    png, hit = figure_cache().render((name, fingerprint(inputs, chart_style)), draw, rc=chart_rc(chart_style))
+    st.image(png, width="stretch")
+    if not hit:
+        diagnostics.figure()
 
-def robust_parse_date(d):
+def lazy_section(label, key, expanded=False):
     """
-    Enhanced date parser that handles multiple formats and converts to standard format
-    Returns: 
-        - pd.Timestamp for valid dates
-        - pd.NaT for invalid dates
+    Expander for a dashboard section that is only computed while open. Streamlit keeps the open
+    state per session under `key` and reruns when it is toggled; check `.open` before rendering.
     """
-    if pd.isna(d) or d in ['', '########', '0-Jan-00', '00-Jan-00', 'NaN', 'NaT']:
-        return pd.NaT
-    
-    if isinstance(d, pd.Timestamp):
-        return d
-    
-    if isinstance(d, dt.datetime):
-        return pd.Timestamp(d)
-    
-    if isinstance(d, str):
-        # Normalize case for month abbreviations
-        d = d.upper()
-        if re.match(r'^\d{2}-[A-Z]{3}-\d{2}$', d):
-            try:
-                parsed = pd.to_datetime(d, format='%d-%b-%y', errors='coerce')
-                if pd.notna(parsed):
-                    return parsed
-            except Exception as e:
-                st.warning(f"Failed to parse date '{d}' with format '%d-%b-%y': {str(e)}")
-        
-        date_formats = [
-            '%d-%b-%y', '%d-%B-%y', '%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d',
-            '%b %d, %Y', '%B %d, %Y', '%d.%m.%Y', '%Y%m%d', '%m-%d-%Y', '%d %b %Y'
-        ]
-        
-        for fmt in date_formats:
-            try:
-                parsed = pd.to_datetime(d, format=fmt, errors='coerce')
-                if pd.notna(parsed):
-                    return parsed
-            except Exception as e:
-                pass
-        
-        try:
-            parsed = pd.to_datetime(d, errors='coerce')
-            if pd.notna(parsed):
-                return parsed
-        except Exception as e:
-            pass
-        
-        st.warning(f"Could not parse date: '{d}'")
+    return st.expander(label, expanded=expanded, key=key, on_change="rerun")
+
+def paged_table(df, key, date_columns=(), highlight=None):
+    """
+    st.dataframe of one page of `df`, filtered and sorted here rather than in the browser, so only
+    the visible rows are styled and sent. `date_columns` hold DISPLAY_DATE_FORMAT text and sort as
+    dates. `highlight` is (column, css, rule): `rule` maps that column of the page to a boolean
+    mask and the matching cells get `css`. Widget state is kept under `key`-prefixed keys.
+    """
+    filter_col, sort_col, order_col, size_col, page_col = st.columns([3, 3, 2, 2, 3])
+    text = filter_col.text_input("Filter", key=f"{key}_filter", placeholder="Text in any column")
+    sort_by = sort_col.selectbox("Sort by", ["(table order)", *df.columns], key=f"{key}_sort")
+    descending = order_col.toggle("Descending", key=f"{key}_descending")
+    page_size = size_col.selectbox("Rows per page", TABLE_PAGE_SIZES, key=f"{key}_page_size")
+
+    n_total = len(df)
+    if text:
+        matches = np.zeros(n_total, dtype=bool)
+        for col in df.columns:
+            matches |= df[col].astype(str).str.contains(text, case=False, regex=False).to_numpy()
+        df = df[matches]
+    if sort_by in df.columns:
+        as_date = lambda col: pd.to_datetime(col, format=DISPLAY_DATE_FORMAT, errors="coerce")
+        df = df.sort_values(sort_by, ascending=not descending, kind="stable",
+                            key=as_date if sort_by in date_columns else None)
+
+    n_pages = max(1, -(-len(df) // page_size))
+    page = page_col.selectbox("Page", range(n_pages), key=f"{key}_page", disabled=n_pages == 1,
+                              format_func=lambda p: f"Page {p + 1} of {n_pages}")
+    page_df = df.iloc[page * page_size:(page + 1) * page_size]
+    shown = f"Rows {page * page_size + 1}–{page * page_size + len(page_df)} of {len(df)}" if len(page_df) else "No rows"
+    st.caption(shown + (f" (filtered from {n_total})" if text else ""))
+
+    if highlight is not None:
+        column, css, rule = highlight
+        page_df = page_df.style.apply(lambda col: np.where(rule(col), css, ""), subset=[column])
+    st.dataframe(page_df, hide_index=True, width="stretch")
+
+def file_content_hash(file_bytes):
+    """Content hash of an uploaded file, used as the cache key for everything parsed from it."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+@st.cache_data(show_spinner="Loading register...", max_entries=8)
+def load_register(_file_bytes, file_hash, file_extension, ignore_status, _diagnostics=Diagnostics()):
+    """
+    Read the uploaded register, assign the template column names, drop ignored statuses, parse
+    milestone dates and numeric columns and compact the dtypes (see compact_register).
+    Cached on the file's content hash and the ignored statuses, so sidebar changes to weights,
+    dates or styling reuse the parsed frame instead of re-reading the file.
+    Returns:
+        - the prepared DataFrame
+        - None if no rows remain after status filtering
+    """
+    with _diagnostics.stage("read file"):
+        df = read_register(BytesIO(_file_bytes), file_extension)
+    with _diagnostics.stage("parse dates & columns", rows=len(df)):
+        df = prepare_register(df, ignore_status, notify=st_notify)
+    if df is None:
+        return None
+    with _diagnostics.stage("compact dtypes", rows=len(df)):
+        return compact_register(df)
+
+@st.cache_data(show_spinner="Loading review history...", max_entries=8)
+def load_review_history(_file_bytes, file_hash):
+    """
+    Read the 'Review Historical record' sheet and parse the dates of every detected Rev/Review pair.
+    Cached on the file's content hash.
+    Returns:
+        - the history DataFrame (dates parsed when the sheet has ≥6 columns)
+        - None if the sheet is missing
+    """
+    try:
+        df_hist = pd.read_excel(BytesIO(_file_bytes), sheet_name="Review Historical record")
+    except Exception:
+        return None
+    orig_cols = list(df_hist.columns)
+    if len(orig_cols) < 6:
+        return df_hist
+    for rev_c, revw_c in detect_rev_review_pairs(orig_cols[4:]):
+        df_hist[rev_c] = parse_date_column(df_hist[rev_c], notify=st_notify)
+        df_hist[revw_c] = parse_date_column(df_hist[revw_c], notify=st_notify)
+    return df_hist
+
+@st.cache_data(show_spinner="Streaming register...", max_entries=8)
+def stream_register(_file_bytes, file_hash, ignore_status, initial_date, ifa_delta_days, ift_delta_days, today,
+                    delay_threshold_days):
+    """
+    Chunked read of a large CSV register into per-milestone histograms (see stream_histograms).
+    Cached on the file hash and the settings the histograms depend on; weights and the recovery
+    factor are applied afterwards.
+    Returns the histograms, or None if no rows remain after status filtering.
+    """
+    params = ScurveParams(initial_date=pd.Timestamp(initial_date), ifa_delta_days=ifa_delta_days,
+                          ift_delta_days=ift_delta_days, today=today, delay_threshold_days=delay_threshold_days)
+    return stream_histograms(BytesIO(_file_bytes), params, ignore_status, chunksize=STREAM_CHUNK_ROWS, notify=st_notify)
+
+@st.cache_data(max_entries=8)
+def cached_milestone_components(_df, data_key, as_of):
+    """
+    Progress cube and per-document milestone hours (see milestone_components).
+    Keyed on `data_key` (file hash, ignored statuses, expected-date settings) and the as-of dates
+    instead of hashing the frame, which follows from those, so weight, recovery-factor and
+    granularity changes never rescan the rows.
+    """
+    return milestone_components(_df, as_of, flag_final=True)
+
+def show_discipline_delay(disc_delay, chart_style, diagnostics, as_of=None):
+    """Section 11: delay percentage by discipline as of today (or the slider's date), chart and table."""
+    st.subheader(f"Delay Percentage by Discipline (As of {as_of:%d-%b-%y})" if as_of is not None
+                 else "Delay Percentage by Discipline (As of Today)")
+    def draw():
+        fig_delay = Figure(figsize=(8,5))
+        ax_delay = fig_delay.subplots()
+        plot_discipline_delay(ax_delay, disc_delay, show_grid=chart_style["show_grid"], as_of=as_of)
+        return fig_delay
+    show_figure("discipline delay", (disc_delay, as_of), chart_style, draw, diagnostics)
+    st.write("Detailed Delay Data:")
+    paged_table(disc_delay.reset_index(), "disc_delay_table")
+
+def show_delay_heatmap(result, weights, chart_style, diagnostics):
+    """Section 11: delay percentage by discipline and week up to today, sliced from the progress cube."""
+    st.subheader("Delay Percentage by Discipline and Week")
+    delay_by_week = result.delay_by_week(weights)
+    if delay_by_week.empty:
+        st.warning("No Discipline data available for the delay heatmap.")
+        return
+    def draw():
+        fig_heat = Figure(figsize=(10, max(3, 0.45 * len(delay_by_week.index) + 1.5)))
+        ax_heat = fig_heat.subplots()
+        plot_delay_heatmap(ax_heat, delay_by_week, show_grid=chart_style["show_grid"])
+        return fig_heat
+    show_figure("delay heatmap", delay_by_week, chart_style, draw, diagnostics)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_analytics_workbook(_result, _df, export_key, delay_threshold_days):
+    """
+    The analytics workbook (see excel_export.analytics_workbook) of the current computation.
+    Keyed on `export_key` (file hash, ignored statuses and every ScurveParams field) instead of
+    hashing the result, which follows from those, so repeat downloads are served from the cache.
+    """
+    if _df is None:
+        return analytics_workbook(_result, delay_threshold_days)
+    return analytics_workbook(_result, delay_threshold_days, register=export_register(_df),
+                              milestone_status=milestone_status_counts(_df))
+
+def show_analytics_export(result, df, export_key, delay_threshold_days):
+    """Download of the whole computation as one workbook, built on the first click."""
+    st.subheader("Download Analytics Workbook")
+    st.caption("S-curve series, discipline tables, " + ("final milestone by status, " if df is not None else "")
+               + "delay table" + (" and the annotated register" if df is not None else "") + ", one sheet each.")
+    st.download_button(
+        label="Download Analytics Workbook (Excel)",
+        data=lambda: cached_analytics_workbook(result, df, export_key, delay_threshold_days),
+        file_name="scurve_analytics.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore"
+    )
+
+def show_delay_table(df_display, threshold_days=DELAY_THRESHOLD_DAYS):
+    """
+    Section 13: styled table of documents issued `threshold_days` or more late, or only the K
+    most overdue of them, with an Excel download of the whole table.
+    """
+    st.subheader(f"Document Delays (Issued by EPC vs Expected Issuance, ≥{threshold_days} Days)")
     
-    return pd.NaT
-
-def is_rev_col(col_name):
-    """Check if column name matches a revision-like pattern (e.g., Rev0, Revision 1)."""
-    col_norm = normalize_header(col_name)
-    return bool(re.search(r'rev(ision)?\s*\d+', col_norm, re.IGNORECASE))
-
-def is_review_col(col_name):
-    """Check if column name matches a review-like pattern (e.g., Reviewed0, Review Date)."""
-    col_norm = normalize_header(col_name)
-    return bool(re.search(r'review(ed)?(\s*date)?\s*\d*', col_norm, re.IGNORECASE))
-
-def normalize_header(h):
-    """Normalize header by removing extra spaces and converting to lowercase."""
-    return ' '.join(str(h).lower().split())
-
-def get_final_milestone(row):
-    issued = pd.notna(row["Issued by EPC"])
-    reviewed = pd.notna(row["Review By OE"])
-    replied = pd.notna(row["Reply By EPC"])
-    flag = int(row.get("Flag", 0)) == 1
-
-    if replied and reviewed and issued and flag:
-        return "Finalized"
-    elif replied and reviewed and issued:
-        return "Reply By EPC"
-    elif reviewed and issued:
-        return "Review By OE"
-    elif issued:
-        return "Issued by EPC"
+    if df_display.empty:
+        st.warning(f"No documents have an issuance delay of {threshold_days} days or more.")
     else:
-        return "NO ISSUANCE"
+        mode_col, k_col = st.columns([3, 1])
+        mode = mode_col.radio("Show", ["All delayed documents", "Most overdue"], horizontal=True, key="delay_table_mode")
+        if mode == "Most overdue":
+            top_k = k_col.number_input("Documents", min_value=1, value=100, step=10, key="delay_table_top_k")
+            df_shown = most_overdue(df_display, int(top_k))
+            st.caption(f"{len(df_shown)} most overdue of {len(df_display)} delayed documents")
+        else:
+            df_shown = df_display
 
-def main():
-    st.set_page_config(page_title="S-Curve Analysis", layout="wide")
+        # Light red for delayed documents, applied to the visible page only
+        paged_table(df_shown, "delay_table", date_columns=["Issuance Expected", "Actual Issued"],
+                    highlight=("Delay (days)", "background-color: #ffcccc", lambda days: days >= threshold_days))
+        
+        # Excel export, built only when the button is clicked
+        st.download_button(
+            label="Download Delays Table (Excel)",
+            data=lambda: delays_workbook(df_display, threshold_days),
+            file_name="document_delays.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            on_click="ignore"
+        )
 
-    # Create tabs
-    tab1, tab2 = st.tabs(["S-Curve Analysis", "Review Timeline"])
+def review_timeline_tab(file_extension, file_bytes, file_hash, df, chart_style, diagnostics):
+    """Tab 2: submission ➜ review timeline of the selected documents from the 'Review Historical record' sheet."""
+    # =====================================================================================
+    # TAB 2 — REVIEW TIMELINE (doc titles with status in brackets; 2-line tags; selective labeling)
+    # =====================================================================================
+    if file_extension not in ['xlsx', 'xls']:
+        st.info("The **Review Timeline** requires an **Excel** file with a sheet named **'Review Historical record'**.")
+        return
+
+    with diagnostics.stage("load review history"):
+        df_hist = load_review_history(file_bytes, file_hash)
+    if df_hist is None:
+        st.warning("Could not find a sheet named **'Review Historical record'** in the uploaded Excel file.")
+        return
+
+    orig_cols = list(df_hist.columns)
+    if len(orig_cols) < 6:
+        st.error("The 'Review Historical record' sheet doesn't have the expected structure (need ≥6 columns).")
+        return
+
+    base_cols = orig_cols[:4]      # ID, Discipline, Area, Document Title (expected)
+    tail_cols = orig_cols[4:]      # Rev/Reviewed pairs
+
+    # Build Rev/Reviewed pairs using ORIGINAL names, pattern-matching on normalized strings
+    pairs = detect_rev_review_pairs(tail_cols)
+
+    if not pairs:
+        st.error("No valid (RevX, Review/Reviewed) pairs detected.")
+        st.write("Columns from 5th onward:", tail_cols)
+        return
+
+    with st.expander("Detected column pairs", expanded=False):
+        st.write(pairs)
+
+    # Dates in all Rev/Review columns were parsed by load_review_history
+
+    # Filter rows where first Rev column (e.g., Rev0) is not null
+    first_rev_col = pairs[0][0]
+    df_sel = df_hist[df_hist[first_rev_col].notna()].copy()
+    if df_sel.empty:
+        st.warning(f"No rows have a non-null **{first_rev_col}** (initial submission). Nothing to plot.")
+        return
+
+    # Build display label: use **Document Title only** on the y-axis to make space
+    title_candidates = ["Document Title", "Title", base_cols[min(3, len(base_cols)-1)]]
+    title_col = next((c for c in title_candidates if c in df_sel.columns), title_candidates[-1])
+
+    # Select by Title
+    st.subheader("Select Documents to Plot")
+    choices = st.multiselect(
+        "Choose one or more documents (must have initial submission date).",
+        options=sorted(df_sel[title_col].astype(str).unique().tolist())
+    )
+    if not choices:
+        st.info("Select at least one document title to render the timeline.")
+        return
+
+    df_plot = df_sel[df_sel[title_col].astype(str).isin(choices)].copy()
+
+    # Build actual segments (title, rev_tag, submit, review) for ALL pairs, in plotting order
+    with diagnostics.stage("build segments", rows=len(df_plot)):
+        history = melt_review_history(df_plot, pairs, title_col)
+        actual_segments = build_actual_segments(history)
+    if not actual_segments:
+        st.warning("No valid submission dates found to plot.")
+        return
+
+    # Build expected segments from first sheet (Issuance Expected, Expected review, Final Issuance Expected)
+    df_expected = df[df["Document Title"].astype(str).isin(choices)].drop_duplicates(subset=["Document Title"])  # Ensure unique titles
+    expected_segments = build_expected_segments(df_expected)
+    if not expected_segments:
+        st.warning("No valid expected dates found for selected documents in the first sheet.")
+        # Proceed with actual segments only
+
+    # y-axis (one row per document title with status in brackets)
+    status_map = df.set_index("Document Title")["Status"].to_dict()
+    titles = sorted(history["title"].unique())
+    # Append status to titles for y-axis labels
+    title_labels = [f"{t} [{status_map.get(t, 'Unknown')}]" for t in titles]
+
+    # Identify first and last points to label for each document
+    label_points = select_label_points(history)
+
+    # Debug: Show which points will be labeled
+    with st.expander("Points Selected for Labeling", expanded=False):
+        st.write(label_points)
+
+    # Plot — two-line labels with above/below placement and selective labeling
+    st.subheader("Review Timeline (Submission ➜ Review with Expected Dates)")
+    # One page of documents per figure: the height grows with the titles plotted, so a large
+    # selection is split rather than rendered as one very tall image. Each page is cached separately.
+    page_col, size_col = st.columns([3, 1])
+    page_size = size_col.selectbox("Documents per page", TIMELINE_PAGE_SIZES, index=1, key="timeline_page_size")
+    n_pages = -(-len(titles) // page_size)
+    page = page_col.selectbox(
+        "Page", range(n_pages), key="timeline_page", disabled=n_pages == 1,
+        format_func=lambda p: f"Page {p + 1} of {n_pages}: documents {p*page_size + 1}–{min((p + 1)*page_size, len(titles))}"
+    )
+    page_actual, page_expected, page_titles, page_labels, page_points = timeline_page(
+        actual_segments, expected_segments, titles, title_labels, label_points, page, page_size
+    )
+    with diagnostics.stage("plot timeline", rows=len(page_actual)):
+        def draw():
+            fig_t = Figure(figsize=(12, 1.1*max(4, len(page_titles))))  # Increased height for more labels
+            ax_t = fig_t.subplots()
+            plot_review_timeline(ax_t, page_actual, page_expected, page_titles, page_labels, page_points,
+                                 show_grid=chart_style["show_grid"])
+            return fig_t
+        show_figure("review timeline", (page_actual, page_expected, page_labels, page_points),
+                    chart_style, draw, diagnostics)
+
+    # Compact table of plotted items (actual + expected)
+    st.markdown("**Plotted Revisions and Expected Dates (compact table)**")
+    paged_table(review_table(actual_segments, expected_segments, titles), "review_table",
+                date_columns=["Submission", "Review", "First Submission", "Document Review", "Final Submission"])
+
+def run_dashboard(diagnostics):
+    # Create tabs; tab 1 always runs (it holds the sidebar), the review timeline only while selected
+    tab1, tab2 = st.tabs(["S-Curve Analysis", "Review Timeline"], key="dashboard_tab", on_change="rerun")
 
     with tab1:
         # ----------------------------------------------------------------
@@ -134,7 +452,22 @@ def main():
 
         IGNORE_STATUS = st.sidebar.text_input("Status to Ignore (comma-separated, case-sensitive, leave blank to include all)", value="")
         PERCENTAGE_VIEW = st.sidebar.checkbox("Show values as percentage of total", value=False)
+        TIMELINE_GRANULARITY = st.sidebar.selectbox(
+            "S-Curve Timeline", GRANULARITIES, index=GRANULARITIES.index("weekly"),
+            format_func=lambda g: "Exact (every milestone date)" if g == "exact" else g.capitalize(),
+            help="Sampling of the S-curve and progress breakdown. Exact steps at every milestone event date."
+        )
+        DELAY_THRESHOLD = st.sidebar.number_input(
+            "Delay Threshold (days)", value=DELAY_THRESHOLD_DAYS, min_value=0, step=1,
+            help="Minimum delay of Issued by EPC after Issuance Expected for a document to be listed in the delays table."
+        )
         INCLUDE_COMPLETED = st.sidebar.checkbox("Include Completed Documents (Flag=1) in Delays Table", value=True)
+        STREAM_CSV = st.sidebar.checkbox(
+            "Stream large CSV files in chunks", value=False,
+            help="Keeps memory bounded by the chunk size for very large CSV registers. Only the S-curve, "
+                 "discipline and delay views are available in this mode."
+        )
+        as_of_slot = st.sidebar.container()  # as-of date slider, filled once the date range is known
 
         st.sidebar.markdown("---")
         st.sidebar.markdown("### Visualization Settings")
@@ -161,15 +494,24 @@ def main():
         font_scale = st.sidebar.slider("Font Scale", min_value=0.5, max_value=2.0, value=1.0, step=0.1)
         show_grid = st.sidebar.checkbox("Show Grid Lines", value=True)
 
-        sns.set_style(seaborn_style)
-        sns.set_context(seaborn_context, font_scale=font_scale)
-
         st.sidebar.markdown("### S-Curve Color Scheme")
         actual_color = st.sidebar.color_picker("Actual Progress Color", "#1f77b4")
         expected_color = st.sidebar.color_picker("Expected Progress Color", "#ff7f0e")
         projected_color = st.sidebar.color_picker("Projected Recovery Color", "#2ca02c")
         today_color = st.sidebar.color_picker("Today Line Color", "#000000")
         end_date_color = st.sidebar.color_picker("End Date Line Color", "#d62728")
+        # Sidebar styling every chart depends on; part of each rendered-figure cache key
+        chart_style = {
+            "style": seaborn_style, "context": seaborn_context, "font_scale": font_scale,
+            "color_scheme": color_scheme, "palette": seaborn_palette, "show_grid": show_grid,
+        }
+
+        st.sidebar.markdown("### Diagnostics")
+        diagnostics.enabled = st.sidebar.checkbox(
+            "Record time and memory per section", value=diagnostics_enabled_by_env(),
+            help=("Shows a table at the bottom of the sidebar and logs it as a JSON line. Memory tracing "
+                  f"slows the app down while on, so compare timings between runs with it on. Default from {DIAGNOSTICS_ENV_VAR}.")
+        )
 
         if CSV_INPUT_PATH is None:
             st.warning("Please upload your input CSV or Excel file or download the template above.")
@@ -178,1103 +520,426 @@ def main():
         # --------------------------
         # 2) LOAD CSV OR EXCEL & PREP DATA WITH ROBUST DATE PARSING
         # --------------------------
+        diagnostics.section("2) Load & parse register")
         file_extension = CSV_INPUT_PATH.name.split('.')[-1].lower()
-        if file_extension in ['xlsx', 'xls']:
-            df = pd.read_excel(CSV_INPUT_PATH)
-        else:
-            df = pd.read_csv(CSV_INPUT_PATH)
-
-        # Define the full column list including the 10 new columns
-        expected_columns = [
-            "ID", "Discipline", "Area", "Document Title", "Project Indentifer", "Originator",
-            "Document Number", "Document Type ", "Counter ", "Revision", "Area code",
-            "Disc", "Category", "Transmittal Code", "Comment Sheet OE", "Comment Sheet EPC",
-            "Schedule [Days]", "Issued by EPC", "Issuance Expected", "Review By OE",
-            "Expected review", "Reply By EPC", "Final Issuance Expected",
-            "Review1", "ReSub1", "Review2", "ReSub2", "Review3", "ReSub3",
-            "Review4", "ReSub4", "Review5", "ReSub5",
-            "Man Hours ", "Status", "CS rev", "Flag"
-        ]
-        df.columns = expected_columns[:len(df.columns)]  # Assign only up to the number of columns present
-
-        if IGNORE_STATUS.strip():
-            statuses_to_exclude = [s.strip() for s in IGNORE_STATUS.split(',') if s.strip()]
-            initial_len = len(df)
-            df = df[~df["Status"].isin(statuses_to_exclude)]
-            filtered_len = len(df)
-            if filtered_len < initial_len:
-                st.info(f"Filtered out {initial_len - filtered_len} rows with Status in: {', '.join(statuses_to_exclude)}")
-            if filtered_len == 0:
-                st.error(f"All rows have Status in exclusion list. No data remains after filtering.")
-                return
-
-        date_columns = ["Issued by EPC", "Review By OE", "Reply By EPC", "Issuance Expected", "Expected review", "Final Issuance Expected"]
-        for col in date_columns:
-            df[col] = df[col].apply(robust_parse_date)
-            na_count = df[col].isna().sum()
-            if na_count > 0:
-                st.warning(f"Column '{col}' has {na_count} dates that couldn't be parsed")
-
-        df["Schedule [Days]"] = pd.to_numeric(df["Schedule [Days]"], errors="coerce").fillna(0)
-        df["Man Hours "] = pd.to_numeric(df["Man Hours "], errors="coerce").fillna(0)
-        df["Flag"] = pd.to_numeric(df["Flag"], errors="coerce").fillna(0)
-
-        df["Issuance Expected"] = pd.Timestamp(INITIAL_DATE) + pd.to_timedelta(df["Schedule [Days]"], unit="D")
-        df["Expected review"] = df["Issuance Expected"] + dt.timedelta(days=IFA_DELTA_DAYS)
-        df["Final Issuance Expected"] = df["Expected review"] + dt.timedelta(days=IFT_DELTA_DAYS)
-        df["Final Issuance Expected"] = pd.to_datetime(df["Final Issuance Expected"], errors='coerce')
-
-        ift_expected_max = df["Final Issuance Expected"].dropna().max()
-        if pd.isna(ift_expected_max):
-            st.warning("No valid Final Issuance Expected dates found. Checking other date columns.")
-            date_cols = ["Issuance Expected", "Expected review", "Final Issuance Expected", 
-                        "Issued by EPC", "Review By OE", "Reply By EPC"]
-            all_dates = df[date_cols].values.ravel()
-            valid_dates = pd.Series(all_dates).dropna()
-            if valid_dates.empty:
-                st.error("No valid milestone dates found in any date columns. Cannot generate S-Curve.")
+        file_bytes = CSV_INPUT_PATH.getvalue()
+        file_hash = file_content_hash(file_bytes)
+        today = pd.Timestamp.today().normalize()  # Uses actual current date
+        streaming = STREAM_CSV and file_extension == "csv"
+        if streaming:
+            histograms = stream_register(file_bytes, file_hash, IGNORE_STATUS, str(INITIAL_DATE),
+                                         IFA_DELTA_DAYS, IFT_DELTA_DAYS, today, DELAY_THRESHOLD)
+            if histograms is None:
                 return
-            ift_expected_max = valid_dates.max()
-        else:
-            date_cols = ["Issuance Expected", "Expected review", "Final Issuance Expected", 
-                        "Issued by EPC", "Review By OE", "Reply By EPC"]
-            all_dates = df[date_cols].values.ravel()
-            valid_dates = pd.Series(all_dates).dropna()
-
-        if valid_dates.empty:
-            st.error("No valid dates found in any milestone columns. Cannot proceed with S-Curve plotting.")
-            return
-
-        start_date = valid_dates.min()
-        today_date = pd.Timestamp.today().normalize()  # Uses actual current date
-        total_mh = df["Man Hours "].sum()
-
-        # Validate timeline
-        if start_date > today_date:
-            st.warning(f"Start date ({start_date.strftime('%d-%b-%Y')}) is after today ({today_date.strftime('%d-%b-%Y')}). Using single point timeline.")
-            actual_timeline = [today_date]
-        else:
-            actual_timeline = pd.date_range(start=start_date, end=today_date, freq='W')
-            if len(actual_timeline) == 0:
-                st.warning("Actual timeline is empty. Using single point at today.")
-                actual_timeline = [today_date]
-
-        if start_date > ift_expected_max:
-            st.warning(f"Start date ({start_date.strftime('%d-%b-%Y')}) is after max expected date ({ift_expected_max.strftime('%d-%b-%Y')}). Using single point timeline.")
-            expected_timeline = [ift_expected_max]
+            n_rows = histograms.rows
+            st.info(
+                f"Streaming mode: {n_rows:,} documents read in chunks of {STREAM_CHUNK_ROWS:,} rows. "
+                "Only the S-curve, discipline and delay views are shown; the other charts, the updated "
+                "CSV and the review timeline need the full register."
+            )
         else:
-            expected_timeline = pd.date_range(start=start_date, end=ift_expected_max, freq='W')
-            if len(expected_timeline) == 0:
-                st.warning("Expected timeline is empty. Using single point at max expected date.")
-                expected_timeline = [ift_expected_max]
+            df = load_register(file_bytes, file_hash, file_extension, IGNORE_STATUS, diagnostics)
+            if df is None:
+                return
+            n_rows = len(df)
+            memory = df.attrs.get("memory_bytes", {})
+            diagnostics.context["register_mib"] = {k: round(v / 2**20, 2) for k, v in memory.items()}
+        diagnostics.set_rows(n_rows)
+        diagnostics.context.update(file=CSV_INPUT_PATH.name, file_hash=file_hash[:12], rows=n_rows, streaming=streaming)
 
         # --------------------------
         # 3) BUILD ACTUAL AND EXPECTED CUMULATIVE VALUES
-        # --------------------------
-        actual_cum = []
-        issuance_cums = []
-        review_cums = []
-        final_cums = []
-        last_actual_value = 0.0
-        last_progress_date = start_date
-        
-        for current_date in actual_timeline:
-            iss_sum = 0.0
-            rev_sum = 0.0
-            fin_sum = 0.0
-            has_progress = False
-            for _, row in df.iterrows():
-                mh = row["Man Hours "]
-                if pd.notna(row["Issued by EPC"]) and row["Issued by EPC"] <= current_date:
-                    iss_sum += mh * IFR_WEIGHT
-                if pd.notna(row["Review By OE"]) and row["Review By OE"] <= current_date:
-                    rev_sum += mh * IFA_WEIGHT
-                if pd.notna(row["Reply By EPC"]) and row["Reply By EPC"] <= current_date and row["Flag"] == 1:
-                    fin_sum += mh * IFT_WEIGHT
-            a_sum = iss_sum + rev_sum + fin_sum
-            if a_sum > last_actual_value:
-                has_progress = True
-            if has_progress:
-                last_actual_value = a_sum
-                last_progress_date = current_date
-                actual_cum.append(a_sum)
-            else:
-                actual_cum.append(last_actual_value)
-            issuance_cums.append(iss_sum)
-            review_cums.append(rev_sum)
-            final_cums.append(fin_sum)
-        
-        expected_cum = []
-        last_expected_value = 0.0
-        last_expected_progress_date = start_date
-        
-        for current_date in expected_timeline:
-            e_sum = 0.0
-            has_progress = False
-            for _, row in df.iterrows():
-                mh = row["Man Hours "]
-                e_val = 0.0
-                if pd.notna(row["Issuance Expected"]) and row["Issuance Expected"] <= current_date:
-                    e_val += IFR_WEIGHT
-                if pd.notna(row["Expected review"]) and row["Expected review"] <= current_date:
-                    e_val += IFA_WEIGHT
-                if pd.notna(row["Final Issuance Expected"]) and row["Final Issuance Expected"] <= current_date:
-                    e_val += IFT_WEIGHT
-                if e_val > 0:
-                    has_progress = True
-                e_sum += mh * e_val
-            if has_progress:
-                last_expected_value = e_sum
-                last_expected_progress_date = current_date
-                expected_cum.append(e_sum)
-            else:
-                expected_cum.append(last_expected_value)
-        
-        if not actual_cum or not expected_cum:
-            st.error("No cumulative progress data generated. Check input data for valid dates and man-hours.")
-            return
-
-        final_actual = actual_cum[-1]
-        final_expected = expected_cum[-1]
-
-        # Extend timelines if necessary
-        if last_progress_date < today_date:
-            actual_timeline = list(actual_timeline) + [today_date]
-            actual_cum = actual_cum + [last_actual_value]
-            issuance_cums = issuance_cums + [issuance_cums[-1]]
-            review_cums = review_cums + [review_cums[-1]]
-            final_cums = final_cums + [final_cums[-1]]
-        
-        if pd.notna(ift_expected_max) and last_expected_progress_date < ift_expected_max:
-            expected_timeline = list(expected_timeline) + [ift_expected_max]
-            expected_cum = expected_cum + [last_expected_value]
-
-        # --------------------------
         # 4) PROJECTED RECOVERY LINE
         # --------------------------
-        if today_date <= actual_timeline[0]:
-            today_idx = 0
-        elif today_date >= actual_timeline[-1]:
-            today_idx = len(actual_timeline) - 1
-        else:
-            today_idx = np.searchsorted(actual_timeline, today_date, side="right") - 1
-
-        actual_today = actual_cum[today_idx]
-        if today_date <= expected_timeline[0]:
-            expected_today_idx = 0
-        elif today_date >= expected_timeline[-1]:
-            expected_today_idx = len(expected_timeline) - 1
+        diagnostics.section("3-4) Cumulatives & recovery projection")
+        params = ScurveParams(
+            initial_date=pd.Timestamp(INITIAL_DATE),
+            ifr_weight=IFR_WEIGHT, ifa_weight=IFA_WEIGHT, ift_weight=IFT_WEIGHT,
+            recovery_factor=RECOVERY_FACTOR,
+            ifa_delta_days=IFA_DELTA_DAYS, ift_delta_days=IFT_DELTA_DAYS,
+            today=today, granularity=TIMELINE_GRANULARITY, delay_threshold_days=DELAY_THRESHOLD,
+        )
+        if streaming:
+            result = compute_scurve_from_histograms(histograms, params, notify=st_notify, stage=diagnostics.stage)
         else:
-            expected_today_idx = np.searchsorted(expected_timeline, today_date, side="right") - 1
-        expected_today = expected_cum[expected_today_idx]
-
-        gap_hrs = final_expected - actual_today
-        projected_timeline = []
-        projected_cumulative = []
-        recovery_end_date = None
-
-        if gap_hrs > 0:
-            total_days_span = (ift_expected_max - start_date).days
-            project_months = total_days_span / 30.4
-            delay_fraction = gap_hrs / final_expected
-            T_recover_months = project_months * delay_fraction * RECOVERY_FACTOR
-            T_recover_weeks = T_recover_months * (30.4 / 7.0)
-            if T_recover_weeks < 1:
-                T_recover_weeks = 1
-            slope_new = gap_hrs / T_recover_weeks
-            last_date = today_date
-            cum_val = actual_today
-            steps = int(T_recover_weeks) + 2
-            for _ in range(steps):
-                projected_timeline.append(last_date)
-                projected_cumulative.append(cum_val)
-                if cum_val >= final_expected:
-                    break
-                last_date = last_date + dt.timedelta(weeks=1)
-                cum_val = min(final_expected, cum_val + slope_new)
-            recovery_end_date = last_date
+            # The progress cube is cached; weight and granularity changes only slice and recombine it
+            data_key = (file_hash, IGNORE_STATUS, str(INITIAL_DATE), IFA_DELTA_DAYS, IFT_DELTA_DAYS)
+            result = compute_scurve(
+                df, params, notify=st_notify,
+                components_fn=lambda d, as_of: cached_milestone_components(d, data_key, as_of),
+                stage=diagnostics.stage
+            )
+        if result is None:
+            return
+        export_key = (file_hash, IGNORE_STATUS, streaming, repr(params))
+        df = result.register
+        today_date = result.today_date
+        total_mh = result.total_mh
+        actual_timeline = result.actual_timeline
+        issuance_cums, review_cums, final_cums = result.issuance_cum, result.review_cum, result.final_cum
 
         # --------------------------
         # 5) S-CURVE
         # --------------------------
+        diagnostics.section("5) S-curve chart")
         st.subheader("S-Curve with Delay Recovery")
-        y_actual = [x/total_mh*100 for x in actual_cum] if PERCENTAGE_VIEW else actual_cum
-        y_expected = [x/total_mh*100 for x in expected_cum] if PERCENTAGE_VIEW else expected_cum
-        y_projected = [x/total_mh*100 for x in projected_cumulative] if PERCENTAGE_VIEW and projected_cumulative else projected_cumulative
-        y_label = "Cumulative % of Total Works" if PERCENTAGE_VIEW else "Cumulative Man-Hours"
-
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.plot(actual_timeline, y_actual, label="Actual Progress", color=actual_color, linewidth=2)
-        ax.plot(expected_timeline, y_expected, label="Expected Progress", color=expected_color, linewidth=2)
-
-        if last_progress_date < today_date:
-            ax.hlines(y=y_actual[-1], xmin=last_progress_date, xmax=today_date, 
-                     color=actual_color, linestyle='-', linewidth=2)
-        
-        if pd.notna(ift_expected_max) and last_expected_progress_date < ift_expected_max:
-            ax.hlines(y=y_expected[-1], xmin=last_expected_progress_date, xmax=ift_expected_max, 
-                     color=expected_color, linestyle='-', linewidth=2)
-
-        if projected_timeline:
-            ax.plot(
-                projected_timeline, y_projected, linestyle=":", label="Projected (Recovery Factor)",
-                color=projected_color, linewidth=3
-            )
-
-        ax.set_title("S-Curve with Delay Recovery", fontsize=12)
-        ax.set_xlabel("Date", fontsize=10)
-        ax.set_ylabel(y_label, fontsize=10)
-        if show_grid:
-            ax.grid(True)
-        ax.legend(fontsize=9)
-        ax.xaxis.set_major_formatter(mdates.DateFormatter("%d-%b-%Y"))
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-
-        ax.axvline(today_date, color=today_color, linestyle="--", linewidth=1.5, label="Today")
-        ax.annotate(
-            f"Today\n{today_date.strftime('%d-%b-%Y')}",
-            xy=(today_date, (y_expected[-1] if PERCENTAGE_VIEW else final_expected) * 0.1),
-            xytext=(10, 10), textcoords="offset points", color=today_color,
-            bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="none", alpha=0.7), fontsize=8
-        )
-
-        if pd.notna(ift_expected_max):
-            ax.axvline(ift_expected_max, linestyle="--", linewidth=1.5, color=end_date_color)
-            ax.annotate(
-                f"Original End\n{ift_expected_max.strftime('%d-%b-%Y')}",
-                xy=(ift_expected_max, (y_expected[-1] if PERCENTAGE_VIEW else final_expected) * 0.2),
-                xytext=(-100, 10), textcoords="offset points", color=end_date_color,
-                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="none", alpha=0.7),
-                fontsize=8, arrowprops=dict(arrowstyle="->", color=end_date_color)
-            )
-
-        if recovery_end_date:
-            ax.axvline(recovery_end_date, linestyle="--", linewidth=1.5, color=end_date_color)
-            ax.annotate(
-                f"Recovery End\n{recovery_end_date.strftime('%d-%b-%Y')}",
-                xy=(recovery_end_date, (y_expected[-1] if PERCENTAGE_VIEW else final_expected) * 0.3),
-                xytext=(10,10), textcoords="offset points", color=end_date_color,
-                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="none", alpha=0.7),
-                fontsize=8, arrowprops=dict(arrowstyle="->", color=end_date_color)
-            )
-
-        delay_today = expected_today - actual_today
-        delay_pct = (delay_today / final_expected * 100) if final_expected > 0 else 0
-        
-        # Always show Actual Progress as a percentage (even if the chart is in MH)
-        actual_pct = (y_actual[today_idx] if PERCENTAGE_VIEW
-                      else ((actual_today / total_mh * 100) if total_mh > 0 else 0))
-        
-        delay_text = (
-            f"Actual Progress: {actual_pct:.1f}%\n"
-            + (f"Current Delay: {delay_pct:.1f}%"
-               if PERCENTAGE_VIEW
-               else f"Current Delay: {delay_today:,.1f} MH\n({delay_pct:.1f}%)")
-        )
-
-        ax.annotate(
-            delay_text, xy=(today_date, (y_actual[today_idx] + y_expected[expected_today_idx])/2),
-            xytext=(10, -10), textcoords="offset points", color=today_color,
-            bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="none", alpha=0.7),
-            arrowprops=dict(arrowstyle="->", color=today_color), ha="left", fontsize=8
-        )
-
-        st.pyplot(fig)
+        scurve_colors = {"actual": actual_color, "expected": expected_color, "projected": projected_color,
+                         "today": today_color, "end_date": end_date_color}
+        def draw_scurve():
+            fig = Figure(figsize=(10, 6))
+            ax = fig.subplots()
+            plot_scurve(ax, result, percentage_view=PERCENTAGE_VIEW, show_grid=show_grid, colors=scurve_colors)
+            return fig
+        show_figure("scurve", ([getattr(result, f) for f in SCURVE_FIELDS], PERCENTAGE_VIEW, scurve_colors),
+                    chart_style, draw_scurve, diagnostics)
 
         # --------------------------
         # 6) COLOR SCHEME FOR OTHER CHARTS
         # --------------------------
-        standard_cycler = plt.rcParamsDefault['axes.prop_cycle']
-        blue_cycler = cycler(color=["#cce5ff", "#99ccff", "#66b2ff", "#3399ff", "#007fff"])
-        green_cycler = cycler(color=["#ccffcc", "#99ff99", "#66ff66", "#33cc33", "#009900"])
+        diagnostics.section("6) Chart colour scheme")
         if color_scheme == "Standard":
-            plt.rc("axes", prop_cycle=standard_cycler)
             stack_colors = ["#1f77b4", "#ff7f0e", "#2ca02c"]  # Match S-Curve colors
         elif color_scheme == "Shades of Blue":
-            plt.rc("axes", prop_cycle=blue_cycler)
             stack_colors = ["#cce5ff", "#66b2ff", "#007fff"]  # Shades of blue
         elif color_scheme == "Shades of Green":
-            plt.rc("axes", prop_cycle=green_cycler)
             stack_colors = ["#ccffcc", "#66ff66", "#009900"]  # Shades of green
         else:
-            palette_colors = sns.color_palette(seaborn_palette, n_colors=10)
-            plt.rc("axes", prop_cycle=cycler(color=palette_colors))
-            stack_colors = palette_colors[:3]  # Use first three colors from palette
+            stack_colors = sns.color_palette(seaborn_palette, n_colors=10)[:3]  # Use first three colors from palette
 
         # --------------------------
         # 7) ACTUAL vs EXPECTED HOURS BY DISCIPLINE
         # --------------------------
-        end_date = max(today_date, ift_expected_max)
-        final_actual_progress = []
-        final_expected_progress = []
-        for _, row in df.iterrows():
-            a_prog = 0.0
-            if pd.notna(row["Issued by EPC"]) and row["Issued by EPC"] <= end_date:
-                a_prog += IFR_WEIGHT
-            if pd.notna(row["Review By OE"]) and row["Review By OE"] <= end_date:
-                a_prog += IFA_WEIGHT
-            if pd.notna(row["Reply By EPC"]) and row["Reply By EPC"] <= end_date and row["Flag"] == 1:
-                a_prog += IFT_WEIGHT
-            e_prog = 0.0
-            if pd.notna(row["Issuance Expected"]) and row["Issuance Expected"] <= end_date:
-                e_prog += IFR_WEIGHT
-            if pd.notna(row["Expected review"]) and row["Expected review"] <= end_date:
-                e_prog += IFA_WEIGHT
-            if pd.notna(row["Final Issuance Expected"]) and row["Final Issuance Expected"] <= end_date:
-                e_prog += IFT_WEIGHT
-            final_actual_progress.append(row["Man Hours "] * a_prog)
-            final_expected_progress.append(row["Man Hours "] * e_prog)
-
-        df["Actual_Progress_At_Final"] = final_actual_progress
-        df["Expected_Progress_At_Final"] = final_expected_progress
-
-        by_disc = df.groupby("Discipline")[["Actual_Progress_At_Final","Expected_Progress_At_Final"]].sum()
-        
-        if PERCENTAGE_VIEW:
-            by_disc["Actual_Progress_At_Final"] = by_disc["Actual_Progress_At_Final"] / total_mh * 100
-            by_disc["Expected_Progress_At_Final"] = by_disc["Expected_Progress_At_Final"] / total_mh * 100
-            y_label = "Percentage of Total Works"
-        else:
-            y_label = "Cumulative Hours"
-
-        st.subheader("Actual vs. Expected Works by Discipline" if PERCENTAGE_VIEW else "Actual vs. Expected Hours by Discipline")
-        fig2, ax2 = plt.subplots(figsize=(8,5))
-        x = range(len(by_disc.index))
-        width = 0.35
-        ax2.bar(
-            [i - width/2 for i in x], by_disc["Actual_Progress_At_Final"],
-            width=width, label='Actual Works' if PERCENTAGE_VIEW else 'Actual Hours'
-        )
-        ax2.bar(
-            [i + width/2 for i in x], by_disc["Expected_Progress_At_Final"],
-            width=width, label='Expected Works' if PERCENTAGE_VIEW else 'Expected Hours'
+        diagnostics.section("7) Discipline progress chart")
+        AS_OF_DATE = as_of_slot.slider(
+            "Discipline progress as of", min_value=min(result.start_date, today_date).date(),
+            max_value=result.end_date.date(), value=today_date.date(), format="DD-MMM-YY",
+            help="Re-evaluates the discipline progress and delay charts at any date. At today they show "
+                 "progress at the end date and delay as of today."
         )
-        ax2.set_title("Actual vs. Expected Works by Discipline" if PERCENTAGE_VIEW else "Actual vs. Expected Hours by Discipline", fontsize=10)
-        ax2.set_xlabel("Discipline", fontsize=9)
-        ax2.set_ylabel(y_label, fontsize=9)
-        ax2.set_xticks(ticks=x)
-        ax2.set_xticklabels(by_disc.index, rotation=45, ha='right', fontsize=8)
-        ax2.legend(fontsize=8)
-        if show_grid:
-            ax2.grid(True)
-        plt.tight_layout()
-        st.pyplot(fig2)
+        as_of = pd.Timestamp(AS_OF_DATE)
+        time_travel = as_of if as_of != today_date else None
+        if time_travel:
+            by_disc, disc_delay = discipline_tables(
+                result.cube.discipline_hours({"final": as_of, "today": as_of}), params.weights
+            )
+        else:
+            # Slices of the progress cube at the end date and today
+            by_disc, disc_delay = result.by_disc, result.disc_delay
+        if PERCENTAGE_VIEW:
+            by_disc = by_disc / total_mh * 100
+
+        section = lazy_section("Discipline progress", "section_discipline_progress", expanded=True)
+        with section:
+            if section.open:
+                title = "Actual vs. Expected Works by Discipline" if PERCENTAGE_VIEW else "Actual vs. Expected Hours by Discipline"
+                st.subheader(f"{title} (As of {as_of:%d-%b-%y})" if time_travel else title)
+                def draw_discipline_progress():
+                    fig2 = Figure(figsize=(8,5))
+                    ax2 = fig2.subplots()
+                    plot_discipline_progress(ax2, by_disc, percentage_view=PERCENTAGE_VIEW, show_grid=show_grid, as_of=time_travel)
+                    return fig2
+                show_figure("discipline progress", (by_disc, PERCENTAGE_VIEW, time_travel), chart_style,
+                            draw_discipline_progress, diagnostics)
+
+        if df is None:
+            # Streaming mode keeps no per-document rows: only the views built from aggregates follow
+            diagnostics.section("11) Delay by discipline")
+            section = lazy_section("Delay by discipline", "section_delay_by_discipline", expanded=True)
+            with section:
+                if section.open:
+                    show_discipline_delay(disc_delay, chart_style, diagnostics, as_of=time_travel)
+                    show_delay_heatmap(result, params.weights, chart_style, diagnostics)
+            diagnostics.section("13) Delay table & Excel export")
+            section = lazy_section("Delay table & Excel export", "section_delay_table")
+            with section:
+                if section.open:
+                    show_delay_table(result.delays, params.delay_threshold_days)
+            diagnostics.section("14) Analytics workbook export")
+            section = lazy_section("Analytics workbook export", "section_csv_export")
+            with section:
+                if section.open:
+                    show_analytics_export(result, None, export_key, params.delay_threshold_days)
+            return
 
         # --------------------------
         # 8) PROGRESS CHARTS (STACKED BAR AND DONUT)
         # --------------------------
-        total_actual = df["Actual_Progress_At_Final"].sum()
-        ifr_delivered = ((df["Issued by EPC"].notna()) & (df["Issued by EPC"] <= today_date)).sum()
-        total_docs = len(df)
-        ifr_values = [ifr_delivered, total_docs - ifr_delivered]
-
-        st.subheader("Progress Charts")
+        diagnostics.section("8) Progress charts")
+        section = lazy_section("Progress charts", "section_progress_charts")
+        with section:
+            if section.open:
+                total_actual = df["Actual_Progress_At_Final"].sum()
+                ifr_delivered = int(result.cube.events_at([today_date])[:, 0, 0].sum())  # documents issued by today
+                total_docs = len(df)
+                ifr_values = [ifr_delivered, total_docs - ifr_delivered]
+
+                st.subheader("Progress Charts")
         
-        # Stacked Bar Chart (Full Width)
-        st.write("**Actual Progress Breakdown Over Time**")
-        if PERCENTAGE_VIEW:
-            issuance_y = [x / total_mh * 100 for x in issuance_cums]
-            review_y = [x / total_mh * 100 for x in review_cums]
-            final_y = [x / total_mh * 100 for x in final_cums]
-            y_label_stack = "Cumulative % of Total Works"
-            fmt = '%.1f'  # No % symbol
-            threshold = 5.0  # Minimum percentage to show label
-        else:
-            issuance_y = issuance_cums
-            review_y = review_cums
-            final_y = final_cums
-            y_label_stack = "Cumulative Man-Hours"
-            fmt = '%d'
-            threshold = 5.0  # Minimum man-hours to show label
-        fig_stack, ax_stack = plt.subplots(figsize=(10, 6))  # Larger figure size
-        ind = np.arange(len(actual_timeline))
-        # Stack bars on top of each other
-        bars_issuance = ax_stack.bar(ind, issuance_y, width=0.9, label='Issuance', color=stack_colors[0])
-        bars_review = ax_stack.bar(ind, review_y, width=0.9, bottom=issuance_y, label='Review', color=stack_colors[1])
-        bottom_for_final = [i + r for i, r in zip(issuance_y, review_y)]
-        bars_final = ax_stack.bar(ind, final_y, width=0.9, bottom=bottom_for_final, label='Final Acceptance', color=stack_colors[2])
-        # Add labels inside bars only for segments above threshold
-        for bars, values in [(bars_issuance, issuance_y), (bars_review, review_y), (bars_final, final_y)]:
-            ax_stack.bar_label(
-                bars, 
-                labels=[f'{v:.1f}' if v >= threshold else '' for v in values], 
-                label_type='center', 
-                fontsize=8, 
-                color='white', 
-                padding=2
-            )
-        n_ticks = max(1, len(ind) // 5)
-        ax_stack.set_xticks(ind[::n_ticks])
-        ax_stack.set_xticklabels([actual_timeline[i].strftime('%d-%b-%Y') for i in range(0, len(actual_timeline), n_ticks)], rotation=45, ha='right')
-        ax_stack.set_title("Actual Progress Breakdown", fontsize=9)
-        ax_stack.set_xlabel("Date", fontsize=8)
-        ax_stack.set_ylabel(y_label_stack, fontsize=8)
-        ax_stack.legend(fontsize=7)
-        if show_grid:
-            ax_stack.grid(True)
-        plt.tight_layout()
-        st.pyplot(fig_stack)
-
-        # Donut Chart
-        st.write("**Issued By EPC Status**")
-        def ifr_autopct(pct):
-            total_count = sum(ifr_values)
-            docs = int(round(pct * total_count / 100.0))
-            return f"{docs} docs" if docs > 0 else ""
-        fig_ifr, ax_ifr = plt.subplots(figsize=(4,4))
-        ax_ifr.pie(
-            ifr_values, labels=["Issued by EPC", "Not Yet Issued"],
-            autopct=ifr_autopct, startangle=140, wedgeprops={"width":0.4}
-        )
-        ax_ifr.set_title("Issued By EPC Status", fontsize=9)
-        st.pyplot(fig_ifr)
+                # Stacked Bar Chart (Full Width)
+                st.write("**Actual Progress Breakdown Over Time**")
+                if PERCENTAGE_VIEW:
+                    issuance_y = [x / total_mh * 100 for x in issuance_cums]
+                    review_y = [x / total_mh * 100 for x in review_cums]
+                    final_y = [x / total_mh * 100 for x in final_cums]
+                    y_label_stack = "Cumulative % of Total Works"
+                    fmt = '%.1f'  # No % symbol
+                    threshold = 5.0  # Minimum percentage to show label
+                else:
+                    issuance_y = issuance_cums
+                    review_y = review_cums
+                    final_y = final_cums
+                    y_label_stack = "Cumulative Man-Hours"
+                    fmt = '%d'
+                    threshold = 5.0  # Minimum man-hours to show label
+                def draw_stack():
+                    fig_stack = Figure(figsize=(10, 6))  # Larger figure size
+                    ax_stack = fig_stack.subplots()
+                    ind = np.arange(len(actual_timeline))
+                    # Stack bars on top of each other
+                    bars_issuance = ax_stack.bar(ind, issuance_y, width=0.9, label='Issuance', color=stack_colors[0])
+                    bars_review = ax_stack.bar(ind, review_y, width=0.9, bottom=issuance_y, label='Review', color=stack_colors[1])
+                    bottom_for_final = [i + r for i, r in zip(issuance_y, review_y)]
+                    bars_final = ax_stack.bar(ind, final_y, width=0.9, bottom=bottom_for_final, label='Final Acceptance', color=stack_colors[2])
+                    # Add labels inside bars only for segments above threshold
+                    for bars, values in [(bars_issuance, issuance_y), (bars_review, review_y), (bars_final, final_y)]:
+                        ax_stack.bar_label(
+                            bars, 
+                            labels=[f'{v:.1f}' if v >= threshold else '' for v in values], 
+                            label_type='center', 
+                            fontsize=8, 
+                            color='white', 
+                            padding=2
+                        )
+                    n_ticks = max(1, len(ind) // 5)
+                    ax_stack.set_xticks(ind[::n_ticks])
+                    ax_stack.set_xticklabels([actual_timeline[i].strftime('%d-%b-%Y') for i in range(0, len(actual_timeline), n_ticks)], rotation=45, ha='right')
+                    ax_stack.set_title("Actual Progress Breakdown", fontsize=9)
+                    ax_stack.set_xlabel("Date", fontsize=8)
+                    ax_stack.set_ylabel(y_label_stack, fontsize=8)
+                    ax_stack.legend(fontsize=7)
+                    if show_grid:
+                        ax_stack.grid(True)
+                    fig_stack.tight_layout()
+                    return fig_stack
+                show_figure("progress breakdown", (actual_timeline, issuance_cums, review_cums, final_cums, total_mh, PERCENTAGE_VIEW),
+                            chart_style, draw_stack, diagnostics)
+
+                # Donut Chart
+                st.write("**Issued By EPC Status**")
+                def ifr_autopct(pct):
+                    total_count = sum(ifr_values)
+                    docs = int(round(pct * total_count / 100.0))
+                    return f"{docs} docs" if docs > 0 else ""
+                def draw_ifr():
+                    fig_ifr = Figure(figsize=(4,4))
+                    ax_ifr = fig_ifr.subplots()
+                    ax_ifr.pie(
+                        ifr_values, labels=["Issued by EPC", "Not Yet Issued"],
+                        autopct=ifr_autopct, startangle=140, wedgeprops={"width":0.4}
+                    )
+                    ax_ifr.set_title("Issued By EPC Status", fontsize=9)
+                    return fig_ifr
+                show_figure("issued donut", ifr_values, chart_style, draw_ifr, diagnostics)
 
         # --------------------------
         # 9) NESTED PIE CHART FOR DISCIPLINE
         # --------------------------
-        st.subheader("Nested Pie Chart: Document Completion by Discipline")
-        def get_doc_status(row):
-            if pd.notna(row["Reply By EPC"]) and row["Flag"] == 1:
-                return "Completed"
-            else:
-                return "Incomplete"
-        df["Doc_Status"] = df.apply(get_doc_status, axis=1)
-        disc_counts = df.groupby("Discipline").size()
-        if disc_counts.empty:
-            st.warning("No Discipline data available for pie chart.")
-        else:
-            fig_nested_disc, ax_nested_disc = plt.subplots(figsize=(10, 10))
-            outer_labels = disc_counts.index
-            outer_sizes = disc_counts.values
-            n_disciplines = len(outer_labels)
-            if color_scheme == "Standard":
-                outer_colors = [c['color'] for c in plt.rcParamsDefault['axes.prop_cycle']][:n_disciplines]
-            elif color_scheme == "Shades of Blue":
-                outer_colors = ["#cce5ff", "#99ccff", "#66b2ff", "#3399ff", "#007fff"][:n_disciplines]
-                if n_disciplines > 5:
-                    outer_colors = sns.color_palette("Blues", n_colors=n_disciplines)
-            elif color_scheme == "Shades of Green":
-                outer_colors = ["#ccffcc", "#99ff99", "#66ff66", "#33cc33", "#009900"][:n_disciplines]
-                if n_disciplines > 5:
-                    outer_colors = sns.color_palette("Greens", n_colors=n_disciplines)
-            else:
-                outer_colors = sns.color_palette(seaborn_palette, n_colors=n_disciplines)
-            inner_sizes = []
-            inner_colors = []
-            status_colors = {"Completed": "#808080", "Incomplete": "#F0F0F0"}
-            for disc in disc_counts.index:
-                disc_docs = df[df["Discipline"] == disc]
-                for _, row in disc_docs.iterrows():
-                    inner_sizes.append(1)
-                    inner_colors.append(status_colors[row["Doc_Status"]])
-            if not inner_sizes or sum(inner_sizes) == 0:
-                st.warning("No valid data for inner pie chart (Discipline). All counts are zero or empty.")
-            else:
-                outer_wedges, outer_texts = ax_nested_disc.pie(
-                    outer_sizes, radius=1.0, labels=None, startangle=90,
-                    wedgeprops=dict(width=0.3, edgecolor='w'), colors=outer_colors
-                )
-                for i, (wedge, label, count) in enumerate(zip(outer_wedges, outer_labels, outer_sizes)):
-                    angle = (wedge.theta2 - wedge.theta1)/2. + wedge.theta1
-                    x = 1.1 * np.cos(np.deg2rad(angle))
-                    y = 1.1 * np.sin(np.deg2rad(angle))
-                    horizontalalignment = {-1: "right", 1: "left"}.get(np.sign(x), "center")
-                    ax_nested_disc.annotate(
-                        label, xy=(x, y), xytext=(1.5*np.sign(x), 0), textcoords='offset points',
-                        ha=horizontalalignment, va='center', fontsize=8, fontweight='normal'
-                    )
-                    ax_nested_disc.annotate(
-                        f"({count})", xy=(x, y), xytext=(1.5*np.sign(x), -15), textcoords='offset points',
-                        ha=horizontalalignment, va='center', fontsize=10, fontweight='bold',
-                        bbox=dict(boxstyle='round,pad=0.2', fc='white', alpha=0.8)
-                    )
-                try:
-                    inner_wedges = ax_nested_disc.pie(
-                        inner_sizes, radius=0.7, startangle=90, wedgeprops=dict(width=0.3, edgecolor='w'),
-                        colors=inner_colors
-                    )[0]
-                except ValueError as e:
-                    st.error(f"Error plotting inner pie chart (Discipline): {str(e)}")
-                    plt.close(fig_nested_disc)
-                    st.stop()
-                from matplotlib.patches import Patch
-                status_patches = [
-                    Patch(color=status_colors["Completed"], label="Completed"),
-                    Patch(color=status_colors["Incomplete"], label="Incomplete")
-                ]
-                ax_nested_disc.legend(
-                    handles=status_patches, title="Status", loc="center left",
-                    bbox_to_anchor=(1, 0.5), fontsize=8
-                )
-                ax_nested_disc.set_title("Documents by Discipline and Completion", fontsize=10)
-                plt.tight_layout()
-                st.pyplot(fig_nested_disc)
+        diagnostics.section("9) Nested pie chart")
+        section = lazy_section("Nested pie chart", "section_nested_pie")
+        with section:
+            if section.open:
+                st.subheader("Nested Pie Chart: Document Completion by Discipline")
+                add_status_columns(df)
+                status_counts = pd.crosstab(df["Discipline"], df["Doc_Status"]).reindex(columns=DOC_STATUSES, fill_value=0)
+                disc_counts = status_counts.sum(axis=1)
+                if disc_counts.empty:
+                    st.warning("No Discipline data available for pie chart.")
+                else:
+                    outer_labels = disc_counts.index
+                    outer_sizes = disc_counts.values
+                    n_disciplines = len(outer_labels)
+                    if color_scheme == "Standard":
+                        outer_colors = [c['color'] for c in matplotlib.rcParamsDefault['axes.prop_cycle']][:n_disciplines]
+                    elif color_scheme == "Shades of Blue":
+                        outer_colors = ["#cce5ff", "#99ccff", "#66b2ff", "#3399ff", "#007fff"][:n_disciplines]
+                        if n_disciplines > 5:
+                            outer_colors = sns.color_palette("Blues", n_colors=n_disciplines)
+                    elif color_scheme == "Shades of Green":
+                        outer_colors = ["#ccffcc", "#99ff99", "#66ff66", "#33cc33", "#009900"][:n_disciplines]
+                        if n_disciplines > 5:
+                            outer_colors = sns.color_palette("Greens", n_colors=n_disciplines)
+                    else:
+                        outer_colors = sns.color_palette(seaborn_palette, n_colors=n_disciplines)
+                    # Inner ring: completed then incomplete documents of each discipline
+                    status_colors = {"Completed": "#808080", "Incomplete": "#F0F0F0"}
+                    inner_sizes = status_counts.to_numpy().ravel()
+                    inner_colors = np.tile([status_colors[s] for s in DOC_STATUSES], len(status_counts))
+                    inner_colors = inner_colors[inner_sizes > 0]
+                    inner_sizes = inner_sizes[inner_sizes > 0]
+                    if inner_sizes.sum() == 0:
+                        st.warning("No valid data for inner pie chart (Discipline). All counts are zero or empty.")
+                    else:
+                        def draw_nested_pie():
+                            fig_nested_disc = Figure(figsize=(10, 10))
+                            ax_nested_disc = fig_nested_disc.subplots()
+                            outer_wedges, outer_texts = ax_nested_disc.pie(
+                                outer_sizes, radius=1.0, labels=None, startangle=90,
+                                wedgeprops=dict(width=0.3, edgecolor='w'), colors=outer_colors
+                            )
+                            for i, (wedge, label, count) in enumerate(zip(outer_wedges, outer_labels, outer_sizes)):
+                                angle = (wedge.theta2 - wedge.theta1)/2. + wedge.theta1
+                                x = 1.1 * np.cos(np.deg2rad(angle))
+                                y = 1.1 * np.sin(np.deg2rad(angle))
+                                horizontalalignment = {-1: "right", 1: "left"}.get(np.sign(x), "center")
+                                ax_nested_disc.annotate(
+                                    label, xy=(x, y), xytext=(1.5*np.sign(x), 0), textcoords='offset points',
+                                    ha=horizontalalignment, va='center', fontsize=8, fontweight='normal'
+                                )
+                                ax_nested_disc.annotate(
+                                    f"({count})", xy=(x, y), xytext=(1.5*np.sign(x), -15), textcoords='offset points',
+                                    ha=horizontalalignment, va='center', fontsize=10, fontweight='bold',
+                                    bbox=dict(boxstyle='round,pad=0.2', fc='white', alpha=0.8)
+                                )
+                            try:
+                                inner_wedges = ax_nested_disc.pie(
+                                    inner_sizes, radius=0.7, startangle=90, wedgeprops=dict(width=0.3, edgecolor='w'),
+                                    colors=inner_colors
+                                )[0]
+                            except ValueError as e:
+                                st.error(f"Error plotting inner pie chart (Discipline): {str(e)}")
+                                st.stop()
+                            from matplotlib.patches import Patch
+                            status_patches = [
+                                Patch(color=status_colors["Completed"], label="Completed"),
+                                Patch(color=status_colors["Incomplete"], label="Incomplete")
+                            ]
+                            ax_nested_disc.legend(
+                                handles=status_patches, title="Status", loc="center left",
+                                bbox_to_anchor=(1, 0.5), fontsize=8
+                            )
+                            ax_nested_disc.set_title("Documents by Discipline and Completion", fontsize=10)
+                            fig_nested_disc.tight_layout()
+                            return fig_nested_disc
+                        show_figure("nested pie", (outer_labels, outer_sizes, outer_colors, inner_sizes, inner_colors),
+                                    chart_style, draw_nested_pie, diagnostics)
 
         # --------------------------
         # 10) STACKED BAR IFR/IFA/IFT BY DISCIPLINE
         # --------------------------
-        df["Issued_bool"] = df["Issued by EPC"].notna().astype(int)
-        df["Review_bool"] = df["Review By OE"].notna().astype(int)
-        df["Reply_bool"] = df["Reply By EPC"].notna().astype(int)
-        disc_counts = df.groupby("Discipline")[["Issued_bool","Review_bool","Reply_bool"]].sum()
-        st.subheader("Number of Docs with Issued, Review, Reply by Discipline")
-        fig4, ax4 = plt.subplots(figsize=(8,5))
-        disc_counts.plot(kind="barh", stacked=True, ax=ax4)
-        ax4.set_xlabel("Count of Documents", fontsize=9)
-        ax4.set_ylabel("Discipline", fontsize=9)
-        ax4.set_title("Document Milestone Status by Discipline", fontsize=10)
-        ax4.legend(labels=["Issued", "Review", "Reply"], fontsize=8)
-        plt.xticks(fontsize=8)
-        plt.yticks(fontsize=8)
-        if show_grid:
-            ax4.grid(True)
-        plt.tight_layout()
-        for container in ax4.containers:
-            ax4.bar_label(container, label_type='center', fontsize=8)
-        st.pyplot(fig4)
+        diagnostics.section("10) Milestone counts chart")
+        section = lazy_section("Milestone counts by discipline", "section_milestone_counts")
+        with section:
+            if section.open:
+                disc_counts = result.cube.milestone_counts()
+                st.subheader("Number of Docs with Issued, Review, Reply by Discipline")
+                def draw_milestone_counts():
+                    fig4 = Figure(figsize=(8,5))
+                    ax4 = fig4.subplots()
+                    disc_counts.plot(kind="barh", stacked=True, ax=ax4)
+                    ax4.set_xlabel("Count of Documents", fontsize=9)
+                    ax4.set_ylabel("Discipline", fontsize=9)
+                    ax4.set_title("Document Milestone Status by Discipline", fontsize=10)
+                    ax4.legend(labels=["Issued", "Review", "Reply"], fontsize=8)
+                    ax4.tick_params(labelsize=8)
+                    if show_grid:
+                        ax4.grid(True)
+                    fig4.tight_layout()
+                    for container in ax4.containers:
+                        ax4.bar_label(container, label_type='center', fontsize=8)
+                    return fig4
+                show_figure("milestone counts", disc_counts, chart_style, draw_milestone_counts, diagnostics)
 
         # --------------------------
         # 11) DELAY BY DISCIPLINE (AS OF TODAY)
         # --------------------------
-        st.subheader("Delay Percentage by Discipline (As of Today)")
-        actual_prog_today = []
-        expected_prog_today = []
-        for _, row in df.iterrows():
-            a_val = 0.0
-            if pd.notna(row["Issued by EPC"]) and row["Issued by EPC"] <= today_date:
-                a_val += IFR_WEIGHT
-            if pd.notna(row["Review By OE"]) and row["Review By OE"] <= today_date:
-                a_val += IFA_WEIGHT
-            if pd.notna(row["Reply By EPC"]) and row["Reply By EPC"] <= today_date and row["Flag"] == 1:
-                a_val += IFT_WEIGHT
-            e_val = 0.0
-            if pd.notna(row["Issuance Expected"]) and row["Issuance Expected"] <= today_date:
-                e_val += IFR_WEIGHT
-            if pd.notna(row["Expected review"]) and row["Expected review"] <= today_date:
-                e_val += IFA_WEIGHT
-            if pd.notna(row["Final Issuance Expected"]) and row["Final Issuance Expected"] <= today_date:
-                e_val += IFT_WEIGHT
-            actual_prog_today.append(row["Man Hours "] * a_val)
-            expected_prog_today.append(row["Man Hours "] * e_val)
-        df["Actual_Progress_Today"] = actual_prog_today
-        df["Expected_Progress_Today"] = expected_prog_today
-        disc_delay = df.groupby("Discipline")[["Actual_Progress_Today","Expected_Progress_Today"]].sum()
-        disc_delay["Delay_%"] = (
-            (disc_delay["Expected_Progress_Today"] - disc_delay["Actual_Progress_Today"])
-            / disc_delay["Expected_Progress_Today"]
-        ) * 100
-        disc_delay["Delay_%"] = disc_delay["Delay_%"].fillna(0)
-        fig_delay, ax_delay = plt.subplots(figsize=(8,5))
-        ax_delay.bar(disc_delay.index, disc_delay["Delay_%"])
-        ax_delay.set_title("Delay in % by Discipline (Today)", fontsize=10)
-        ax_delay.set_xlabel("Discipline", fontsize=9)
-        ax_delay.set_ylabel("Delay (%)", fontsize=9)
-        ax_delay.set_xticks(range(len(disc_delay.index)))
-        ax_delay.set_xticklabels(disc_delay.index, rotation=45, ha='right', fontsize=8)
-        if show_grid:
-            ax_delay.grid(True)
-        plt.tight_layout()
-        st.pyplot(fig_delay)
-        st.write("Detailed Delay Data:")
-        st.dataframe(disc_delay)
+        diagnostics.section("11) Delay by discipline")
+        section = lazy_section("Delay by discipline", "section_delay_by_discipline", expanded=True)
+        with section:
+            if section.open:
+                show_discipline_delay(disc_delay, chart_style, diagnostics, as_of=time_travel)
+                show_delay_heatmap(result, params.weights, chart_style, diagnostics)
 
         # --------------------------
         # 12) FINAL MILESTONE + STATUS STACKED BAR
         # --------------------------
-        df["FinalMilestone"] = df.apply(get_final_milestone, axis=1)
-        st.subheader("Documents by Final Milestone (Stacked by Status)")
-        group_df = (
-            df.groupby(["FinalMilestone","Status"])["ID"]
-              .count()
-              .reset_index(name="Count")
-        )
-        pivoted = group_df.pivot(index="FinalMilestone", columns="Status", values="Count").fillna(0)
-        order = ["NO ISSUANCE", "Issued by EPC", "Review By OE", "Reply By EPC", "Finalized"]
-        pivoted = pivoted.reindex(order).dropna(how="all")
-
-        fig_status, ax_status = plt.subplots(figsize=(7,5))
-        pivoted.plot(kind="bar", stacked=True, ax=ax_status)
-        for container in ax_status.containers:
-            ax_status.bar_label(
-                container, label_type='center', fmt='%d', fontsize=8, color='white'
-            )
-        ax_status.set_title("Documents by Final Milestone (Stacked by Status)", fontsize=10)
-        ax_status.set_xlabel("Final Milestone", fontsize=9)
-        ax_status.set_ylabel("Number of Documents", fontsize=9)
-        ax_status.set_xticks(range(len(pivoted.index)))
-        ax_status.set_xticklabels(pivoted.index, rotation=45, ha='right', fontsize=8)
-        ax_status.legend(title="Status", fontsize=8)
-        if show_grid:
-            ax_status.grid(True)
-        plt.tight_layout()
-        st.pyplot(fig_status)
+        diagnostics.section("12) Final milestone chart")
+        section = lazy_section("Documents by final milestone", "section_final_milestone")
+        with section:
+            if section.open:
+                st.subheader("Documents by Final Milestone (Stacked by Status)")
+                pivoted = milestone_status_counts(df)
+
+                def draw_final_milestone():
+                    fig_status = Figure(figsize=(7,5))
+                    ax_status = fig_status.subplots()
+                    pivoted.plot(kind="bar", stacked=True, ax=ax_status)
+                    for container in ax_status.containers:
+                        ax_status.bar_label(
+                            container, label_type='center', fmt='%d', fontsize=8, color='white'
+                        )
+                    ax_status.set_title("Documents by Final Milestone (Stacked by Status)", fontsize=10)
+                    ax_status.set_xlabel("Final Milestone", fontsize=9)
+                    ax_status.set_ylabel("Number of Documents", fontsize=9)
+                    ax_status.set_xticks(range(len(pivoted.index)))
+                    ax_status.set_xticklabels(pivoted.index, rotation=45, ha='right', fontsize=8)
+                    ax_status.legend(title="Status", fontsize=8)
+                    if show_grid:
+                        ax_status.grid(True)
+                    fig_status.tight_layout()
+                    return fig_status
+                show_figure("final milestone", pivoted, chart_style, draw_final_milestone, diagnostics)
 
         # --------------------------
         # 13) SIMPLIFIED DELAY TABLE FOR ISSUED BY EPC
         # --------------------------
-        st.subheader("Document Delays (Issued by EPC vs Expected Issuance, ≥14 Days)")
-        
-        # Calculate IFR delay (Issued by EPC vs Issuance Expected) and filter for ≥14 days
-        today = pd.Timestamp.today().normalize()
-        delays = []
-        display_data = {
-            "ID": [],
-            "Discipline": [],
-            "Document Title": [],
-            "Issuance Expected": [],
-            "Actual Issued": [],
-            "Delay (days)": [],
-            "Status": []
-        }
-        for i, row in df.iterrows():
-            expected = row["Issuance Expected"]
-            actual = row["Issued by EPC"] if pd.notna(row["Issued by EPC"]) else today
-            
-            if pd.isna(expected):
-                delay_days = 0
-            else:
-                delay_days = (actual - expected).days
-                # Only include positive delays ≥ 14 days
-                if delay_days >= 14:
-                    delays.append(delay_days)
-                    display_data["ID"].append(row["ID"])
-                    display_data["Discipline"].append(row["Discipline"])
-                    display_data["Document Title"].append(row["Document Title"])
-                    display_data["Issuance Expected"].append(
-                        expected.strftime("%d-%b-%y") if pd.notna(expected) else "—"
-                    )
-                    display_data["Actual Issued"].append(
-                        actual.strftime("%d-%b-%y") if pd.notna(actual) else "Not Issued"
-                    )
-                    display_data["Delay (days)"].append(delay_days)
-                    display_data["Status"].append(row["Status"])
-        
-        df_display = pd.DataFrame(display_data)
-        
-        if df_display.empty:
-            st.warning("No documents have an issuance delay of 14 days or more.")
-        else:
-            # Function to apply color formatting
-            def color_delay(val):
-                return 'background-color: #ffcccc'  # Light red for delays ≥14 days
-            
-            # Apply styling
-            styler = df_display.style.applymap(color_delay, subset=['Delay (days)'])
-            
-            # Display styled table
-            st.dataframe(styler, use_container_width=True)
-            
-            # Excel export with formatting using openpyxl
-            def export_to_excel():
-                output = BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    df_display.to_excel(writer, sheet_name='Delays', index=False)
-                    
-                    # Access the workbook and worksheet
-                    workbook = writer.book
-                    worksheet = writer.sheets['Delays']
-                    
-                    # Define fill colors
-                    red_fill = PatternFill(start_color="ffcccc", end_color="ffcccc", fill_type="solid")
-                    
-                    # Apply formatting to delay column (column F)
-                    for idx, row in enumerate(worksheet.iter_rows(min_row=2, min_col=6, max_col=6), start=2):
-                        for cell in row:
-                            cell.fill = red_fill
-                            
-                    # Apply header styling
-                    header_fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
-                    for cell in worksheet[1]:
-                        cell.fill = header_fill
-                
-                return output.getvalue()
-            
-            excel_data = export_to_excel()
-            st.download_button(
-                label="Download Delays Table (Excel)",
-                data=excel_data,
-                file_name="document_delays.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+        diagnostics.section("13) Delay table & Excel export")
+        section = lazy_section("Delay table & Excel export", "section_delay_table")
+        with section:
+            if section.open:
+                show_delay_table(result.delays, params.delay_threshold_days)
 
         # --------------------------
         # 14) SAVE UPDATED CSV
         # --------------------------
-        df_for_export = df.copy()
-        df_for_export["Issuance Expected"] = df["Issuance Expected"].apply(
-            lambda x: x.strftime("%d-%b-%y") if pd.notna(x) else ""
-        )
-        df_for_export["Expected review"] = df["Expected review"].apply(
-            lambda x: x.strftime("%d-%b-%y") if pd.notna(x) else ""
-        )
-        df_for_export["Final Issuance Expected"] = df["Final Issuance Expected"].apply(
-            lambda x: x.strftime("%d-%b-%y") if pd.notna(x) else ""
-        )
-        st.subheader("Download Updated CSV")
-        st.download_button(
-            label="Download Updated CSV",
-            data=df_for_export.to_csv(index=False).encode('utf-8'),
-            file_name="EDDR_with_calculated_expected.csv",
-            mime="text/csv"
-        )
+        diagnostics.section("14) Updated CSV & analytics workbook export")
+        section = lazy_section("Updated CSV & analytics workbook export", "section_csv_export")
+        with section:
+            if section.open:
+                df_for_export = export_register(df)
+                st.subheader("Download Updated CSV")
+                st.download_button(
+                    label="Download Updated CSV",
+                    data=df_for_export.to_csv(index=False).encode('utf-8'),
+                    file_name="EDDR_with_calculated_expected.csv",
+                    mime="text/csv"
+                )
+                show_analytics_export(result, df, export_key, params.delay_threshold_days)
 
     with tab2:
-        # =====================================================================================
-        # TAB 2 — REVIEW TIMELINE (doc titles with status in brackets; 2-line tags; selective labeling)
-        # =====================================================================================
-        file_extension = CSV_INPUT_PATH.name.split('.')[-1].lower()
-        if file_extension not in ['xlsx', 'xls']:
-            st.info("The **Review Timeline** requires an **Excel** file with a sheet named **'Review Historical record'**.")
-            st.stop()
-
-        try:
-            df_hist = pd.read_excel(CSV_INPUT_PATH, sheet_name="Review Historical record")
-        except Exception:
-            st.warning("Could not find a sheet named **'Review Historical record'** in the uploaded Excel file.")
-            st.stop()
-
-        orig_cols = list(df_hist.columns)
-        if len(orig_cols) < 6:
-            st.error("The 'Review Historical record' sheet doesn't have the expected structure (need ≥6 columns).")
-            st.stop()
-
-        base_cols = orig_cols[:4]      # ID, Discipline, Area, Document Title (expected)
-        tail_cols = orig_cols[4:]      # Rev/Reviewed pairs
-
-        # Build Rev/Reviewed pairs using ORIGINAL names, pattern-matching on normalized strings
-        pairs = []
-        used = set()
-        for i, c in enumerate(tail_cols):
-            if i in used:
-                continue
-            if is_rev_col(c):
-                # nearest next "review-like" column
-                j = i + 1
-                found = False
-                while j < len(tail_cols):
-                    if j not in used and is_review_col(tail_cols[j]):
-                        pairs.append((tail_cols[i], tail_cols[j]))
-                        used.add(i); used.add(j)
-                        found = True
-                        break
-                    j += 1
-                if not found and i + 1 < len(tail_cols):
-                    # adjacency fallback
-                    pairs.append((tail_cols[i], tail_cols[i+1]))
-                    used.add(i); used.add(i+1)
-
-        # If still nothing, pair by position (5th with 6th, 7th with 8th, ...)
-        if not pairs:
-            for k in range(0, len(tail_cols), 2):
-                left = tail_cols[k]
-                right = tail_cols[k+1] if k+1 < len(tail_cols) else None
-                if right is not None:
-                    pairs.append((left, right))
-
-        if not pairs:
-            st.error("No valid (RevX, Review/Reviewed) pairs detected.")
-            st.write("Columns from 5th onward:", tail_cols)
-            st.stop()
-
-        with st.expander("Detected column pairs", expanded=False):
-            st.write(pairs)
-
-        # Parse dates in all Rev/Review columns
-        for rev_c, revw_c in pairs:
-            df_hist[rev_c] = df_hist[rev_c].apply(robust_parse_date)
-            df_hist[revw_c] = df_hist[revw_c].apply(robust_parse_date)
-
-        # Filter rows where first Rev column (e.g., Rev0) is not null
-        first_rev_col = pairs[0][0]
-        df_sel = df_hist[df_hist[first_rev_col].notna()].copy()
-        if df_sel.empty:
-            st.warning(f"No rows have a non-null **{first_rev_col}** (initial submission). Nothing to plot.")
-            st.stop()
-
-        # Build display label: use **Document Title only** on the y-axis to make space
-        title_candidates = ["Document Title", "Title", base_cols[min(3, len(base_cols)-1)]]
-        title_col = next((c for c in title_candidates if c in df_sel.columns), title_candidates[-1])
-
-        # Select by Title
-        st.subheader("Select Documents to Plot")
-        choices = st.multiselect(
-            "Choose one or more documents (must have initial submission date).",
-            options=sorted(df_sel[title_col].astype(str).unique().tolist())
-        )
-        if not choices:
-            st.info("Select at least one document title to render the timeline.")
-            st.stop()
-
-        df_plot = df_sel[df_sel[title_col].astype(str).isin(choices)].copy()
-
-        # Build actual segments (title, rev_tag, submit, review) for ALL pairs
-        actual_segments = []
-        for _, r in df_plot.iterrows():
-            doc_title = str(r.get(title_col, ""))
-            for rev_c, revw_c in pairs:
-                submit_dt = r.get(rev_c, pd.NaT)
-                review_dt = r.get(revw_c, pd.NaT)
-                if pd.notna(submit_dt):
-                    m = re.findall(r'\d+', normalize_header(rev_c))
-                    rev_tag = f"Rev{m[0]}" if m else normalize_header(rev_c)
-                    actual_segments.append({
-                        "title": doc_title,
-                        "rev": rev_tag,
-                        "submit": submit_dt,
-                        "review": review_dt if pd.notna(review_dt) else None
-                    })
-
-        if not actual_segments:
-            st.warning("No valid submission dates found to plot.")
-            st.stop()
-
-        # Build expected segments from first sheet (Issuance Expected, Expected review, Final Issuance Expected)
-        expected_segments = []
-        df_expected = df[df["Document Title"].astype(str).isin(choices)].drop_duplicates(subset=["Document Title"])  # Ensure unique titles
-        for _, r in df_expected.iterrows():
-            doc_title = str(r["Document Title"])
-            ifr_exp = robust_parse_date(r["Issuance Expected"])
-            ifa_exp = robust_parse_date(r["Expected review"])
-            ift_exp = robust_parse_date(r["Final Issuance Expected"])
-            if pd.notna(ifr_exp):  # Only include if Issuance Expected is not null
-                expected_segments.append({
-                    "title": doc_title,
-                    "ifr_exp": ifr_exp,
-                    "ifa_exp": ifa_exp if pd.notna(ifa_exp) else None,
-                    "ift_exp": ift_exp if pd.notna(ift_exp) else None
-                })
-
-        if not expected_segments:
-            st.warning("No valid expected dates found for selected documents in the first sheet.")
-            # Proceed with actual segments only
-
-        # y-axis (one row per document title with status in brackets)
-        status_map = df.set_index("Document Title")["Status"].to_dict()
-        titles = sorted(set(s["title"] for s in actual_segments))
-        y_positions = {t: i for i, t in enumerate(titles)}
-        # Append status to titles for y-axis labels
-        title_labels = [f"{t} [{status_map.get(t, 'Unknown')}]" for t in titles]
-
-        # Identify first and last points to label for each document
-        label_points = {}
-        for title in titles:
-            segs = [s for s in actual_segments if s["title"] == title]
-            if not segs:
-                continue
-            # First submission: earliest submit date
-            first_seg = min(segs, key=lambda s: s["submit"])
-            label_points[(title, first_seg["submit"], "submit")] = first_seg["rev"]
-            # Last point: latest submit or review date
-            dates = [(s["submit"], "submit", s["rev"]) for s in segs]
-            dates.extend([(s["review"], "review", s["rev"]) for s in segs if s["review"] is not None])
-            if dates:
-                last_date, last_type, last_rev = max(dates, key=lambda x: x[0])
-                label_points[(title, last_date, last_type)] = last_rev
-
-        # Debug: Show which points will be labeled
-        with st.expander("Points Selected for Labeling", expanded=False):
-            st.write(label_points)
-
-        # Plot — two-line labels with above/below placement and selective labeling
-        st.subheader("Review Timeline (Submission ➜ Review with Expected Dates)")
-        fig_t, ax_t = plt.subplots(figsize=(12, 1.1*max(4, len(titles))))  # Increased height for more labels
-        ax_t.xaxis_date()  # Set x-axis to datetime immediately
-        ax_t.xaxis.set_major_formatter(mdates.DateFormatter("%d-%b-%Y"))
-        ax_t.xaxis.set_major_locator(mdates.AutoDateLocator())
-        submit_marker = 'o'
-        review_marker = 's'   # square
-        expected_marker = '^'  # triangle for expected dates
-        label_offset_y = 12   # Initial vertical offset (above or below the line, pixels)
-        font_size = 7         # Slightly larger font for readability
-        max_jitter_x = 20     # Maximum horizontal jitter (pixels)
-        vertical_step = 10    # Vertical offset step for stacking (pixels)
-        label_width_days = 3  # Tighter overlap detection
-        expected_color = '#ff7f0e'  # Match S-Curve expected color
-
-        color_cycle = plt.rcParams['axes.prop_cycle'].by_key().get('color', ['#1f77b4'])
-        title_color_map = {t: color_cycle[i % len(color_cycle)] for i, t in enumerate(titles)}
-
-        # Track occupied label regions separately for above and below
-        occupied_regions_above = []
-        occupied_regions_below = []
-
-        def is_overlapping(x_center, y_center, x_min, x_max, y_min, y_max, is_actual=False):
-            """Check if a new label overlaps with existing labels in the same group (above or below)."""
-            regions = occupied_regions_above if is_actual else occupied_regions_below
-            for region in regions:
-                ox_center, oy_center, ox_min, ox_max, oy_min, oy_max = region
-                if (x_max > ox_min and x_min < ox_max and
-                    y_max > oy_min and y_min < oy_max):
-                    return True
-            return False
-
-        def get_label_position(x, y, title, ts, is_actual=False):
-            """Calculate label position: above for actual, below for expected, with stacking."""
-            base_y_offset = label_offset_y if is_actual else -label_offset_y
-            y_offset = base_y_offset
-            x_jitter = 0
-            attempt = 0
-            max_attempts = 10  # Limit stacking to prevent excessive spread
-
-            # Convert x (datetime) to numeric for collision detection
-            x_num = mdates.date2num(x)
-            x_min = x_num - label_width_days / 2
-            x_max = x_num + label_width_days / 2
-            y_min = y + (y_offset - 5) / 100  # Approximate height in y-units
-            y_max = y + (y_offset + 15) / 100
-
-            while is_overlapping(x_num, y + y_offset / 100, x_min, x_max, y_min, y_max, is_actual):
-                attempt += 1
-                if attempt % 2 == 0:
-                    # Vertical stacking (up for actual, down for expected)
-                    y_offset += vertical_step if is_actual else -vertical_step
-                else:
-                    # Horizontal jitter (alternate left/right)
-                    x_jitter = (-1) ** attempt * (attempt // 2 + 1) * 10
-                    if abs(x_jitter) > max_jitter_x:
-                        x_jitter = 0
-                        y_offset += vertical_step if is_actual else -vertical_step
-                y_min = y + (y_offset - 5) / 100
-                y_max = y + (y_offset + 15) / 100
-                if attempt >= max_attempts:
-                    break  # Accept slight overlap if necessary
-
-            (occupied_regions_above if is_actual else occupied_regions_below).append(
-                (x_num, y + y_offset / 100, x_min, x_max, y_min, y_max)
-            )
-            return x_jitter, y_offset
-
-        # Plot actual segments (submission and review)
-        actual_segments.sort(key=lambda z: (y_positions[z["title"]], z["submit"], z["review"] or z["submit"]))
-        for seg in actual_segments:
-            y = y_positions[seg["title"]]
-            c = title_color_map[seg["title"]]
-            x0 = seg["submit"]
-            x1 = seg["review"]
-
-            # Plot submission marker
-            ax_t.plot([x0], [y], marker=submit_marker, markersize=7, color=c, linestyle='None')
-            # Label only if it's the first submission
-            if (seg["title"], x0, "submit") in label_points:
-                x_jitter0, y_offset0 = get_label_position(x0, y, seg["title"], x0, is_actual=True)
-                ax_t.annotate(f'{seg["rev"]}\n{x0.strftime("%d-%b-%y")}',
-                              xy=(x0, y), xytext=(x_jitter0, y_offset0),
-                              textcoords='offset points', ha='center', va='bottom',
-                              fontsize=font_size, bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=0.85))
-
-            # Plot review (if any)
-            if x1 is not None:
-                ax_t.plot([x0, x1], [y, y], color=c, linewidth=2, alpha=0.9)
-                ax_t.plot([x1], [y], marker=review_marker, markersize=6, color=c, linestyle='None')
-                # Label only if it's the last point
-                if (seg["title"], x1, "review") in label_points:
-                    x_jitter1, y_offset1 = get_label_position(x1, y, seg["title"], x1, is_actual=True)
-                    ax_t.annotate(f'{seg["rev"]} review\n{x1.strftime("%d-%b-%y")}',
-                                  xy=(x1, y), xytext=(x_jitter1, y_offset1),
-                                  textcoords='offset points', ha='center', va='bottom',
-                                  fontsize=font_size, bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=0.85))
-            else:
-                # No review yet: short tick to indicate in-progress
-                ax_t.plot([x0, x0 + pd.Timedelta(days=1)], [y, y], color=c, linewidth=1.5, alpha=0.6)
-
-        # Plot expected segments (IFR Exp, IFA Exp, IFT Exp)
-        for seg in expected_segments:
-            y = y_positions.get(seg["title"])
-            if y is None:
-                continue  # Skip if title not in selected documents
-            dates = []
-            labels = []
-            if pd.notna(seg["ifr_exp"]):
-                dates.append(seg["ifr_exp"])
-                labels.append("Submission")
-            if seg["ifa_exp"] is not None:
-                dates.append(seg["ifa_exp"])
-                labels.append("Review")
-            if seg["ift_exp"] is not None:
-                dates.append(seg["ift_exp"])
-                labels.append("Final Doc")
-
-            if dates:
-                # Ensure dates are pd.Timestamp, re-parse if strings
-                valid_dates = []
-                valid_labels = []
-                for d, lbl in zip(dates, labels):
-                    if isinstance(d, str):
-                        d = robust_parse_date(d)
-                    if pd.notna(d):
-                        valid_dates.append(d.to_pydatetime() if isinstance(d, pd.Timestamp) else d)
-                        valid_labels.append(lbl)
-                if valid_dates:
-                    # Sort dates to ensure correct plotting order
-                    date_label_pairs = sorted(zip(valid_dates, valid_labels), key=lambda x: x[0])
-                    sorted_dates, sorted_labels = zip(*date_label_pairs) if date_label_pairs else ([], [])
-                    sorted_dates = list(sorted_dates)  # Convert to list of datetime.datetime
-                    if sorted_dates:
-                        # Plot dotted line connecting expected dates
-                        ax_t.plot(sorted_dates, [y] * len(sorted_dates), linestyle=':', color=expected_color, linewidth=2, alpha=0.7, label="Expected Timeline" if y == y_positions[titles[0]] else "")
-                        # Plot markers for expected dates
-                        for x, label in zip(sorted_dates, sorted_labels):
-                            ax_t.plot([x], [y], marker=expected_marker, markersize=6, color=expected_color, linestyle='None')
-                            x_jitter, y_offset = get_label_position(x, y, seg["title"], x, is_actual=False)
-                            ax_t.annotate(f'{label}\n{x.strftime("%d-%b-%y")}',
-                                          xy=(x, y), xytext=(x_jitter, y_offset),
-                                          textcoords='offset points', ha='center', va='top',
-                                          fontsize=font_size, bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=0.85))
-
-        from matplotlib.lines import Line2D
-        
-        # Legend entries for markers only (dot = submission, square = review)
-        extra_legend = [
-            Line2D([0], [0], marker=submit_marker, linestyle='None', color='none',
-                   markerfacecolor='#1f77b4', markeredgecolor='#1f77b4', markersize=7, label='Submission'),
-            Line2D([0], [0], marker=review_marker, linestyle='None', color='none',
-                   markerfacecolor='#1f77b4', markeredgecolor='#1f77b4', markersize=7, label='Review'),
-        ]
-
-        ax_t.set_yticks([y_positions[t] for t in titles])
-        ax_t.set_yticklabels(title_labels, fontsize=8)
-        ax_t.set_ylim(-0.6, len(titles) - 0.4)
-        ax_t.set_xlabel("Date", fontsize=9)
-        ax_t.set_title("Submission → Review Timeline with Expected Dates", fontsize=11)
-        if show_grid:
-            ax_t.grid(True, axis='x', linestyle='--', alpha=0.35)
-        handles, labels = ax_t.get_legend_handles_labels()
-        ax_t.legend(handles=extra_legend + handles, fontsize=8, loc='upper left')
-
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        st.pyplot(fig_t)
-
-        # Compact table of plotted items (actual + expected)
-        st.markdown("**Plotted Revisions and Expected Dates (compact table)**")
-        tbl_rows = []
-        for s in actual_segments:
-            tbl_rows.append({
-                "Document Title": s["title"],
-                "Type": "Actual",
-                "Revision": s["rev"],
-                "Submission": s["submit"].strftime("%d-%b-%y") if pd.notna(s["submit"]) else "—",
-                "Review": s["review"].strftime("%d-%b-%y") if s["review"] else "—",
-                "IFR Exp": "—",
-                "IFA Exp": "—",
-                "IFT Exp": "—"
-            })
-        for s in expected_segments:
-            y = y_positions.get(s["title"])
-            if y is None:
-                continue
-            tbl_rows.append({
-                "Document Title": s["title"],
-                "Type": "Expected",
-                "Revision": "—",
-                "Submission": "—",
-                "Review": "—",
-                "First Submission": s["ifr_exp"].strftime("%d-%b-%y") if pd.notna(s["ifr_exp"]) else "—",
-                "Document Review": s["ifa_exp"].strftime("%d-%b-%y") if s["ifa_exp"] else "—",
-                "Final Submission": s["ift_exp"].strftime("%d-%b-%y") if s["ift_exp"] else "—"
-            })
-        st.dataframe(pd.DataFrame(tbl_rows))
+        if not tab2.open:
+            return
+        diagnostics.section("Tab 2: review timeline")
+        review_timeline_tab(file_extension, file_bytes, file_hash, df, chart_style, diagnostics)
+
+def main():
+    st.set_page_config(page_title="S-Curve Analysis", layout="wide")
+    diagnostics = Diagnostics()
+    try:
+        run_dashboard(diagnostics)
+    finally:
+        if diagnostics.enabled:
+            diagnostics.finish()
+            diagnostics.context["figure_cache"] = figure_cache().stats()
+            diagnostics.log_line()
+            with st.sidebar.expander("Diagnostics", expanded=False):
+                st.dataframe(diagnostics.to_frame(), hide_index=True, width="stretch")
+                memory = diagnostics.context.get("register_mib")
+                if memory:
+                    st.caption(f"Register in memory: {memory['before']:,.1f} MiB parsed, "
+                               f"{memory['after']:,.1f} MiB after compacting dtypes")
+                cache = diagnostics.context["figure_cache"]
+                st.caption(f"Figure cache: {cache['entries']} charts in {cache['mib']:,.1f} of {FIGURE_CACHE_MB} MiB, "
+                           f"{cache['hits']} hits / {cache['misses']} misses since the server started")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,97 @@
+"""
+Excel downloads of the dashboard tables and of a whole computation.
+
+Workbooks are written with openpyxl in write-only mode: rows are streamed to the file as they are
+appended instead of being kept as cell objects, and highlights are conditional-formatting rules
+over a whole column rather than a fill on every cell. Builders return the .xlsx bytes and are meant
+to be passed to st.download_button as a callable, so nothing is written until the user asks.
+"""
+from io import BytesIO
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import CellIsRule
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+HEADER_FILL = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
+DELAY_FILL = PatternFill(start_color="ffcccc", end_color="ffcccc", fill_type="solid")
+_THIN = Side(style="thin")
+HEADER_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)  # as pandas' to_excel header
+
+
+def write_frame(ws, df):
+    """
+    Append `df` to a write-only worksheet: a styled header row, then one row per record. Datetime
+    columns are written as dates and missing values as blank cells.
+    """
+    header = []
+    for name in df.columns:
+        cell = WriteOnlyCell(ws, value=str(name))
+        cell.font = Font(bold=True)
+        cell.border = HEADER_BORDER
+        cell.alignment = Alignment(horizontal="center", vertical="top")
+        cell.fill = HEADER_FILL
+        header.append(cell)
+    ws.append(header)
+    values = df.astype(object)
+    for name in df.columns[[pd.api.types.is_datetime64_any_dtype(t) for t in df.dtypes]]:
+        values[name] = df[name].dt.date
+    values = values.where(df.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        ws.append(row)
+
+
+def highlight_at_least(ws, df, column, threshold, fill=DELAY_FILL):
+    """One conditional-formatting rule filling the cells of `column` whose value is >= `threshold`."""
+    if df.empty:
+        return
+    letter = get_column_letter(df.columns.get_loc(column) + 1)
+    ws.conditional_formatting.add(
+        f"{letter}2:{letter}{len(df) + 1}",
+        CellIsRule(operator="greaterThanOrEqual", formula=[str(threshold)], fill=fill)
+    )
+
+
+def save_workbook(wb):
+    buf = BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def delays_workbook(delays, threshold_days):
+    """.xlsx bytes of an issuance delay table, delays of `threshold_days` or more highlighted in red."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Delays")
+    highlight_at_least(ws, delays, "Delay (days)", threshold_days)
+    write_frame(ws, delays)
+    return save_workbook(wb)
+
+
+def analytics_workbook(result, threshold_days, register=None, milestone_status=None):
+    """
+    .xlsx bytes of one S-curve computation (a scurve_engine.ScurveResult), one sheet per table:
+    the actual curve with its per-milestone stack, the expected and projected curves, the
+    discipline tables at the final date and today (with delay %), the final milestone by status
+    pivot, the delay table and the annotated register. The pivot and register sheets are left out
+    when not given (streamed registers keep no rows). Each sheet is streamed once, in order.
+    """
+    wb = Workbook(write_only=True)
+    sheets = [
+        ("Actual S-Curve", result.actual_frame()),
+        ("Expected S-Curve", result.expected_frame()),
+        ("Projected Recovery", result.projected_frame()),
+        ("Discipline at Final", result.by_disc.reset_index()),
+        ("Discipline Today", result.disc_delay.reset_index()),
+    ]
+    if milestone_status is not None:
+        sheets.append(("Milestone by Status", milestone_status.reset_index()))
+    for name, frame in sheets:
+        write_frame(wb.create_sheet(name), frame)
+    ws = wb.create_sheet("Delays")
+    highlight_at_least(ws, result.delays, "Delay (days)", threshold_days)
+    write_frame(ws, result.delays)
+    if register is not None:
+        write_frame(wb.create_sheet("Register"), register)
+    return save_workbook(wb)
@@ -0,0 +1,132 @@
+"""
+LRU cache of rendered chart images.
+
+Each chart is keyed on a fingerprint of the data it draws plus the styling that changes its look,
+and stored as the PNG bytes st.pyplot would send. A rerun that leaves a chart's inputs unchanged
+is served the cached image instead of building, laying out and rasterising the figure again.
+rcParams are process-wide, so figures are drawn one at a time, each under its own rc_context.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+SAVEFIG_OPTIONS = {"format": "png", "dpi": 200, "bbox_inches": "tight"}  # what st.pyplot uses
+DEFAULT_MAX_BYTES = 64 * 2**20
+_render_lock = threading.Lock()  # rc_context changes the global rcParams while a figure is drawn
+
+
+def _update(h, part):
+    if isinstance(part, (pd.DataFrame, pd.Series, pd.Index)):
+        h.update(type(part).__name__.encode())
+        if isinstance(part, pd.DataFrame):
+            h.update(repr(list(part.columns)).encode())
+        elif isinstance(part, pd.Series):
+            h.update(repr(part.name).encode())
+        h.update(repr(getattr(part, "dtypes", getattr(part, "dtype", None))).encode())
+        h.update(pd.util.hash_pandas_object(part).to_numpy().tobytes())
+    elif isinstance(part, np.ndarray) and part.dtype != object:
+        h.update(f"ndarray{part.dtype.str}{part.shape}".encode())
+        h.update(np.ascontiguousarray(part).tobytes())
+    elif isinstance(part, np.ndarray):
+        _update(h, pd.Series(part.ravel()))
+    elif isinstance(part, dict):
+        h.update(b"{")
+        for key in sorted(part, key=repr):
+            h.update(repr(key).encode())
+            _update(h, part[key])
+        h.update(b"}")
+    elif isinstance(part, (list, tuple)):
+        h.update(b"[")
+        for item in part:
+            _update(h, item)
+        h.update(b"]")
+    else:
+        h.update(repr(part).encode())
+    h.update(b"|")
+
+
+def fingerprint(*parts):
+    """
+    Hex digest of chart inputs: DataFrames/Series/Index are hashed by value (including labels),
+    arrays by their bytes, dicts/lists/tuples item by item and anything else by its repr.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _update(h, part)
+    return h.hexdigest()
+
+
+def render_png(fig):
+    """Serialise a figure the way st.pyplot does."""
+    buf = BytesIO()
+    fig.savefig(buf, **SAVEFIG_OPTIONS)
+    return buf.getvalue()
+
+
+class FigureCache:
+    """
+    Rendered PNGs by key, evicting the least recently used entries once their total size exceeds
+    `max_bytes`. Safe to share between Streamlit sessions (threads).
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= len(self._entries.pop(key))
+            if len(png) > self.max_bytes:
+                return
+            self._entries[key] = png
+            self.nbytes += len(png)
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+    def render(self, key, draw, rc=None):
+        """
+        PNG for `key`, calling `draw()` (which returns a Figure) only on a miss. The figure is
+        built and serialised under matplotlib.rc_context(rc), so its styling should be part of
+        `key`. The figure is cleared once serialised; use matplotlib.figure.Figure rather than
+        pyplot so nothing else keeps it alive. Returns (png bytes, whether it was a cache hit).
+        """
+        png = self.get(key)
+        if png is not None:
+            return png, True
+        with _render_lock, matplotlib.rc_context(rc):
+            fig = draw()
+            try:
+                png = render_png(fig)
+            finally:
+                fig.clear()  # free the artists now rather than at the next cyclic garbage collection
+        self.put(key, png)
+        return png, False
+
+    def stats(self):
+        """Entry count, size and hit/miss counters, for the diagnostics panel."""
+        return {"entries": len(self._entries), "mib": round(self.nbytes / 2**20, 2),
+                "hits": self.hits, "misses": self.misses}
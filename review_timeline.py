@@ -0,0 +1,384 @@
+import math
+import re
+
+import matplotlib as mpl
+import matplotlib.dates as mdates
+import numpy as np
+import pandas as pd
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+
+SUBMIT_MARKER = 'o'
+REVIEW_MARKER = 's'     # square
+EXPECTED_MARKER = '^'   # triangle for expected dates
+EXPECTED_COLOR = '#ff7f0e'  # Match S-Curve expected color
+TIMELINE_PAGE_SIZES = [10, 25, 50]  # documents per rendered timeline page
+
+
+def normalize_header(h):
+    """Normalize header by removing extra spaces and converting to lowercase."""
+    return ' '.join(str(h).lower().split())
+
+
+def is_rev_col(col_name):
+    """Check if column name matches a revision-like pattern (e.g., Rev0, Revision 1)."""
+    col_norm = normalize_header(col_name)
+    return bool(re.search(r'rev(ision)?\s*\d+', col_norm, re.IGNORECASE))
+
+
+def is_review_col(col_name):
+    """Check if column name matches a review-like pattern (e.g., Reviewed0, Review Date)."""
+    col_norm = normalize_header(col_name)
+    return bool(re.search(r'review(ed)?(\s*date)?\s*\d*', col_norm, re.IGNORECASE))
+
+
+def detect_rev_review_pairs(tail_cols):
+    """Pair each Rev column with the nearest following Review column (adjacency/position fallbacks)."""
+    pairs = []
+    used = set()
+    for i, c in enumerate(tail_cols):
+        if i in used:
+            continue
+        if is_rev_col(c):
+            # nearest next "review-like" column
+            j = i + 1
+            found = False
+            while j < len(tail_cols):
+                if j not in used and is_review_col(tail_cols[j]):
+                    pairs.append((tail_cols[i], tail_cols[j]))
+                    used.add(i); used.add(j)
+                    found = True
+                    break
+                j += 1
+            if not found and i + 1 < len(tail_cols):
+                # adjacency fallback
+                pairs.append((tail_cols[i], tail_cols[i+1]))
+                used.add(i); used.add(i+1)
+
+    # If still nothing, pair by position (5th with 6th, 7th with 8th, ...)
+    if not pairs:
+        for k in range(0, len(tail_cols), 2):
+            left = tail_cols[k]
+            right = tail_cols[k+1] if k+1 < len(tail_cols) else None
+            if right is not None:
+                pairs.append((left, right))
+    return pairs
+
+
+def rev_tag(rev_col):
+    """Short revision tag for a Rev column header ('Rev 0' -> 'Rev0')."""
+    m = re.findall(r'\d+', normalize_header(rev_col))
+    return f"Rev{m[0]}" if m else normalize_header(rev_col)
+
+
+def melt_review_history(df_plot, pairs, title_col):
+    """
+    Long table (title, rev, submit, review) with one row per Rev/Review pair that has a
+    submission date, reshaped across all pairs at once; rev tags are computed once per column.
+    Rows are in plotting order: by title, then submission date, then review (or submission) date.
+    """
+    n_rows, n_pairs = len(df_plot), len(pairs)
+    submit = df_plot[[rev_c for rev_c, _ in pairs]].to_numpy(dtype="datetime64[ns]").ravel()
+    review = df_plot[[revw_c for _, revw_c in pairs]].to_numpy(dtype="datetime64[ns]").ravel()
+    title = np.repeat(df_plot[title_col].astype(str).to_numpy(), n_pairs)
+    rev = np.tile(np.array([rev_tag(rev_c) for rev_c, _ in pairs], dtype=object), n_rows)
+
+    keep = ~np.isnat(submit)
+    submit, review, title, rev = submit[keep], review[keep], title[keep], rev[keep]
+    last = np.where(np.isnat(review), submit, review)
+    title_codes = pd.factorize(title, sort=True)[0]
+    order = np.lexsort((last.view("i8"), submit.view("i8"), title_codes))  # stable, like the former list sort
+    return pd.DataFrame({"title": title[order], "rev": rev[order], "submit": submit[order], "review": review[order]})
+
+
+def build_actual_segments(history):
+    """One dict (title, rev, submit, review) per row of melt_review_history; review is None until reviewed."""
+    return [
+        {"title": title, "rev": rev, "submit": submit, "review": review if pd.notna(review) else None}
+        for title, rev, submit, review in zip(history["title"], history["rev"], history["submit"], history["review"])
+    ]
+
+
+def build_expected_segments(df_expected):
+    """
+    One dict (title, ifr_exp, ifa_exp, ift_exp) per register row with an Issuance Expected date.
+    The expected columns are the datetimes computed by add_expected_dates.
+    """
+    expected_segments = []
+    for _, r in df_expected.iterrows():
+        ifr_exp = r["Issuance Expected"]
+        ifa_exp = r["Expected review"]
+        ift_exp = r["Final Issuance Expected"]
+        if pd.notna(ifr_exp):  # Only include if Issuance Expected is not null
+            expected_segments.append({
+                "title": str(r["Document Title"]),
+                "ifr_exp": ifr_exp,
+                "ifa_exp": ifa_exp if pd.notna(ifa_exp) else None,
+                "ift_exp": ift_exp if pd.notna(ift_exp) else None
+            })
+    return expected_segments
+
+
+def select_label_points(history):
+    """
+    Points that get a text label, from melt_review_history: each document's first submission and
+    its latest submission/review date. Keys are (title, date, "submit"|"review"), values the rev
+    tag. Ties go to the earlier row in plotting order, submissions before reviews.
+    """
+    first = history.loc[history.groupby("title", sort=True)["submit"].idxmin()]
+    candidates = pd.concat([
+        history[["title", "rev", "submit"]].rename(columns={"submit": "date"}).assign(kind="submit"),
+        history[["title", "rev", "review"]].rename(columns={"review": "date"}).assign(kind="review"),
+    ], ignore_index=True).dropna(subset=["date"])
+    last = candidates.loc[candidates.groupby("title", sort=True)["date"].idxmax()]
+    label_points = {}
+    for first_point, last_point in zip(first.itertuples(index=False), last.itertuples(index=False)):
+        label_points[(first_point.title, first_point.submit, "submit")] = first_point.rev
+        label_points[(last_point.title, last_point.date, last_point.kind)] = last_point.rev
+    return label_points
+
+
+def timeline_page(actual_segments, expected_segments, titles, title_labels, label_points, page, page_size):
+    """
+    The plot inputs restricted to the documents on one page (0-based) of `page_size` titles, so
+    the figure height and PNG size stay bounded whatever the selection size.
+    """
+    start = page * page_size
+    page_titles = titles[start:start + page_size]
+    on_page = set(page_titles)
+    return (
+        [seg for seg in actual_segments if seg["title"] in on_page],
+        [seg for seg in expected_segments if seg["title"] in on_page],
+        page_titles,
+        title_labels[start:start + page_size],
+        {key: rev for key, rev in label_points.items() if key[0] in on_page},
+    )
+
+
+class LabelGrid:
+    """
+    Uniform grid over (date number, y) of the label boxes placed so far. Each box is stored in
+    every cell it touches, so an overlap test only compares the boxes sharing a cell with the
+    query instead of every earlier label. Overlap is the same strict box test as before.
+    """
+
+    def __init__(self, cell_width, cell_height):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cells = {}
+
+    def _cells(self, x_min, x_max, y_min, y_max):
+        for i in range(math.floor(x_min / self.cell_width), math.floor(x_max / self.cell_width) + 1):
+            for j in range(math.floor(y_min / self.cell_height), math.floor(y_max / self.cell_height) + 1):
+                yield i, j
+
+    def overlaps(self, x_min, x_max, y_min, y_max):
+        for cell in self._cells(x_min, x_max, y_min, y_max):
+            for ox_min, ox_max, oy_min, oy_max in self.cells.get(cell, ()):
+                if x_max > ox_min and x_min < ox_max and y_max > oy_min and y_min < oy_max:
+                    return True
+        return False
+
+    def add(self, x_min, x_max, y_min, y_max):
+        box = (x_min, x_max, y_min, y_max)
+        for cell in self._cells(x_min, x_max, y_min, y_max):
+            self.cells.setdefault(cell, []).append(box)
+
+
+def plot_review_timeline(ax, actual_segments, expected_segments, titles, title_labels, label_points, show_grid=True):
+    """
+    Submission ➜ review bars per document with expected-date markers. Labels go above (actual)
+    or below (expected) the line and are stacked/jittered to avoid overlapping earlier labels.
+    Bars are drawn as one LineCollection per line style and markers as one scatter per marker type.
+    """
+    y_positions = {t: i for i, t in enumerate(titles)}
+    ax.xaxis_date()  # Set x-axis to datetime immediately
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%d-%b-%Y"))
+    ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+    label_offset_y = 12   # Initial vertical offset (above or below the line, pixels)
+    font_size = 7         # Slightly larger font for readability
+    max_jitter_x = 20     # Maximum horizontal jitter (pixels)
+    vertical_step = 10    # Vertical offset step for stacking (pixels)
+    label_width_days = 3  # Tighter overlap detection
+
+    color_cycle = mpl.rcParams['axes.prop_cycle'].by_key().get('color', ['#1f77b4'])
+    title_color_map = {t: color_cycle[i % len(color_cycle)] for i, t in enumerate(titles)}
+
+    # Track occupied label regions separately for above and below; cells are one label in size
+    label_height = 0.2  # y-units from (offset - 5) to (offset + 15) points, see get_label_position
+    occupied_regions_above = LabelGrid(label_width_days, label_height)
+    occupied_regions_below = LabelGrid(label_width_days, label_height)
+
+    def is_overlapping(x_min, x_max, y_min, y_max, is_actual=False):
+        """Check if a new label overlaps with existing labels in the same group (above or below)."""
+        regions = occupied_regions_above if is_actual else occupied_regions_below
+        return regions.overlaps(x_min, x_max, y_min, y_max)
+
+    def get_label_position(x, y, is_actual=False):
+        """Calculate label position: above for actual, below for expected, with stacking."""
+        base_y_offset = label_offset_y if is_actual else -label_offset_y
+        y_offset = base_y_offset
+        x_jitter = 0
+        attempt = 0
+        max_attempts = 10  # Limit stacking to prevent excessive spread
+
+        # Convert x (datetime) to numeric for collision detection
+        x_num = mdates.date2num(x)
+        x_min = x_num - label_width_days / 2
+        x_max = x_num + label_width_days / 2
+        y_min = y + (y_offset - 5) / 100  # Approximate height in y-units
+        y_max = y + (y_offset + 15) / 100
+
+        while is_overlapping(x_min, x_max, y_min, y_max, is_actual):
+            attempt += 1
+            if attempt % 2 == 0:
+                # Vertical stacking (up for actual, down for expected)
+                y_offset += vertical_step if is_actual else -vertical_step
+            else:
+                # Horizontal jitter (alternate left/right)
+                x_jitter = (-1) ** attempt * (attempt // 2 + 1) * 10
+                if abs(x_jitter) > max_jitter_x:
+                    x_jitter = 0
+                    y_offset += vertical_step if is_actual else -vertical_step
+            y_min = y + (y_offset - 5) / 100
+            y_max = y + (y_offset + 15) / 100
+            if attempt >= max_attempts:
+                break  # Accept slight overlap if necessary
+
+        (occupied_regions_above if is_actual else occupied_regions_below).add(x_min, x_max, y_min, y_max)
+        return x_jitter, y_offset
+
+    # Actual segments (submission and review): collect the primitives, label in plotting order
+    submit_x, submit_y, submit_c = [], [], []
+    review_x, review_y, review_c = [], [], []
+    in_progress_x, in_progress_y, in_progress_c = [], [], []
+    actual_segments = sorted(actual_segments, key=lambda z: (y_positions[z["title"]], z["submit"], z["review"] or z["submit"]))
+    for seg in actual_segments:
+        y = y_positions[seg["title"]]
+        c = title_color_map[seg["title"]]
+        x0 = seg["submit"]
+        x1 = seg["review"]
+
+        submit_x.append(x0); submit_y.append(y); submit_c.append(c)
+        # Label only if it's the first submission
+        if (seg["title"], x0, "submit") in label_points:
+            x_jitter0, y_offset0 = get_label_position(x0, y, is_actual=True)
+            ax.annotate(f'{seg["rev"]}\n{x0.strftime("%d-%b-%y")}',
+                        xy=(x0, y), xytext=(x_jitter0, y_offset0),
+                        textcoords='offset points', ha='center', va='bottom',
+                        fontsize=font_size, bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=0.85))
+
+        if x1 is not None:
+            review_x.append((x0, x1)); review_y.append(y); review_c.append(c)
+            # Label only if it's the last point
+            if (seg["title"], x1, "review") in label_points:
+                x_jitter1, y_offset1 = get_label_position(x1, y, is_actual=True)
+                ax.annotate(f'{seg["rev"]} review\n{x1.strftime("%d-%b-%y")}',
+                            xy=(x1, y), xytext=(x_jitter1, y_offset1),
+                            textcoords='offset points', ha='center', va='bottom',
+                            fontsize=font_size, bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=0.85))
+        else:
+            # No review yet: short tick to indicate in-progress
+            in_progress_x.append(x0); in_progress_y.append(y); in_progress_c.append(c)
+
+    # Expected segments (IFR Exp, IFA Exp, IFT Exp)
+    expected_lines, expected_x, expected_y = [], [], []
+    for seg in expected_segments:
+        y = y_positions.get(seg["title"])
+        if y is None:
+            continue  # Skip if title not in selected documents
+        date_label_pairs = [
+            (d.to_pydatetime() if isinstance(d, pd.Timestamp) else d, lbl)
+            for d, lbl in [(seg["ifr_exp"], "Submission"), (seg["ifa_exp"], "Review"), (seg["ift_exp"], "Final Doc")]
+            if d is not None and pd.notna(d)
+        ]
+        if not date_label_pairs:
+            continue
+        # Sort dates to ensure correct plotting order
+        date_label_pairs.sort(key=lambda x: x[0])
+        expected_lines.append(mdates.date2num([d for d, _ in date_label_pairs]))
+        expected_y.append(y)
+        for x, label in date_label_pairs:
+            expected_x.append(x)
+            x_jitter, y_offset = get_label_position(x, y, is_actual=False)
+            ax.annotate(f'{label}\n{x.strftime("%d-%b-%y")}',
+                        xy=(x, y), xytext=(x_jitter, y_offset),
+                        textcoords='offset points', ha='center', va='top',
+                        fontsize=font_size, bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=0.85))
+
+    # Batched artists: lines below, markers above them
+    if review_x:
+        x = mdates.date2num(review_x)
+        y = np.repeat(np.asarray(review_y, dtype=float), 2).reshape(-1, 2)
+        ax.add_collection(LineCollection(np.stack([x, y], axis=-1), colors=review_c, linewidths=2, alpha=0.9))
+    if in_progress_x:
+        x0 = mdates.date2num(in_progress_x)
+        x = np.stack([x0, x0 + 1], axis=-1)  # one day long
+        y = np.repeat(np.asarray(in_progress_y, dtype=float), 2).reshape(-1, 2)
+        ax.add_collection(LineCollection(np.stack([x, y], axis=-1), colors=in_progress_c, linewidths=1.5, alpha=0.6))
+    if expected_lines:
+        ax.add_collection(LineCollection(
+            [np.column_stack([x, np.full(len(x), y)]) for x, y in zip(expected_lines, expected_y)],
+            colors=EXPECTED_COLOR, linestyles=':', linewidths=2, alpha=0.7, label="Expected Timeline"
+        ))
+    marker_style = dict(linewidths=0, zorder=2.5)
+    ax.scatter(mdates.date2num(submit_x), submit_y, marker=SUBMIT_MARKER, s=7**2, c=submit_c, **marker_style)
+    if review_x:
+        ax.scatter(mdates.date2num([x1 for _, x1 in review_x]), review_y, marker=REVIEW_MARKER, s=6**2, c=review_c,
+                   **marker_style)
+    if expected_x:
+        ax.scatter(mdates.date2num(expected_x), [y for y, x in zip(expected_y, expected_lines) for _ in x],
+                   marker=EXPECTED_MARKER, s=6**2, c=EXPECTED_COLOR, **marker_style)
+    ax.autoscale_view()
+
+    # Legend entries for markers only (dot = submission, square = review)
+    extra_legend = [
+        Line2D([0], [0], marker=SUBMIT_MARKER, linestyle='None', color='none',
+               markerfacecolor='#1f77b4', markeredgecolor='#1f77b4', markersize=7, label='Submission'),
+        Line2D([0], [0], marker=REVIEW_MARKER, linestyle='None', color='none',
+               markerfacecolor='#1f77b4', markeredgecolor='#1f77b4', markersize=7, label='Review'),
+    ]
+
+    ax.set_yticks([y_positions[t] for t in titles])
+    ax.set_yticklabels(title_labels, fontsize=8)
+    ax.set_ylim(-0.6, len(titles) - 0.4)
+    ax.set_xlabel("Date", fontsize=9)
+    ax.set_title("Submission → Review Timeline with Expected Dates", fontsize=11)
+    if show_grid:
+        ax.grid(True, axis='x', linestyle='--', alpha=0.35)
+    handles, labels = ax.get_legend_handles_labels()
+    ax.legend(handles=extra_legend + handles, fontsize=8, loc='upper left')
+
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.figure.tight_layout()
+
+
+def review_table(actual_segments, expected_segments, titles):
+    """Compact table of the plotted revisions and expected dates."""
+    tbl_rows = []
+    for s in actual_segments:
+        tbl_rows.append({
+            "Document Title": s["title"],
+            "Type": "Actual",
+            "Revision": s["rev"],
+            "Submission": s["submit"].strftime("%d-%b-%y") if pd.notna(s["submit"]) else "—",
+            "Review": s["review"].strftime("%d-%b-%y") if s["review"] else "—",
+            "IFR Exp": "—",
+            "IFA Exp": "—",
+            "IFT Exp": "—"
+        })
+    shown = set(titles)
+    for s in expected_segments:
+        if s["title"] not in shown:
+            continue
+        tbl_rows.append({
+            "Document Title": s["title"],
+            "Type": "Expected",
+            "Revision": "—",
+            "Submission": "—",
+            "Review": "—",
+            "First Submission": s["ifr_exp"].strftime("%d-%b-%y") if pd.notna(s["ifr_exp"]) else "—",
+            "Document Review": s["ifa_exp"].strftime("%d-%b-%y") if s["ifa_exp"] else "—",
+            "Final Submission": s["ift_exp"].strftime("%d-%b-%y") if s["ift_exp"] else "—"
+        })
+    return pd.DataFrame(tbl_rows)
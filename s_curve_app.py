@@ -1,4 +1,3 @@
-import re
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -8,48 +7,12 @@ import numpy as np
 import seaborn as sns
 from cycler import cycler
 import squarify
+from scurve_engine import (
+    parse_date_column, build_milestone_indexes, cumulative_at, events_at, gated_curve, DOC_STATUSES, final_milestones, document_statuses
+)
 
 plt.rcParams.update({'font.size': 8})
 
-def robust_parse_date(d):
-    """
-    Enhanced date parser that handles multiple formats and converts to standard format
-    Returns: 
-        - pd.Timestamp for valid dates
-        - pd.NaT for invalid dates
-        - Dates are always converted to 'dd-MMM-yy' format (e.g., '11-MAY-25')
-    """
-    if pd.isna(d) or d in ['', '########', '0-Jan-00', '00-Jan-00', 'NaN', 'NaT']:
-        return pd.NaT
-    
-    if isinstance(d, str) and re.match(r'^\d{2}-[A-Z]{3}-\d{2}$', d.upper()):
-        try:
-            return pd.to_datetime(d, format='%d-%b-%y')
-        except:
-            pass
-    
-    date_formats = [
-        '%d-%b-%y', '%d-%B-%y', '%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d',
-        '%b %d, %Y', '%B %d, %Y', '%d.%m.%Y', '%Y%m%d', '%m-%d-%Y', '%d %b %Y'
-    ]
-    
-    for fmt in date_formats:
-        try:
-            dt = pd.to_datetime(d, format=fmt, errors='coerce')
-            if not pd.isna(dt):
-                return pd.to_datetime(dt.strftime('%d-%b-%y').upper(), format='%d-%b-%y')
-        except:
-            continue
-    
-    try:
-        dt = pd.to_datetime(d, errors='coerce')
-        if not pd.isna(dt):
-            return pd.to_datetime(dt.strftime('%d-%b-%y').upper(), format='%d-%b-%y')
-    except:
-        pass
-    
-    return pd.NaT
-
 def main():
     st.set_page_config(page_title="S-Curve Analysis", layout="wide")
 
@@ -156,7 +119,7 @@ def main():
 
     date_columns = ["Issued by EPC", "Review By OE", "Reply By EPC"]
     for col in date_columns:
-        df[col] = df[col].apply(robust_parse_date)
+        df[col] = parse_date_column(df[col]).dt.normalize()  # day precision, as the app always used
         na_count = df[col].isna().sum()
         if na_count > 0:
             st.warning(f"Column '{col}' has {na_count} dates that couldn't be parsed")
@@ -199,61 +162,25 @@ def main():
     # --------------------------
     # 4) BUILD ACTUAL AND EXPECTED CUMULATIVE VALUES
     # --------------------------
-    actual_cum = []
-    last_actual_value = 0.0
-    last_progress_date = start_date
-    
-    for current_date in actual_timeline:
-        a_sum = 0.0
-        has_progress = False
-        for _, row in df.iterrows():
-            mh = row["Man Hours "]
-            a_val = 0.0
-            if pd.notna(row["Issued by EPC"]) and row["Issued by EPC"] <= current_date:
-                a_val += IFR_WEIGHT
-            if pd.notna(row["Review By OE"]) and row["Review By OE"] <= current_date:
-                a_val += IFA_WEIGHT
-            if pd.notna(row["Reply By EPC"]) and row["Reply By EPC"] <= current_date:
-                a_val += IFT_WEIGHT
-            if a_val > 0:
-                has_progress = True
-            a_sum += mh * a_val
-        if has_progress:
-            last_actual_value = a_sum
-            last_progress_date = current_date
-            actual_cum.append(a_sum)
-        else:
-            actual_cum.append(last_actual_value)
+    # Each milestone column is sorted once; every timeline point is then a searchsorted lookup
+    weights = [IFR_WEIGHT, IFA_WEIGHT, IFT_WEIGHT]
+    actual_indexes, expected_indexes = build_milestone_indexes(df, flag_final=False)
+
+    a_sums = sum(cumulative_at(idx, actual_timeline) * w for idx, w in zip(actual_indexes, weights))
+    a_events = sum(events_at(idx, actual_timeline) for idx in actual_indexes)
+    actual_cum, last_progress_date = gated_curve(a_sums, a_events, actual_timeline, start_date)
+    actual_cum = actual_cum.tolist()
+    last_actual_value = actual_cum[-1] if actual_cum else 0.0
     
     if last_progress_date < today_date:
         actual_timeline = list(actual_timeline) + [today_date]
         actual_cum = actual_cum + [last_actual_value]
 
-    expected_cum = []
-    last_expected_value = 0.0
-    last_expected_progress_date = start_date
-    
-    for current_date in expected_timeline:
-        e_sum = 0.0
-        has_progress = False
-        for _, row in df.iterrows():
-            mh = row["Man Hours "]
-            e_val = 0.0
-            if pd.notna(row["Issuance Expected"]) and row["Issuance Expected"] <= current_date:
-                e_val += IFR_WEIGHT
-            if pd.notna(row["Expected review"]) and row["Expected review"] <= current_date:
-                e_val += IFA_WEIGHT
-            if pd.notna(row["Final Issuance Expected"]) and row["Final Issuance Expected"] <= current_date:
-                e_val += IFT_WEIGHT
-            if e_val > 0:
-                has_progress = True
-            e_sum += mh * e_val
-        if has_progress:
-            last_expected_value = e_sum
-            last_expected_progress_date = current_date
-            expected_cum.append(e_sum)
-        else:
-            expected_cum.append(last_expected_value)
+    e_sums = sum(cumulative_at(idx, expected_timeline) * w for idx, w in zip(expected_indexes, weights))
+    e_events = sum(events_at(idx, expected_timeline) for idx in expected_indexes)
+    expected_cum, last_expected_progress_date = gated_curve(e_sums, e_events, expected_timeline, start_date)
+    expected_cum = expected_cum.tolist()
+    last_expected_value = expected_cum[-1] if expected_cum else 0.0
     
     if pd.notna(ift_expected_max) and last_expected_progress_date < ift_expected_max:
         expected_timeline = list(expected_timeline) + [ift_expected_max]
@@ -500,13 +427,9 @@ def main():
     # 10) NESTED PIE CHART FOR DISCIPLINE
     # --------------------------
     st.subheader("Nested Pie Chart: Document Completion by Discipline")
-    def get_doc_status(row):
-        if pd.notna(row["Reply By EPC"]) and row["Flag"] == 1:
-            return "Completed"
-        else:
-            return "Incomplete"
-    df["Doc_Status"] = df.apply(get_doc_status, axis=1)
-    disc_counts = df.groupby("Discipline").size()
+    df["Doc_Status"] = document_statuses(df)
+    status_counts = pd.crosstab(df["Discipline"], df["Doc_Status"]).reindex(columns=DOC_STATUSES, fill_value=0)
+    disc_counts = status_counts.sum(axis=1)
     if disc_counts.empty:
         st.warning("No Discipline data available for pie chart.")
     else:
@@ -526,15 +449,13 @@ def main():
                 outer_colors = sns.color_palette("Greens", n_colors=n_disciplines)
         else:
             outer_colors = sns.color_palette(seaborn_palette, n_colors=n_disciplines)
-        inner_sizes = []
-        inner_colors = []
+        # Inner ring: completed then incomplete documents of each discipline
         status_colors = {"Completed": "#808080", "Incomplete": "#F0F0F0"}
-        for disc in disc_counts.index:
-            disc_docs = df[df["Discipline"] == disc]
-            for _, row in disc_docs.iterrows():
-                inner_sizes.append(1)
-                inner_colors.append(status_colors[row["Doc_Status"]])
-        if not inner_sizes or sum(inner_sizes) == 0:
+        inner_sizes = status_counts.to_numpy().ravel()
+        inner_colors = np.tile([status_colors[s] for s in DOC_STATUSES], len(status_counts))
+        inner_colors = inner_colors[inner_sizes > 0]
+        inner_sizes = inner_sizes[inner_sizes > 0]
+        if inner_sizes.sum() == 0:
             st.warning("No valid data for inner pie chart (Discipline). All counts are zero or empty.")
         else:
             outer_wedges, outer_texts = ax_nested_disc.pie(
@@ -648,23 +569,9 @@ def main():
     # --------------------------
     # 13) FINAL MILESTONE + STATUS STACKED BAR
     # --------------------------
-    def get_final_milestone(row):
-        if pd.notna(row["Reply By EPC"]):
-            return "Reply By EPC"
-        elif pd.notna(row["Review By OE"]):
-            return "Review By OE"
-        elif pd.notna(row["Issued by EPC"]):
-            return "Issued by EPC"
-        else:
-            return "NO ISSUANCE"
-    df["FinalMilestone"] = df.apply(get_final_milestone, axis=1)
+    df["FinalMilestone"] = final_milestones(df, flag_final=False, sequential=False)
     st.subheader("Documents by Final Milestone (Stacked by Status)")
-    group_df = (
-        df.groupby(["FinalMilestone","Status"])["ID"]
-          .count()
-          .reset_index(name="Count")
-    )
-    pivoted = group_df.pivot(index="FinalMilestone", columns="Status", values="Count").fillna(0)
+    pivoted = pd.crosstab(df["FinalMilestone"], df["Status"])
     pivoted = pivoted.reindex(["Issued by EPC","Review By OE","Reply By EPC"]).dropna(how="all")
     fig_status, ax_status = plt.subplots(figsize=(7,5))
     pivoted.plot(kind="bar", stacked=True, ax=ax_status)
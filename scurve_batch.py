@@ -0,0 +1,187 @@
+"""
+Headless S-curve reports for a directory of EDDR registers.
+
+    python scurve_batch.py registers/ -o reports/ --initial-date 2024-08-01 --workers 8
+
+Each CSV/XLSX file is processed in its own worker process and gets an output folder with the
+S-curve series, discipline tables, delay table and PNG charts. A summary.csv lists every file
+with its status and messages.
+"""
+import argparse
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from scurve_engine import (
+    REGISTER_COLUMNS, read_register, missing_columns, prepare_register, compact_register, GRANULARITIES, DELAY_THRESHOLD_DAYS, ScurveParams, compute_scurve, stream_histograms, compute_scurve_from_histograms
+)
+from scurve_charts import plot_scurve, plot_discipline_progress, plot_discipline_delay
+
+REGISTER_EXTENSIONS = ["csv", "xlsx", "xls"]
+
+
+def find_registers(input_dir):
+    """All CSV/XLSX files directly inside `input_dir`, sorted by name."""
+    return sorted(
+        p for p in Path(input_dir).iterdir()
+        if p.is_file() and p.suffix.lower().lstrip('.') in REGISTER_EXTENSIONS and not p.name.startswith('~$')
+    )
+
+
+def save_figure(fig, path):
+    """Write a Figure to PNG. Figures built with the OO API are not tracked by pyplot."""
+    fig.savefig(path, dpi=120)
+
+
+def process_register(path, params, output_dir):
+    """
+    Run the S-curve pipeline on one register and write its outputs to output_dir/<file stem>/.
+    Returns a summary dict; errors are reported in it instead of raised. A register without the
+    template columns is reported as "invalid" with the missing names, before any processing.
+    """
+    started = time.perf_counter()
+    messages = []
+    notify = lambda level, message: messages.append(f"{level}: {message}")
+    summary = {"file": Path(path).name, "status": "ok", "rows": 0}
+    try:
+        file_extension = Path(path).suffix.lower().lstrip('.')
+        streaming = params["chunksize"] and file_extension == "csv"
+        df = pd.read_csv(path, nrows=0) if streaming else read_register(path, file_extension)
+        missing = missing_columns(df.columns)
+        if missing:
+            summary["status"] = "invalid"
+            messages.append(f"missing columns: {', '.join(repr(c) for c in missing)} "
+                            f"({len(df.columns)} of {len(REGISTER_COLUMNS)} template columns present)")
+            return summary
+        if streaming:
+            histograms = stream_histograms(path, params["scurve"], params["ignore_status"],
+                                           chunksize=params["chunksize"], notify=notify)
+            if histograms is None:
+                summary["status"] = "no data"
+                return summary
+            summary["rows"] = histograms.rows
+            result = compute_scurve_from_histograms(histograms, params["scurve"], notify=notify)
+        else:
+            df = prepare_register(df, params["ignore_status"], notify=notify)
+            if df is None:
+                summary["status"] = "no data"
+                return summary
+            df = compact_register(df)
+            summary["rows"] = len(df)
+            result = compute_scurve(df, params["scurve"], notify=notify)
+        if result is None:
+            summary["status"] = "no dates"
+            return summary
+
+        project_dir = Path(output_dir) / Path(path).stem
+        project_dir.mkdir(parents=True, exist_ok=True)
+        result.actual_frame().to_csv(project_dir / "scurve_actual.csv", index=False)
+        result.expected_frame().to_csv(project_dir / "scurve_expected.csv", index=False)
+        result.projected_frame().to_csv(project_dir / "scurve_projected.csv", index=False)
+        result.by_disc.to_csv(project_dir / "discipline_at_final.csv")
+        result.disc_delay.to_csv(project_dir / "discipline_delay_today.csv")
+        result.delays.to_csv(project_dir / "issuance_delays.csv", index=False)
+
+        fig = Figure(figsize=(10, 6))
+        plot_scurve(fig.subplots(), result, percentage_view=params["percentage_view"])
+        save_figure(fig, project_dir / "scurve.png")
+        fig = Figure(figsize=(8, 5))
+        plot_discipline_progress(fig.subplots(), result.by_disc)
+        save_figure(fig, project_dir / "discipline_progress.png")
+        fig = Figure(figsize=(8, 5))
+        plot_discipline_delay(fig.subplots(), result.disc_delay)
+        save_figure(fig, project_dir / "discipline_delay.png")
+
+        summary.update({
+            "actual_today_mh": result.actual_today,
+            "expected_today_mh": result.expected_today,
+            "delay_pct": result.delay_pct,
+            "recovery_end": result.recovery_end_date,
+            "delayed_docs": len(result.delays),
+        })
+    except Exception as e:
+        summary["status"] = "failed"
+        messages.append(f"error: {e}\n{traceback.format_exc()}")
+    finally:
+        summary["seconds"] = round(time.perf_counter() - started, 3)
+        summary["messages"] = " | ".join(messages)
+    return summary
+
+
+def run_batch(input_dir, output_dir, params, workers=None):
+    """Process every register in `input_dir` concurrently; returns the summary DataFrame."""
+    paths = find_registers(input_dir)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    summaries = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_register, p, params, output_dir): p for p in paths}
+        for future in as_completed(futures):
+            summary = future.result()
+            print(f"[{summary['status']}] {summary['file']} ({summary['seconds']}s)", flush=True)
+            summaries.append(summary)
+    summary_df = pd.DataFrame(summaries).sort_values("file") if summaries else pd.DataFrame()
+    summary_df.to_csv(Path(output_dir) / "summary.csv", index=False)
+    return summary_df
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch S-curve reports for a directory of EDDR files.")
+    parser.add_argument("input_dir", help="Directory containing EDDR CSV/XLSX files")
+    parser.add_argument("-o", "--output-dir", default="scurve_reports", help="Output folder (default: scurve_reports)")
+    parser.add_argument("--initial-date", default="2024-08-01", help="Initial date for expected calculations")
+    parser.add_argument("--ifr-weight", type=float, default=0.40, help="Issued By EPC weight")
+    parser.add_argument("--ifa-weight", type=float, default=0.30, help="Review By OE weight")
+    parser.add_argument("--ift-weight", type=float, default=0.30, help="Reply By EPC weight")
+    parser.add_argument("--recovery-factor", type=float, default=0.75)
+    parser.add_argument("--ifa-delta-days", type=int, default=10, help="Days to add for Expected Review")
+    parser.add_argument("--ift-delta-days", type=int, default=5, help="Days to add for Final Issuance Expected")
+    parser.add_argument("--ignore-status", default="", help="Comma-separated statuses to exclude (case-sensitive)")
+    parser.add_argument("--percentage-view", action="store_true", help="Plot the S-curve as %% of total works")
+    parser.add_argument("--today", default=None, help="Override today's date (default: current date)")
+    parser.add_argument("--granularity", choices=GRANULARITIES, default="weekly",
+                        help="S-curve sampling: every milestone date (exact), daily, weekly or monthly (default: weekly)")
+    parser.add_argument("--delay-threshold-days", type=int, default=DELAY_THRESHOLD_DAYS,
+                        help=f"Minimum issuance delay listed in issuance_delays.csv (default: {DELAY_THRESHOLD_DAYS})")
+    parser.add_argument("--chunksize", type=int, default=0,
+                        help="Stream CSV registers in chunks of this many rows to bound memory (default: read whole file)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    if not Path(args.input_dir).is_dir():
+        parser.error(f"input_dir {args.input_dir!r} is not a directory" if Path(args.input_dir).exists()
+                     else f"input_dir {args.input_dir!r} does not exist")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    params = {
+        "ignore_status": args.ignore_status,
+        "percentage_view": args.percentage_view,
+        "chunksize": args.chunksize,
+        "scurve": ScurveParams(
+            initial_date=pd.Timestamp(args.initial_date),
+            ifr_weight=args.ifr_weight,
+            ifa_weight=args.ifa_weight,
+            ift_weight=args.ift_weight,
+            recovery_factor=args.recovery_factor,
+            ifa_delta_days=args.ifa_delta_days,
+            ift_delta_days=args.ift_delta_days,
+            today=pd.Timestamp(args.today).normalize() if args.today else pd.Timestamp.today().normalize(),
+            granularity=args.granularity,
+            delay_threshold_days=args.delay_threshold_days,
+        ),
+    }
+    summary = run_batch(args.input_dir, args.output_dir, params, workers=args.workers)
+    failed = (summary["status"] == "failed").sum() if not summary.empty else 0
+    invalid = (summary["status"] == "invalid").sum() if not summary.empty else 0
+    print(f"Processed {len(summary)} registers into {args.output_dir} ({failed} failed, {invalid} invalid)")
+    return 1 if failed or invalid else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,181 @@
+import matplotlib.dates as mdates
+import numpy as np
+
+DEFAULT_SCURVE_COLORS = {
+    "actual": "#1f77b4",
+    "expected": "#ff7f0e",
+    "projected": "#2ca02c",
+    "today": "#000000",
+    "end_date": "#d62728",
+}
+
+# ScurveResult fields plot_scurve reads, e.g. to fingerprint its inputs for a figure cache
+SCURVE_FIELDS = [
+    "total_mh", "today_date", "ift_expected_max", "granularity", "actual_timeline", "actual_cum",
+    "last_progress_date", "expected_timeline", "expected_cum", "last_expected_progress_date",
+    "projected_timeline", "projected_cum", "recovery_end_date", "today_idx", "expected_today_idx",
+    "actual_today", "expected_today",
+]
+
+
+def plot_scurve(ax, result, percentage_view=False, colors=None, show_grid=True):
+    """Draw the actual/expected/projected S-curve of a ScurveResult with today, end-date and delay annotations."""
+    colors = {**DEFAULT_SCURVE_COLORS, **(colors or {})}
+    total_mh = result.total_mh
+    today_date, ift_expected_max = result.today_date, result.ift_expected_max
+    final_expected = result.final_expected
+
+    y_actual = result.actual_cum / total_mh * 100 if percentage_view else result.actual_cum
+    y_expected = result.expected_cum / total_mh * 100 if percentage_view else result.expected_cum
+    y_projected = result.projected_cum / total_mh * 100 if percentage_view else result.projected_cum
+    y_label = "Cumulative % of Total Works" if percentage_view else "Cumulative Man-Hours"
+
+    # Exact timelines hold each value until the next milestone event
+    drawstyle = "steps-post" if result.granularity == "exact" else "default"
+    ax.plot(result.actual_timeline, y_actual, label="Actual Progress", color=colors["actual"], linewidth=2,
+            drawstyle=drawstyle)
+    ax.plot(result.expected_timeline, y_expected, label="Expected Progress", color=colors["expected"], linewidth=2,
+            drawstyle=drawstyle)
+
+    if result.last_progress_date < today_date:
+        ax.hlines(y=y_actual[-1], xmin=result.last_progress_date, xmax=today_date,
+                  color=colors["actual"], linestyle='-', linewidth=2)
+
+    if result.last_expected_progress_date < ift_expected_max:
+        ax.hlines(y=y_expected[-1], xmin=result.last_expected_progress_date, xmax=ift_expected_max,
+                  color=colors["expected"], linestyle='-', linewidth=2)
+
+    if len(result.projected_timeline):
+        ax.plot(
+            result.projected_timeline, y_projected, linestyle=":", label="Projected (Recovery Factor)",
+            color=colors["projected"], linewidth=3
+        )
+
+    ax.set_title("S-Curve with Delay Recovery", fontsize=12)
+    ax.set_xlabel("Date", fontsize=10)
+    ax.set_ylabel(y_label, fontsize=10)
+    if show_grid:
+        ax.grid(True)
+    ax.legend(fontsize=9)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%d-%b-%Y"))
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.figure.tight_layout()
+
+    annotation_base = y_expected[-1] if percentage_view else final_expected
+    ax.axvline(today_date, color=colors["today"], linestyle="--", linewidth=1.5, label="Today")
+    ax.annotate(
+        f"Today\n{today_date.strftime('%d-%b-%Y')}",
+        xy=(today_date, annotation_base * 0.1),
+        xytext=(10, 10), textcoords="offset points", color=colors["today"],
+        bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="none", alpha=0.7), fontsize=8
+    )
+
+    ax.axvline(ift_expected_max, linestyle="--", linewidth=1.5, color=colors["end_date"])
+    ax.annotate(
+        f"Original End\n{ift_expected_max.strftime('%d-%b-%Y')}",
+        xy=(ift_expected_max, annotation_base * 0.2),
+        xytext=(-100, 10), textcoords="offset points", color=colors["end_date"],
+        bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="none", alpha=0.7),
+        fontsize=8, arrowprops=dict(arrowstyle="->", color=colors["end_date"])
+    )
+
+    recovery_end_date = result.recovery_end_date
+    if recovery_end_date:
+        ax.axvline(recovery_end_date, linestyle="--", linewidth=1.5, color=colors["end_date"])
+        ax.annotate(
+            f"Recovery End\n{recovery_end_date.strftime('%d-%b-%Y')}",
+            xy=(recovery_end_date, annotation_base * 0.3),
+            xytext=(10,10), textcoords="offset points", color=colors["end_date"],
+            bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="none", alpha=0.7),
+            fontsize=8, arrowprops=dict(arrowstyle="->", color=colors["end_date"])
+        )
+
+    today_idx, expected_today_idx = result.today_idx, result.expected_today_idx
+    actual_today = result.actual_today
+    delay_today = result.delay_today
+    delay_pct = result.delay_pct
+
+    # Always show Actual Progress as a percentage (even if the chart is in MH)
+    actual_pct = (y_actual[today_idx] if percentage_view
+                  else ((actual_today / total_mh * 100) if total_mh > 0 else 0))
+
+    delay_text = (
+        f"Actual Progress: {actual_pct:.1f}%\n"
+        + (f"Current Delay: {delay_pct:.1f}%"
+           if percentage_view
+           else f"Current Delay: {delay_today:,.1f} MH\n({delay_pct:.1f}%)")
+    )
+
+    ax.annotate(
+        delay_text, xy=(today_date, (y_actual[today_idx] + y_expected[expected_today_idx])/2),
+        xytext=(10, -10), textcoords="offset points", color=colors["today"],
+        bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="none", alpha=0.7),
+        arrowprops=dict(arrowstyle="->", color=colors["today"]), ha="left", fontsize=8
+    )
+
+
+def plot_discipline_progress(ax, by_disc, percentage_view=False, show_grid=True, as_of=None):
+    """Grouped bars of actual vs expected progress per discipline (at the end date unless `as_of` is given)."""
+    title = "Actual vs. Expected Works by Discipline" if percentage_view else "Actual vs. Expected Hours by Discipline"
+    if as_of is not None:
+        title += f" (as of {as_of:%d-%b-%y})"
+    x = range(len(by_disc.index))
+    width = 0.35
+    ax.bar(
+        [i - width/2 for i in x], by_disc["Actual_Progress_At_Final"],
+        width=width, label='Actual Works' if percentage_view else 'Actual Hours'
+    )
+    ax.bar(
+        [i + width/2 for i in x], by_disc["Expected_Progress_At_Final"],
+        width=width, label='Expected Works' if percentage_view else 'Expected Hours'
+    )
+    ax.set_title(title, fontsize=10)
+    ax.set_xlabel("Discipline", fontsize=9)
+    ax.set_ylabel("Percentage of Total Works" if percentage_view else "Cumulative Hours", fontsize=9)
+    ax.set_xticks(ticks=x)
+    ax.set_xticklabels(by_disc.index, rotation=45, ha='right', fontsize=8)
+    ax.legend(fontsize=8)
+    if show_grid:
+        ax.grid(True)
+    ax.figure.tight_layout()
+
+
+def plot_discipline_delay(ax, disc_delay, show_grid=True, as_of=None):
+    """Bars of the delay percentage per discipline today, or at `as_of`."""
+    ax.bar(disc_delay.index, disc_delay["Delay_%"])
+    when = f"as of {as_of:%d-%b-%y}" if as_of is not None else "Today"
+    ax.set_title(f"Delay in % by Discipline ({when})", fontsize=10)
+    ax.set_xlabel("Discipline", fontsize=9)
+    ax.set_ylabel("Delay (%)", fontsize=9)
+    ax.set_xticks(range(len(disc_delay.index)))
+    ax.set_xticklabels(disc_delay.index, rotation=45, ha='right', fontsize=8)
+    if show_grid:
+        ax.grid(True)
+    ax.figure.tight_layout()
+
+
+def plot_delay_heatmap(ax, delay_by_week, show_grid=True):
+    """
+    Delay_% per discipline (rows) and week (columns), e.g. ProgressCube.delay_by_week. Colours
+    are clipped to ±100 %; weeks before anything is expected are left blank.
+    """
+    values = np.ma.masked_invalid(delay_by_week.to_numpy(dtype=float))
+    image = ax.imshow(values, aspect="auto", cmap="RdYlGn_r", vmin=-100, vmax=100, interpolation="nearest")
+    ax.figure.colorbar(image, ax=ax, label="Delay (%)", extend="both")
+    weeks = delay_by_week.columns
+    step = max(1, len(weeks) // 12)
+    ax.set_xticks(range(0, len(weeks), step))
+    ax.set_xticklabels([weeks[i].strftime('%d-%b-%y') for i in range(0, len(weeks), step)],
+                       rotation=45, ha='right', fontsize=8)
+    ax.set_yticks(range(len(delay_by_week.index)))
+    ax.set_yticklabels(delay_by_week.index, fontsize=8)
+    ax.set_title("Delay in % by Discipline and Week", fontsize=10)
+    ax.set_xlabel("Week", fontsize=9)
+    ax.set_ylabel("Discipline", fontsize=9)
+    ax.grid(False)
+    if show_grid:
+        # Separate the discipline rows instead of drawing grid lines across the cells
+        ax.set_yticks(np.arange(-0.5, len(delay_by_week.index)), minor=True)
+        ax.grid(True, which="minor", axis="y", color="white", linewidth=1.5)
+        ax.tick_params(which="minor", left=False)
+    ax.figure.tight_layout()
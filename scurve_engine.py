@@ -0,0 +1,1017 @@
+import datetime as dt
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Full register column list (template order), including the Review/ReSub history columns
+REGISTER_COLUMNS = [
+    "ID", "Discipline", "Area", "Document Title", "Project Indentifer", "Originator",
+    "Document Number", "Document Type ", "Counter ", "Revision", "Area code",
+    "Disc", "Category", "Transmittal Code", "Comment Sheet OE", "Comment Sheet EPC",
+    "Schedule [Days]", "Issued by EPC", "Issuance Expected", "Review By OE",
+    "Expected review", "Reply By EPC", "Final Issuance Expected",
+    "Review1", "ReSub1", "Review2", "ReSub2", "Review3", "ReSub3",
+    "Review4", "ReSub4", "Review5", "ReSub5",
+    "Man Hours ", "Status", "CS rev", "Flag"
+]
+ACTUAL_COLUMNS = ["Issued by EPC", "Review By OE", "Reply By EPC"]
+EXPECTED_COLUMNS = ["Issuance Expected", "Expected review", "Final Issuance Expected"]
+DATE_COLUMNS = ACTUAL_COLUMNS + EXPECTED_COLUMNS
+# Columns prepare_register and the S-curve pipeline read
+REQUIRED_COLUMNS = ["ID", "Discipline", "Document Title", "Schedule [Days]", *DATE_COLUMNS, "Man Hours ", "Status", "Flag"]
+# Final milestone states in chart order, and the document completion states
+MILESTONE_STATES = ["NO ISSUANCE", "Issued by EPC", "Review By OE", "Reply By EPC", "Finalized"]
+DOC_STATUSES = ["Completed", "Incomplete"]
+DELAY_THRESHOLD_DAYS = 14  # issuance delays shorter than this are left out of the delay table
+
+# Low-cardinality text columns kept as pandas categoricals by compact_register
+CODE_COLUMNS = [
+    "Discipline", "Area", "Project Indentifer", "Originator", "Document Type ", "Counter ", "Revision",
+    "Area code", "Disc", "Category", "Status", "CS rev"
+]
+CATEGORY_MAX_RATIO = 0.5  # a column becomes categorical only if distinct values / rows is at most this
+
+# Timeline granularities of the S-curve; "exact" steps at every milestone event date
+TIMELINE_FREQUENCIES = {"daily": "D", "weekly": "W", "monthly": "ME"}
+GRANULARITIES = ["exact", *TIMELINE_FREQUENCIES]
+
+DATE_SENTINELS = ['', '########', '0-Jan-00', '00-Jan-00', 'NaN', 'NaT']
+DATE_FORMATS = [
+    '%d-%b-%y', '%d-%B-%y', '%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d',
+    '%b %d, %Y', '%B %d, %Y', '%d.%m.%Y', '%Y%m%d', '%m-%d-%Y', '%d %b %Y'
+]
+
+
+def quiet(level, message):
+    """Default `notify` callback: drop info/warning/error messages."""
+
+
+def untimed(name, rows=None):
+    """Default `stage` callback: run the step without instrumentation."""
+    return nullcontext()
+
+
+def infer_date_format(sample):
+    """Return the format in DATE_FORMATS that parses most of the sample (earliest wins ties), or None."""
+    best_fmt, best_hits = None, 0
+    for fmt in DATE_FORMATS:
+        hits = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+        if hits > best_hits:
+            best_fmt, best_hits = fmt, hits
+    return best_fmt
+
+
+def parse_date_column(col, sample_size=50, notify=quiet):
+    """
+    Parse a column of register dates (any of DATE_FORMATS, then free-form; DATE_SENTINELS and
+    unparseable values become NaT). Used by both apps for the register and review history.
+    Each distinct raw value is parsed once: the winning format (inferred from a sample) is applied
+    to all strings in one vectorized call, then the remaining formats only to rows still NaT.
+    Returns:
+        - datetime64[ns] Series aligned with `col`
+    """
+    col = pd.Series(col)
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col.astype('datetime64[ns]')
+
+    codes, uniques = pd.factorize(col.astype(object))
+    parsed = pd.Series(pd.NaT, index=range(len(uniques)), dtype='datetime64[ns]')
+    strings = {}
+    for i, u in enumerate(uniques):
+        if u in DATE_SENTINELS:
+            continue
+        if isinstance(u, dt.datetime):
+            parsed[i] = pd.Timestamp(u)
+        elif isinstance(u, str):
+            strings[i] = u.upper()
+    pending = pd.Series(strings, dtype=object)
+
+    winner = infer_date_format(pending.iloc[:sample_size]) if not pending.empty else None
+    if winner is not None:
+        hit = pd.to_datetime(pending, format=winner, errors='coerce')
+        ok = hit.notna()
+        # Formats listed before the winner keep precedence for values they also accept
+        for fmt in reversed(DATE_FORMATS[:DATE_FORMATS.index(winner)]):
+            earlier = pd.to_datetime(pending[ok], format=fmt, errors='coerce').dropna()
+            hit[earlier.index] = earlier
+        parsed[hit[ok].index] = hit[ok]
+        pending = pending[~ok]
+
+    for fmt in DATE_FORMATS:
+        if pending.empty:
+            break
+        if fmt == winner:
+            continue
+        hit = pd.to_datetime(pending, format=fmt, errors='coerce')
+        ok = hit.notna()
+        parsed[hit[ok].index] = hit[ok]
+        pending = pending[~ok]
+
+    # Free-form fallback stays per value: vectorized inference would lock onto the first row's format
+    for i, d in pending.items():
+        try:
+            value = pd.to_datetime(d, errors='coerce')
+        except Exception:
+            value = pd.NaT
+        if pd.notna(value):
+            parsed[i] = value
+        else:
+            notify("warning", f"Could not parse date: '{d}'")
+
+    lookup = np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))
+    values = lookup[codes]  # code -1 (missing) picks the trailing NaT
+    return pd.Series(values, index=col.index, name=col.name, dtype='datetime64[ns]')
+
+
+def read_register(source, file_extension):
+    """Read the first sheet of an Excel register or a CSV register from a path or file-like object."""
+    if file_extension in ['xlsx', 'xls']:
+        return pd.read_excel(source)
+    return pd.read_csv(source)
+
+
+def missing_columns(columns):
+    """
+    REQUIRED_COLUMNS a register with these header cells lacks. prepare_register names the columns
+    by position in the template, so only their number matters.
+    """
+    present = set(REGISTER_COLUMNS[:len(columns)])
+    return [col for col in REQUIRED_COLUMNS if col not in present]
+
+
+def prepare_register(df, ignore_status="", notify=quiet):
+    """
+    Assign the template column names, drop ignored statuses and parse milestone dates and
+    numeric columns.
+    Returns:
+        - the prepared DataFrame
+        - None if no rows remain after status filtering
+    """
+    df.columns = REGISTER_COLUMNS[:len(df.columns)]  # Assign only up to the number of columns present
+
+    if ignore_status.strip():
+        statuses_to_exclude = [s.strip() for s in ignore_status.split(',') if s.strip()]
+        initial_len = len(df)
+        df = df[~df["Status"].isin(statuses_to_exclude)]
+        filtered_len = len(df)
+        if filtered_len < initial_len:
+            notify("info", f"Filtered out {initial_len - filtered_len} rows with Status in: {', '.join(statuses_to_exclude)}")
+        if filtered_len == 0:
+            notify("error", "All rows have Status in exclusion list. No data remains after filtering.")
+            return None
+
+    for col in DATE_COLUMNS:
+        df[col] = parse_date_column(df[col], notify=notify)
+        na_count = df[col].isna().sum()
+        if na_count > 0:
+            notify("warning", f"Column '{col}' has {na_count} dates that couldn't be parsed")
+
+    df["Schedule [Days]"] = pd.to_numeric(df["Schedule [Days]"], errors="coerce").fillna(0)
+    df["Man Hours "] = pd.to_numeric(df["Man Hours "], errors="coerce").fillna(0)
+    df["Flag"] = pd.to_numeric(df["Flag"], errors="coerce").fillna(0)
+    return df
+
+
+def memory_bytes(df):
+    """Deep memory use of a DataFrame, including the strings held by object columns."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def compact_register(df):
+    """
+    Shrink a prepared register in place for the rest of the session: low-cardinality CODE_COLUMNS become
+    categoricals, man-hours float32 (only if every value survives the cast) and Flag a bool
+    (Flag == 1). Dates stay datetime64[ns], the smallest datetime unit pandas keeps, so every date
+    comparison downstream is unchanged.
+    The memory before and after is kept in df.attrs["memory_bytes"] as {"before", "after"}, and the
+    prepared dtypes of the recast numeric columns in df.attrs["prepared_dtypes"], so exports can
+    write them back unchanged (see restore_prepared_dtypes).
+    """
+    before = memory_bytes(df)
+    for col in CODE_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            if df[col].nunique() <= CATEGORY_MAX_RATIO * len(df):
+                df[col] = df[col].astype("category")
+    prepared_dtypes = {"Flag": df["Flag"].dtype}
+    man_hours = df["Man Hours "].astype(np.float32)
+    if (man_hours == df["Man Hours "]).all():
+        prepared_dtypes["Man Hours "] = df["Man Hours "].dtype
+        df["Man Hours "] = man_hours
+    df["Flag"] = df["Flag"] == 1
+    df.attrs["prepared_dtypes"] = prepared_dtypes
+    df.attrs["memory_bytes"] = {"before": before, "after": memory_bytes(df)}
+    return df
+
+
+def restore_prepared_dtypes(df):
+    """Cast the columns compact_register shrank back to their prepare_register dtypes, in place."""
+    for col, dtype in df.attrs.get("prepared_dtypes", {}).items():
+        df[col] = df[col].astype(dtype)
+    return df
+
+
+def add_expected_dates(df, initial_date, ifa_delta_days, ift_delta_days):
+    """Derive the three expected milestone dates from the initial date and each document's schedule."""
+    df["Issuance Expected"] = pd.Timestamp(initial_date) + pd.to_timedelta(df["Schedule [Days]"], unit="D")
+    df["Expected review"] = df["Issuance Expected"] + dt.timedelta(days=ifa_delta_days)
+    df["Final Issuance Expected"] = df["Expected review"] + dt.timedelta(days=ift_delta_days)
+    df["Final Issuance Expected"] = pd.to_datetime(df["Final Issuance Expected"], errors='coerce')
+    return df
+
+
+def milestone_date_bounds(df, notify=quiet):
+    """
+    First milestone date and expected end date (max Final Issuance Expected, else max of any date).
+    Returns (start_date, ift_expected_max), or None if the register has no valid dates.
+    """
+    date_cols = ["Issuance Expected", "Expected review", "Final Issuance Expected",
+                 "Issued by EPC", "Review By OE", "Reply By EPC"]
+    valid_dates = pd.Series(df[date_cols].values.ravel()).dropna()
+    ift_expected_max = df["Final Issuance Expected"].dropna().max()
+    if pd.isna(ift_expected_max):
+        notify("warning", "No valid Final Issuance Expected dates found. Checking other date columns.")
+        if valid_dates.empty:
+            notify("error", "No valid milestone dates found in any date columns. Cannot generate S-Curve.")
+            return None
+        ift_expected_max = valid_dates.max()
+
+    if valid_dates.empty:
+        notify("error", "No valid dates found in any milestone columns. Cannot proceed with S-Curve plotting.")
+        return None
+    return valid_dates.min(), ift_expected_max
+
+
+def final_milestones(df, flag_final=True, sequential=True):
+    """
+    Latest milestone reached by each document, one of MILESTONE_STATES. With `sequential` a
+    milestone only counts if the earlier ones are dated too (a reply without an issuance date is
+    "NO ISSUANCE"); with `flag_final` a replied document with Flag == 1 is "Finalized".
+    """
+    issued = df["Issued by EPC"].notna().to_numpy()
+    reviewed = df["Review By OE"].notna().to_numpy()
+    replied = df["Reply By EPC"].notna().to_numpy()
+    if sequential:
+        reviewed = reviewed & issued
+        replied = replied & reviewed
+    flagged = (df["Flag"] == 1).to_numpy() if flag_final else np.zeros(len(df), dtype=bool)
+    states = np.select(
+        [replied & flagged, replied, reviewed, issued],
+        ["Finalized", "Reply By EPC", "Review By OE", "Issued by EPC"],
+        default="NO ISSUANCE"
+    )
+    return pd.Series(states, index=df.index, dtype=object)
+
+
+def document_statuses(df):
+    """Doc_Status of each document: "Completed" if replied by EPC with Flag == 1, else "Incomplete"."""
+    completed = df["Reply By EPC"].notna().to_numpy() & (df["Flag"] == 1).to_numpy()
+    return pd.Series(np.where(completed, "Completed", "Incomplete"), index=df.index, dtype=object)
+
+
+def build_timelines(start_date, today_date, ift_expected_max, notify=quiet, granularity="weekly", cube=None):
+    """
+    Actual (start → today) and expected (start → expected end) timelines, single point if empty.
+    Daily, weekly and monthly timelines sample a regular grid; "exact" takes the start date and
+    every date a milestone event happens on (from the ProgressCube `cube`), so the step curve has
+    no sampling error.
+    """
+    def sample(end, milestones):
+        if granularity == "exact":
+            dates = cube.event_dates(milestones)
+            return pd.DatetimeIndex([start_date]).append(dates[(dates > start_date) & (dates <= end)])
+        return pd.date_range(start=start_date, end=end, freq=TIMELINE_FREQUENCIES[granularity])
+
+    if start_date > today_date:
+        notify("warning", f"Start date ({start_date.strftime('%d-%b-%Y')}) is after today ({today_date.strftime('%d-%b-%Y')}). Using single point timeline.")
+        actual_timeline = [today_date]
+    else:
+        actual_timeline = sample(today_date, slice(0, len(ACTUAL_COLUMNS)))
+        if len(actual_timeline) == 0:
+            notify("warning", "Actual timeline is empty. Using single point at today.")
+            actual_timeline = [today_date]
+
+    if start_date > ift_expected_max:
+        notify("warning", f"Start date ({start_date.strftime('%d-%b-%Y')}) is after max expected date ({ift_expected_max.strftime('%d-%b-%Y')}). Using single point timeline.")
+        expected_timeline = [ift_expected_max]
+    else:
+        expected_timeline = sample(ift_expected_max, slice(len(ACTUAL_COLUMNS), len(DATE_COLUMNS)))
+        if len(expected_timeline) == 0:
+            notify("warning", "Expected timeline is empty. Using single point at max expected date.")
+            expected_timeline = [ift_expected_max]
+    return actual_timeline, expected_timeline
+
+
+def to_datetime64(values):
+    """Convert a date column, list of timestamps or DatetimeIndex to a datetime64[ns] array."""
+    return pd.DatetimeIndex(pd.to_datetime(pd.Series(values), errors="coerce")).as_unit("ns").values
+
+
+def milestone_index(dates, man_hours, mask=None):
+    """
+    Sort one milestone column once and build the prefix sums of its man-hours.
+    Returns:
+        - sorted datetime64[ns] event dates (NaT rows and rows outside `mask` dropped)
+        - cumulative man-hours with a leading 0, so prefix[k] is the sum of the first k events
+    """
+    values = to_datetime64(dates)
+    mh = np.asarray(man_hours, dtype=float)
+    valid = ~np.isnat(values)
+    if mask is not None:
+        valid &= np.asarray(mask, dtype=bool)
+    order = np.argsort(values[valid], kind="stable")
+    sorted_dates = values[valid][order]
+    prefix = np.concatenate(([0.0], np.cumsum(mh[valid][order])))
+    return sorted_dates, prefix
+
+
+def events_at(index, timeline):
+    """Number of events of a milestone index on or before each timeline point."""
+    sorted_dates, _ = index
+    return np.searchsorted(sorted_dates, to_datetime64(timeline), side="right")
+
+
+def cumulative_at(index, timeline):
+    """Cumulative man-hours of a milestone index on or before each timeline point."""
+    _, prefix = index
+    return prefix[events_at(index, timeline)]
+
+
+def build_milestone_indexes(df, flag_final=True):
+    """
+    Build the six milestone indexes used by the S-curve: three actual and three expected.
+    With `flag_final`, "Reply By EPC" only counts for documents with Flag == 1.
+    """
+    mh = df["Man Hours "].to_numpy(dtype=float)
+    final_mask = (df["Flag"] == 1).to_numpy() if flag_final else None
+    actual = [
+        milestone_index(df["Issued by EPC"], mh),
+        milestone_index(df["Review By OE"], mh),
+        milestone_index(df["Reply By EPC"], mh, mask=final_mask),
+    ]
+    expected = [milestone_index(df[col], mh) for col in EXPECTED_COLUMNS]
+    return actual, expected
+
+
+def running_curve(values, timeline, start_date):
+    """
+    Carry the last value forward wherever the curve does not strictly increase.
+    Returns the curve and the date of the last strict increase (start_date if none).
+    """
+    curve = np.maximum.accumulate(np.maximum(np.asarray(values, dtype=float), 0.0))
+    previous = np.concatenate(([0.0], curve[:-1]))
+    progressed = np.flatnonzero(curve > previous)
+    last_date = timeline[progressed[-1]] if len(progressed) else start_date
+    return curve, last_date
+
+
+def gated_curve(values, event_counts, timeline, start_date):
+    """
+    Hold the curve at 0 until at least one milestone event has occurred.
+    Returns the curve and the date of the last timeline point with any event (start_date if none).
+    """
+    has_progress = np.asarray(event_counts) > 0
+    curve = np.where(has_progress, np.asarray(values, dtype=float), 0.0)
+    progressed = np.flatnonzero(has_progress)
+    last_date = timeline[progressed[-1]] if len(progressed) else start_date
+    return curve, last_date
+
+
+def milestone_hours_at(df, columns, as_of, final_mask=None):
+    """
+    Unweighted man-hours each document has reached per milestone on or before `as_of`.
+    `final_mask` restricts the last column (e.g. Flag == 1 for "Reply By EPC").
+    Returns a (rows, len(columns)) array.
+    """
+    mh = df["Man Hours "].to_numpy(dtype=float)
+    limit = to_datetime64([as_of])[0]
+    hours = np.zeros((len(df), len(columns)))
+    for k, col in enumerate(columns):
+        dates = to_datetime64(df[col])
+        reached = ~np.isnat(dates) & (dates <= limit)
+        if final_mask is not None and k == len(columns) - 1:
+            reached &= final_mask
+        hours[:, k] = np.where(reached, mh, 0.0)
+    return hours
+
+
+def row_progress(hours, man_hours, weights):
+    """
+    Weighted progress per document from milestone_hours_at `hours`: the weights of the milestones
+    reached added in order, times the man-hours. The same float operations as adding each weight
+    to the document's progress and multiplying once, so the values (and the updated CSV) match
+    that row-by-row computation to the bit, which `hours @ weights` does not.
+    """
+    fraction = np.zeros(len(man_hours))
+    for k, weight in enumerate(weights):
+        fraction += np.where(hours[:, k] != 0, weight, 0.0)
+    return man_hours * fraction
+
+
+def accumulate_cube(disciplines, milestone_codes, milestone_dates, milestone_hours, milestone_events):
+    """
+    Sum the dated values of each milestone per discipline code (position in `disciplines`) and
+    distinct event date, then accumulate over the dates. `milestone_events` entries may be None
+    to count one event per dated value.
+    Returns a ProgressCube.
+    """
+    points = np.unique(np.concatenate([dates[~np.isnat(dates)] for dates in milestone_dates]))
+    n_disc, n_points = len(disciplines), len(points)
+    hours = np.zeros((n_disc, n_points, len(milestone_dates)))
+    events = np.zeros((n_disc, n_points, len(milestone_dates)))
+    for m, (codes, dates, mh, counts) in enumerate(zip(milestone_codes, milestone_dates, milestone_hours,
+                                                       milestone_events)):
+        valid = ~np.isnat(dates)
+        bins = codes[valid] * n_points + np.searchsorted(points, dates[valid])
+        weights = counts[valid] if counts is not None else None
+        hours[:, :, m] = np.bincount(bins, weights=mh[valid], minlength=n_disc * n_points).reshape(n_disc, n_points)
+        events[:, :, m] = np.bincount(bins, weights=weights, minlength=n_disc * n_points).reshape(n_disc, n_points)
+    return ProgressCube(
+        disciplines=pd.Index(disciplines, dtype=object, name="Discipline"),
+        points=pd.DatetimeIndex(points),
+        hours=np.cumsum(hours, axis=1),
+        events=np.cumsum(events, axis=1),
+    )
+
+
+@dataclass(slots=True)
+class ProgressCube:
+    """
+    Exact step curves of a register: cumulative man-hours and document counts per discipline,
+    distinct event date and milestone (ACTUAL_COLUMNS + EXPECTED_COLUMNS), built once per
+    computation. Any date is answered with a binary search over the event dates, so the S-curve
+    at any granularity, the discipline tables at any as-of date, the milestone counts and the
+    discipline-by-week delay heatmap are all slices of it. Rows without a Discipline keep their
+    own NaN discipline so the totals match the register; the per-discipline views drop it.
+    """
+    disciplines: pd.Index
+    points: pd.DatetimeIndex  # distinct event dates of all six milestones
+    hours: np.ndarray   # (disciplines, points, 6) man-hours on or before each point; Reply By EPC only Flag == 1 with flag_final
+    events: np.ndarray  # (disciplines, points, 6) documents with the milestone on or before each point (no Flag gate)
+
+    def _at(self, values, dates):
+        """`values` at each date (the last event date on or before it; zeros before the first one)."""
+        positions = np.searchsorted(self.points.values, to_datetime64(list(dates)), side="right") - 1
+        return np.where((positions >= 0)[None, :, None], values[:, np.maximum(positions, 0), :], 0.0)
+
+    def hours_at(self, dates):
+        """(disciplines, len(dates), 6) man-hours reached on or before each date."""
+        return self._at(self.hours, dates)
+
+    def events_at(self, dates):
+        """(disciplines, len(dates), 6) documents reached on or before each date."""
+        return self._at(self.events, dates)
+
+    def event_dates(self, milestones):
+        """Event dates of the milestones selected by `milestones` (a slice or list of positions)."""
+        counts = self.events[:, :, milestones].sum(axis=(0, 2))
+        return self.points[np.diff(counts, prepend=0) > 0]
+
+    def _by_discipline(self, values, columns):
+        named = self.disciplines.notna()
+        return pd.DataFrame(values[named], index=self.disciplines[named], columns=columns)
+
+    def discipline_hours(self, as_of):
+        """The disc_actual / disc_expected entries of milestone components for `as_of` ({label: date})."""
+        n_actual = len(ACTUAL_COLUMNS)
+        components = {"disc_actual": {}, "disc_expected": {}}
+        for label, date in as_of.items():
+            hours = self.hours_at([date])[:, 0, :]
+            components["disc_actual"][label] = self._by_discipline(hours[:, :n_actual], range(n_actual))
+            components["disc_expected"][label] = self._by_discipline(hours[:, n_actual:], range(len(EXPECTED_COLUMNS)))
+        return components
+
+    def components(self, actual_timeline, expected_timeline, as_of):
+        """
+        Timeline cumulatives and discipline tables:
+            - actual_cums / expected_cums: (3, timeline points) cumulative man-hours per milestone
+            - expected_events: expected milestone events on or before each expected timeline point
+            - disc_actual / disc_expected: {label: (disciplines, 3) DataFrame of man-hours by `as_of` date}
+        """
+        n_actual = len(ACTUAL_COLUMNS)
+        return {
+            "actual_cums": self.hours_at(actual_timeline).sum(axis=0)[:, :n_actual].T,
+            "expected_cums": self.hours_at(expected_timeline).sum(axis=0)[:, n_actual:].T,
+            "expected_events": self.events_at(expected_timeline)[:, :, n_actual:].sum(axis=(0, 2)).astype(np.int64),
+            **self.discipline_hours(as_of),
+        }
+
+    def milestone_counts(self):
+        """Documents per discipline with an Issued / Review / Reply date, whatever the date."""
+        n_actual = len(ACTUAL_COLUMNS)
+        counts = self.events[:, -1, :n_actual] if len(self.points) else np.zeros((len(self.disciplines), n_actual))
+        return self._by_discipline(counts, ["Issued", "Review", "Reply"])
+
+    def delay_by_week(self, timeline, weights):
+        """
+        Delay_% (expected minus actual weighted man-hours, over expected) per discipline and
+        timeline point, as in discipline_tables; blank where nothing is expected yet.
+        """
+        n_actual = len(ACTUAL_COLUMNS)
+        hours = self.hours_at(timeline)
+        weights = np.asarray(weights, dtype=float)
+        actual, expected = hours[:, :, :n_actual] @ weights, hours[:, :, n_actual:] @ weights
+        with np.errstate(divide="ignore", invalid="ignore"):
+            delay = np.where(expected > 0, (expected - actual) / expected * 100, np.nan)
+        return self._by_discipline(delay, pd.DatetimeIndex(list(timeline)))
+
+
+def build_progress_cube(df, flag_final=True):
+    """ProgressCube of a register with expected dates (see add_expected_dates)."""
+    codes, disciplines = pd.factorize(df["Discipline"], sort=True, use_na_sentinel=False)
+    mh = df["Man Hours "].to_numpy(dtype=float)
+    hours = [mh] * len(DATE_COLUMNS)
+    if flag_final:
+        hours[len(ACTUAL_COLUMNS) - 1] = np.where((df["Flag"] == 1).to_numpy(), mh, 0.0)
+    dates = [to_datetime64(df[col]) for col in DATE_COLUMNS]
+    return accumulate_cube(np.asarray(disciplines, dtype=object), [codes] * len(dates), dates, hours,
+                           [None] * len(dates))
+
+
+def milestone_components(df, as_of, flag_final=True):
+    """
+    Unweighted building blocks of every weighted progress figure. All S-curve and discipline
+    values are linear in the milestone weights, so they are recombined from these without
+    touching the rows again, at any timeline granularity.
+    `as_of` maps a label (e.g. "final", "today") to the date of a per-document snapshot.
+    Returns a dict with:
+        - cube: the ProgressCube the curves and discipline tables are sliced from
+        - rows_actual / rows_expected: {label: (rows, 3) man-hours reached per milestone}
+    """
+    final_mask = (df["Flag"] == 1).to_numpy() if flag_final else None
+    components = {"cube": build_progress_cube(df, flag_final), "rows_actual": {}, "rows_expected": {}}
+    for label, date in as_of.items():
+        components["rows_actual"][label] = milestone_hours_at(df, ACTUAL_COLUMNS, date, final_mask=final_mask)
+        components["rows_expected"][label] = milestone_hours_at(df, EXPECTED_COLUMNS, date)
+    return components
+
+
+def weighted_curves(components, weights, actual_timeline, expected_timeline, start_date, today_date, ift_expected_max):
+    """
+    Recombine cached milestone components with the weights into the S-curve series.
+    Flat tails are extended to today / the expected end date.
+    Returns a dict with the (possibly extended) timelines, actual_cum, issuance_cums, review_cums,
+    final_cums, expected_cum, last_progress_date and last_expected_progress_date.
+    """
+    weights = np.asarray(weights, dtype=float)
+    issuance, review, final = components["actual_cums"] * weights[:, None]
+    actual_cum, last_progress_date = running_curve(issuance + review + final, actual_timeline, start_date)
+    expected_cum, last_expected_progress_date = gated_curve(
+        weights @ components["expected_cums"], components["expected_events"], expected_timeline, start_date
+    )
+    curves = {
+        "actual_timeline": list(actual_timeline),
+        "actual_cum": actual_cum.tolist(),
+        "issuance_cums": issuance.tolist(),
+        "review_cums": review.tolist(),
+        "final_cums": final.tolist(),
+        "expected_timeline": list(expected_timeline),
+        "expected_cum": expected_cum.tolist(),
+        "last_progress_date": last_progress_date,
+        "last_expected_progress_date": last_expected_progress_date,
+    }
+    if not curves["actual_cum"] or not curves["expected_cum"]:
+        return curves
+
+    if last_progress_date < today_date:
+        curves["actual_timeline"].append(today_date)
+        for key in ["actual_cum", "issuance_cums", "review_cums", "final_cums"]:
+            curves[key].append(curves[key][-1])
+
+    if pd.notna(ift_expected_max) and last_expected_progress_date < ift_expected_max:
+        curves["expected_timeline"].append(ift_expected_max)
+        curves["expected_cum"].append(curves["expected_cum"][-1])
+    return curves
+
+
+def value_index_at(timeline, date):
+    """Index of the last timeline point on or before `date`, clamped to the timeline."""
+    if date <= timeline[0]:
+        return 0
+    if date >= timeline[-1]:
+        return len(timeline) - 1
+    return int(np.searchsorted(timeline, date, side="right") - 1)
+
+
+def project_recovery(curves, start_date, today_date, ift_expected_max, recovery_factor):
+    """
+    Today's actual/expected values and the weekly recovery projection from today to the expected total.
+    Recovery takes the delayed fraction of the project duration, scaled by `recovery_factor`.
+    """
+    actual_cum, expected_cum = curves["actual_cum"], curves["expected_cum"]
+    final_expected = expected_cum[-1]
+    today_idx = value_index_at(curves["actual_timeline"], today_date)
+    expected_today_idx = value_index_at(curves["expected_timeline"], today_date)
+    actual_today = actual_cum[today_idx]
+    expected_today = expected_cum[expected_today_idx]
+
+    gap_hrs = final_expected - actual_today
+    projected_timeline = []
+    projected_cumulative = []
+    recovery_end_date = None
+
+    if gap_hrs > 0:
+        total_days_span = (ift_expected_max - start_date).days
+        project_months = total_days_span / 30.4
+        delay_fraction = gap_hrs / final_expected
+        T_recover_months = project_months * delay_fraction * recovery_factor
+        T_recover_weeks = T_recover_months * (30.4 / 7.0)
+        if T_recover_weeks < 1:
+            T_recover_weeks = 1
+        slope_new = gap_hrs / T_recover_weeks
+        last_date = today_date
+        cum_val = actual_today
+        steps = int(T_recover_weeks) + 2
+        for _ in range(steps):
+            projected_timeline.append(last_date)
+            projected_cumulative.append(cum_val)
+            if cum_val >= final_expected:
+                break
+            last_date = last_date + dt.timedelta(weeks=1)
+            cum_val = min(final_expected, cum_val + slope_new)
+        recovery_end_date = last_date
+
+    return {
+        "today_idx": today_idx,
+        "expected_today_idx": expected_today_idx,
+        "actual_today": actual_today,
+        "expected_today": expected_today,
+        "projected_timeline": projected_timeline,
+        "projected_cumulative": projected_cumulative,
+        "recovery_end_date": recovery_end_date,
+    }
+
+
+def discipline_tables(components, weights):
+    """
+    Weighted per-discipline man-hours at the end date ("final") and today, plus Delay_% as of today.
+    Returns (by_disc, disc_delay).
+    """
+    weights = np.asarray(weights, dtype=float)
+    by_disc = pd.DataFrame({
+        "Actual_Progress_At_Final": components["disc_actual"]["final"] @ weights,
+        "Expected_Progress_At_Final": components["disc_expected"]["final"] @ weights,
+    })
+    disc_delay = pd.DataFrame({
+        "Actual_Progress_Today": components["disc_actual"]["today"] @ weights,
+        "Expected_Progress_Today": components["disc_expected"]["today"] @ weights,
+    })
+    disc_delay["Delay_%"] = (
+        (disc_delay["Expected_Progress_Today"] - disc_delay["Actual_Progress_Today"])
+        / disc_delay["Expected_Progress_Today"]
+    ) * 100
+    disc_delay["Delay_%"] = disc_delay["Delay_%"].fillna(0)
+    return by_disc, disc_delay
+
+
+def issuance_delays(df, today, threshold_days=DELAY_THRESHOLD_DAYS):
+    """Documents issued (or still unissued at `today`) `threshold_days` days or more after their expected issuance."""
+    expected = pd.to_datetime(df["Issuance Expected"])
+    actual = pd.to_datetime(df["Issued by EPC"]).fillna(today)
+    delay_days = (actual - expected).dt.days  # NaN where nothing was expected
+    late = (delay_days >= threshold_days).to_numpy()
+    return pd.DataFrame({
+        "ID": df["ID"].to_numpy()[late],
+        "Discipline": df["Discipline"].to_numpy()[late],
+        "Document Title": df["Document Title"].to_numpy()[late],
+        "Issuance Expected": expected[late].dt.strftime("%d-%b-%y").to_numpy(),
+        "Actual Issued": actual[late].dt.strftime("%d-%b-%y").to_numpy(),
+        "Delay (days)": delay_days[late].to_numpy(dtype=np.int64),
+        "Status": df["Status"].to_numpy()[late],
+    })
+
+
+def most_overdue(delays, k):
+    """
+    The `k` rows of an issuance_delays table with the longest delays, longest first. Selected
+    with np.argpartition, so only those k rows are sorted.
+    """
+    days = delays["Delay (days)"].to_numpy()
+    if k <= 0:
+        return delays.iloc[:0]
+    if k < len(days):
+        top = np.argpartition(-days, k - 1)[:k]
+    else:
+        top = np.arange(len(days))
+    return delays.iloc[top[np.argsort(-days[top], kind="stable")]]
+
+
+@dataclass(slots=True)
+class ScurveParams:
+    """Sidebar/CLI parameters of one S-curve computation (defaults match the sidebar)."""
+    initial_date: pd.Timestamp = pd.Timestamp("2024-08-01")
+    ifr_weight: float = 0.40
+    ifa_weight: float = 0.30
+    ift_weight: float = 0.30
+    recovery_factor: float = 0.75
+    ifa_delta_days: int = 10
+    ift_delta_days: int = 5
+    today: Optional[pd.Timestamp] = None  # None = current date
+    flag_final: bool = True  # "Reply By EPC" only counts for Flag == 1
+    granularity: str = "weekly"  # timeline sampling, one of GRANULARITIES
+    delay_threshold_days: int = DELAY_THRESHOLD_DAYS  # minimum issuance delay listed in the delay table
+
+    @property
+    def weights(self):
+        return np.array([self.ifr_weight, self.ifa_weight, self.ift_weight], dtype=float)
+
+
+@dataclass(slots=True)
+class ScurveResult:
+    """
+    Everything the dashboard, batch reports and benchmarks need from one computation.
+    Series are NumPy arrays aligned with their DatetimeIndex timeline; actual timelines end at
+    today and expected timelines at the expected end date.
+    """
+    start_date: pd.Timestamp
+    today_date: pd.Timestamp
+    ift_expected_max: pd.Timestamp
+    end_date: pd.Timestamp
+    granularity: str
+    total_mh: float
+    actual_timeline: pd.DatetimeIndex
+    issuance_cum: np.ndarray
+    review_cum: np.ndarray
+    final_cum: np.ndarray
+    actual_cum: np.ndarray
+    last_progress_date: pd.Timestamp
+    expected_timeline: pd.DatetimeIndex
+    expected_cum: np.ndarray
+    last_expected_progress_date: pd.Timestamp
+    today_idx: int
+    expected_today_idx: int
+    actual_today: float
+    expected_today: float
+    projected_timeline: pd.DatetimeIndex
+    projected_cum: np.ndarray
+    recovery_end_date: Optional[pd.Timestamp]
+    by_disc: pd.DataFrame
+    disc_delay: pd.DataFrame
+    cube: ProgressCube = field(repr=False)
+    delays: pd.DataFrame
+    register: Optional[pd.DataFrame] = field(repr=False)  # input rows with expected dates and progress columns; None when streamed
+
+    @property
+    def final_expected(self):
+        return float(self.expected_cum[-1])
+
+    @property
+    def delay_today(self):
+        return self.expected_today - self.actual_today
+
+    @property
+    def delay_pct(self):
+        return (self.delay_today / self.final_expected * 100) if self.final_expected > 0 else 0
+
+    def actual_frame(self):
+        """Actual S-curve and its per-milestone stack as a DataFrame."""
+        return pd.DataFrame({
+            "Date": self.actual_timeline,
+            "Issuance": self.issuance_cum,
+            "Review": self.review_cum,
+            "Final Acceptance": self.final_cum,
+            "Actual": self.actual_cum,
+        })
+
+    def expected_frame(self):
+        return pd.DataFrame({"Date": self.expected_timeline, "Expected": self.expected_cum})
+
+    def projected_frame(self):
+        return pd.DataFrame({"Date": self.projected_timeline, "Projected": self.projected_cum})
+
+    def delay_by_week(self, weights):
+        """
+        Delay_% per discipline and week up to today (ProgressCube.delay_by_week), always on the
+        weekly actual timeline (today appended as the S-curve does), so the heatmap keeps one column
+        per week at any S-curve granularity.
+        """
+        weeks = self.actual_timeline
+        if self.granularity != "weekly":
+            weeks, _ = build_timelines(self.start_date, self.today_date, self.ift_expected_max, granularity="weekly")
+            if weeks[-1] < self.today_date:
+                weeks = [*weeks, self.today_date]
+        return self.cube.delay_by_week(weeks, weights)
+
+
+def _curve_fields(cube, params, today_date, start_date, ift_expected_max, notify=quiet, stage=untimed):
+    """
+    Timelines at params.granularity, weighted curves, recovery projection and discipline tables
+    sliced from a ProgressCube, as ScurveResult keyword arguments (all but total_mh, delays and
+    register).
+    Returns None (after notifying an error) if no cumulative progress could be built.
+    """
+    weights = params.weights
+    end_date = max(today_date, ift_expected_max)
+    with stage("timelines"):
+        actual_timeline, expected_timeline = build_timelines(start_date, today_date, ift_expected_max, notify=notify,
+                                                             granularity=params.granularity, cube=cube)
+        components = cube.components(actual_timeline, expected_timeline, {"final": end_date, "today": today_date})
+    with stage("weighted curves"):
+        curves = weighted_curves(components, weights, actual_timeline, expected_timeline,
+                                 start_date, today_date, ift_expected_max)
+    if not curves["actual_cum"] or not curves["expected_cum"]:
+        notify("error", "No cumulative progress data generated. Check input data for valid dates and man-hours.")
+        return None
+    with stage("recovery projection"):
+        recovery = project_recovery(curves, start_date, today_date, ift_expected_max, params.recovery_factor)
+    with stage("discipline tables"):
+        by_disc, disc_delay = discipline_tables(components, weights)
+    return dict(
+        start_date=start_date,
+        today_date=today_date,
+        ift_expected_max=ift_expected_max,
+        end_date=end_date,
+        granularity=params.granularity,
+        actual_timeline=pd.DatetimeIndex(curves["actual_timeline"]),
+        issuance_cum=np.asarray(curves["issuance_cums"]),
+        review_cum=np.asarray(curves["review_cums"]),
+        final_cum=np.asarray(curves["final_cums"]),
+        actual_cum=np.asarray(curves["actual_cum"]),
+        last_progress_date=curves["last_progress_date"],
+        expected_timeline=pd.DatetimeIndex(curves["expected_timeline"]),
+        expected_cum=np.asarray(curves["expected_cum"]),
+        last_expected_progress_date=curves["last_expected_progress_date"],
+        today_idx=recovery["today_idx"],
+        expected_today_idx=recovery["expected_today_idx"],
+        actual_today=float(recovery["actual_today"]),
+        expected_today=float(recovery["expected_today"]),
+        projected_timeline=pd.DatetimeIndex(recovery["projected_timeline"]),
+        projected_cum=np.asarray(recovery["projected_cumulative"], dtype=float),
+        recovery_end_date=recovery["recovery_end_date"],
+        by_disc=by_disc,
+        disc_delay=disc_delay,
+        cube=cube,
+    )
+
+
+def compute_scurve(df, params=None, notify=quiet, components_fn=None, stage=untimed):
+    """
+    Run the whole S-curve computation on a prepared register (see prepare_register).
+    The input frame is not modified. `components_fn(df, as_of)` can be swapped for a cached
+    version of milestone_components (the default uses params.flag_final), and `stage(name, rows)`
+    for a context manager that times each step (see diagnostics.Diagnostics.stage).
+    Returns a ScurveResult, or None (after notifying an error) if the register has no usable dates.
+    """
+    params = params or ScurveParams()
+    today_date = params.today if params.today is not None else pd.Timestamp.today().normalize()
+    with stage("expected dates", rows=len(df)):
+        df = add_expected_dates(df.copy(deep=False), params.initial_date, params.ifa_delta_days, params.ift_delta_days)
+        bounds = milestone_date_bounds(df, notify=notify)
+        if bounds is None:
+            return None
+        start_date, ift_expected_max = bounds
+        as_of = {"final": max(today_date, ift_expected_max), "today": today_date}
+
+    with stage("milestone cumulatives", rows=len(df)):
+        if components_fn is None:
+            components = milestone_components(df, as_of, flag_final=params.flag_final)
+        else:
+            components = components_fn(df, as_of)
+    fields = _curve_fields(components["cube"], params, today_date, start_date, ift_expected_max,
+                           notify=notify, stage=stage)
+    if fields is None:
+        return None
+
+    weights, man_hours = params.weights, df["Man Hours "].to_numpy(dtype=float)
+    df["Actual_Progress_At_Final"] = row_progress(components["rows_actual"]["final"], man_hours, weights)
+    df["Expected_Progress_At_Final"] = row_progress(components["rows_expected"]["final"], man_hours, weights)
+    df["Actual_Progress_Today"] = row_progress(components["rows_actual"]["today"], man_hours, weights)
+    df["Expected_Progress_Today"] = row_progress(components["rows_expected"]["today"], man_hours, weights)
+    with stage("delay table", rows=len(df)):
+        delays = issuance_delays(df, today_date, params.delay_threshold_days)
+    return ScurveResult(**fields, total_mh=float(df["Man Hours "].to_numpy(dtype=float).sum()), delays=delays, register=df)
+
+
+@dataclass(slots=True)
+class MilestoneHistograms:
+    """
+    Man-hours and event counts per (Discipline, date) for the three actual and three expected
+    milestones of a register, accumulated chunk by chunk. Their size follows the number of
+    distinct dates and disciplines, not rows, and the S-curve and discipline tables recombined
+    from them are the ones compute_scurve gets from the full frame.
+    """
+    flag_final: bool = True
+    rows: int = 0
+    filtered_rows: int = 0
+    total_mh: float = 0.0
+    unparsed: dict = field(default_factory=lambda: dict.fromkeys(DATE_COLUMNS, 0))
+    histograms: list = field(default_factory=lambda: [None] * 6)  # ACTUAL_COLUMNS + EXPECTED_COLUMNS
+    min_date: Optional[pd.Timestamp] = None
+    max_date: Optional[pd.Timestamp] = None
+    ift_expected_max: Optional[pd.Timestamp] = None
+    delay_chunks: list = field(default_factory=list)
+
+    def add(self, df):
+        """Fold a prepared chunk with expected dates (see add_expected_dates) into the histograms."""
+        self.rows += len(df)
+        self.total_mh += float(df["Man Hours "].sum())
+        final_mask = (df["Flag"] == 1) if self.flag_final else None
+        for k, col in enumerate(DATE_COLUMNS):
+            mh = df["Man Hours "]
+            if final_mask is not None and k == len(ACTUAL_COLUMNS) - 1:
+                mh = mh.where(final_mask, 0.0)  # Reply By EPC hours need Flag == 1; its events count every document
+            counts = mh.groupby([df["Discipline"], df[col]], dropna=False).agg(mh="sum", events="size")
+            counts = counts[counts.index.get_level_values(1).notna()]
+            previous = self.histograms[k]
+            if previous is not None:
+                counts = pd.concat([previous, counts]).groupby(level=[0, 1], dropna=False).sum()
+            self.histograms[k] = counts
+
+        dates = pd.Series(df[DATE_COLUMNS].values.ravel()).dropna()
+        if not dates.empty:
+            self.min_date = min(dates.min(), self.min_date) if self.min_date is not None else dates.min()
+            self.max_date = max(dates.max(), self.max_date) if self.max_date is not None else dates.max()
+        ift_max = df["Final Issuance Expected"].max()
+        if pd.notna(ift_max):
+            self.ift_expected_max = max(ift_max, self.ift_expected_max) if self.ift_expected_max is not None else ift_max
+
+    def date_bounds(self, notify=quiet):
+        """Same as milestone_date_bounds on the full register."""
+        if self.ift_expected_max is None:
+            notify("warning", "No valid Final Issuance Expected dates found. Checking other date columns.")
+            if self.min_date is None:
+                notify("error", "No valid milestone dates found in any date columns. Cannot generate S-Curve.")
+                return None
+            return self.min_date, self.max_date
+        return self.min_date, self.ift_expected_max
+
+    def cube(self):
+        """The ProgressCube build_progress_cube gives for the full register."""
+        histograms = [
+            h if h is not None else pd.DataFrame({"mh": [], "events": []}, index=pd.MultiIndex.from_arrays(
+                [pd.Index([], dtype=object), pd.DatetimeIndex([])]))
+            for h in self.histograms
+        ]
+        labels = [h.index.get_level_values(0) for h in histograms]
+        _, disciplines = pd.factorize(np.concatenate([l.to_numpy(dtype=object) for l in labels]),
+                                      sort=True, use_na_sentinel=False)
+        disciplines = pd.Index(disciplines, dtype=object)
+        return accumulate_cube(
+            disciplines,
+            [disciplines.get_indexer(l) for l in labels],
+            [to_datetime64(h.index.get_level_values(1)) for h in histograms],
+            [h["mh"].to_numpy(dtype=float) for h in histograms],
+            [h["events"].to_numpy(dtype=float) for h in histograms],
+        )
+
+    def delays(self):
+        """Issuance delays of all chunks (see issuance_delays)."""
+        if not self.delay_chunks:
+            return issuance_delays(pd.DataFrame(columns=REGISTER_COLUMNS), pd.Timestamp.today())
+        return pd.concat(self.delay_chunks, ignore_index=True)
+
+
+def stream_histograms(source, params=None, ignore_status="", chunksize=100_000, notify=quiet):
+    """
+    Read a CSV register in chunks of `chunksize` rows, preparing each chunk like prepare_register
+    and folding it into MilestoneHistograms, so memory is bounded by the chunk size rather than
+    the file size. The issuance delay table is collected per chunk as well.
+    Returns the histograms, or None (after notifying an error) if no rows remain.
+    """
+    params = params or ScurveParams()
+    today_date = params.today if params.today is not None else pd.Timestamp.today().normalize()
+    histograms = MilestoneHistograms(flag_final=params.flag_final)
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        n_rows = len(chunk)
+        chunk = prepare_register(chunk, ignore_status)  # per-chunk messages are summarised below
+        if chunk is None:
+            histograms.filtered_rows += n_rows
+            continue
+        histograms.filtered_rows += n_rows - len(chunk)
+        for col in DATE_COLUMNS:
+            histograms.unparsed[col] += int(chunk[col].isna().sum())
+        chunk = add_expected_dates(chunk, params.initial_date, params.ifa_delta_days, params.ift_delta_days)
+        histograms.add(chunk)
+        histograms.delay_chunks.append(issuance_delays(chunk, today_date, params.delay_threshold_days))
+
+    if histograms.filtered_rows:
+        statuses_to_exclude = [s.strip() for s in ignore_status.split(',') if s.strip()]
+        notify("info", f"Filtered out {histograms.filtered_rows} rows with Status in: {', '.join(statuses_to_exclude)}")
+    if histograms.rows == 0:
+        notify("error", "All rows have Status in exclusion list. No data remains after filtering.")
+        return None
+    for col, na_count in histograms.unparsed.items():
+        if na_count > 0:
+            notify("warning", f"Column '{col}' has {na_count} dates that couldn't be parsed")
+    return histograms
+
+
+def compute_scurve_from_histograms(histograms, params=None, notify=quiet, stage=untimed):
+    """
+    compute_scurve for a register read with stream_histograms. The result has no `register`
+    (per-document progress columns are not kept) and its delays come from the streamed chunks.
+    """
+    params = params or ScurveParams()
+    today_date = params.today if params.today is not None else pd.Timestamp.today().normalize()
+    bounds = histograms.date_bounds(notify=notify)
+    if bounds is None:
+        return None
+    start_date, ift_expected_max = bounds
+    with stage("milestone cumulatives"):
+        cube = histograms.cube()
+    fields = _curve_fields(cube, params, today_date, start_date, ift_expected_max, notify=notify, stage=stage)
+    if fields is None:
+        return None
+    return ScurveResult(**fields, total_mh=histograms.total_mh, delays=histograms.delays(), register=None)